@@ -0,0 +1,413 @@
+# bench_browser.py - 浏览器整体性能基准（离屏运行，连接本地测试服务器）
+#
+# 用法:
+#   python benchmarks/bench_browser.py                                  # 默认场景
+#   python benchmarks/bench_browser.py --latency-ms 50 --tab-counts 1,10,100
+#   python benchmarks/bench_browser.py --baseline benchmarks/results/2.1.0-20250101-120000.json
+#
+# 每个场景在单独的子进程中运行（干净的数据目录、QT_QPA_PLATFORM=offscreen），
+# 父进程只负责测试服务器、汇总结果和检查阈值；有指标超出阈值时退出码为 1。
+import os
+import sys
+import json
+import time
+import argparse
+import shutil
+import platform
+import tempfile
+import subprocess
+
+# 子进程的墙钟起点，用于计算从启动进程到首次绘制的时间
+WALL_START = time.time()
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import startup_trace  # noqa: E402  尽早导入，使 PROCESS_START 接近进程启动时间
+from fixture_server import FixtureServer  # noqa: E402
+from version import CURRENT_VERSION  # noqa: E402
+
+RESULT_MARKER = "BENCH_RESULT "
+DEFAULT_THRESHOLDS = os.path.join(BENCH_DIR, "thresholds.json")
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# 基准运行时关闭会访问外部网络或自行丢弃标签页的功能，保证结果可重复
+BENCH_CONFIG = {
+    "updates": {"check_on_startup": False},
+    "search": {"suggest": False},
+    "speculation": {"enabled": False},
+    "tab_lifecycle": {"enabled": False},
+    "memory_governor": {"enabled": False},
+}
+
+# 冷启动中记录的阶段
+COLD_START_PHASES = ["window_shown", "first_paint", "first_view_created", "first_load_finished"]
+
+
+def percentile(values, fraction):
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def median(values):
+    return percentile(values, 0.5)
+
+
+def summarize(values):
+    return {
+        "p50_ms": round(percentile(values, 0.5), 2) if values else None,
+        "p95_ms": round(percentile(values, 0.95), 2) if values else None,
+        "samples": len(values),
+    }
+
+
+# ---------------------------------------------------------------- 子进程
+
+def wait_until(predicate, timeout):
+    """运行事件循环直到条件成立或超时，返回条件是否成立"""
+    from PyQt5.QtCore import QEventLoop, QTimer
+    if predicate():
+        return True
+    deadline = time.perf_counter() + timeout
+    loop = QEventLoop()
+    timer = QTimer()
+    timer.timeout.connect(lambda: (predicate() or time.perf_counter() > deadline) and loop.quit())
+    timer.start(1)
+    loop.exec_()
+    timer.stop()
+    return predicate()
+
+
+def start_browser(args):
+    """按 main.py 的顺序创建应用和窗口，并记录同样的启动阶段"""
+    trace = startup_trace.get_startup_trace()
+    from PyQt5.QtWidgets import QApplication
+    import PyQt5.QtWebEngineWidgets  # noqa: F401
+    trace.mark("qt_imported")
+    from browser_window import PyroBrowser
+    from perf_profiles import apply_perf_profile
+    from styles import apply_theme
+    trace.mark("modules_imported")
+
+    apply_perf_profile(args.perf_profile)
+    app = QApplication(sys.argv[:1])
+    apply_theme(app)
+    trace.mark("qapplication_created")
+    window = PyroBrowser()
+    trace.mark("window_created")
+    window.show()
+    trace.mark("window_shown")
+    return app, window
+
+
+def process_tree_memory(root_pid):
+    """进程及其全部子进程（渲染、GPU 等）的内存合计 (RSS, PSS, 进程数)，单位 KB"""
+    from procstats import read_process_memory
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "r") as f:
+                data = f.read()
+            ppid = int(data[data.rfind(")") + 2:].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    total_rss = total_pss = count = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        rss, pss = read_process_memory(pid)
+        total_rss += rss or 0
+        total_pss += pss or rss or 0
+        count += 1
+        stack.extend(children.get(pid, []))
+    return total_rss, total_pss, count
+
+
+def emit_result(result):
+    print(RESULT_MARKER + json.dumps(result, ensure_ascii=False), flush=True)
+    # QtWebEngine 退出时可能很慢，结果已经输出，直接结束子进程
+    os._exit(0)
+
+
+def run_cold_start_child(args):
+    trace = startup_trace.get_startup_trace()
+    app, window = start_browser(args)
+    wait_until(lambda: trace.elapsed("first_load_finished") is not None, args.timeout)
+    from perf_profiles import get_active_profile
+    emit_result({
+        "wall_start": WALL_START,
+        "trace": trace.to_dict(),
+        "perf_profile": get_active_profile(),
+    })
+
+
+def open_tab_and_wait(window, url, timeout):
+    """返回 (add_new_tab 耗时, 到 loadFinished 的耗时)，加载超时时后者为 None"""
+    loaded = []
+    started = time.perf_counter()
+    view = window.add_new_tab(url, "基准测试")
+    add_ms = (time.perf_counter() - started) * 1000
+    view.loadFinished.connect(lambda ok: loaded.append(time.perf_counter()))
+    wait_until(lambda: loaded, timeout)
+    return add_ms, (loaded[0] - started) * 1000 if loaded else None
+
+
+def run_tabs_child(args):
+    trace = startup_trace.get_startup_trace()
+    app, window = start_browser(args)
+    wait_until(lambda: trace.elapsed("first_load_finished") is not None, args.timeout)
+    tab_widget = window.tab_widget
+    page_number = 1000
+
+    # 新建标签页与加载完成
+    add_ms, load_ms = [], []
+    for _ in range(args.samples):
+        page_number += 1
+        added, loaded = open_tab_and_wait(window, f"{args.base_url}/page/{page_number}", args.timeout)
+        add_ms.append(added)
+        load_ms.append(loaded)
+
+    # 切换标签页：调用本身加上随后的布局与绘制，以及合并刷新的界面更新
+    switch_ms = []
+    ui_updater = window.ui_updater
+    for _ in range(args.samples):
+        target = (tab_widget.currentIndex() + 1) % tab_widget.count()
+        started = time.perf_counter()
+        tab_widget.setCurrentIndexWithAnimation(target)
+        app.processEvents()
+        wait_until(lambda: not ui_updater.pending and not ui_updater.timer.isActive(), args.timeout)
+        switch_ms.append((time.perf_counter() - started) * 1000)
+
+    # 关闭标签页，回到只剩一个标签页
+    close_ms = []
+    while tab_widget.count() > 1:
+        started = time.perf_counter()
+        window.close_tab(tab_widget.count() - 1)
+        app.processEvents()
+        close_ms.append((time.perf_counter() - started) * 1000)
+
+    # 不同标签页数量下的内存
+    memory = []
+    pending = set()
+    for target_count in sorted(args.tab_counts):
+        while tab_widget.count() < target_count:
+            page_number += 1
+            view = window.add_new_tab(f"{args.base_url}/page/{page_number}", "基准测试")
+            pending.add(view)
+            view.loadFinished.connect(lambda ok, v=view: pending.discard(v))
+            if len(pending) >= args.batch:
+                wait_until(lambda: not pending, args.timeout)
+        all_loaded = wait_until(lambda: not pending, args.timeout)
+        wait_until(lambda: False, args.settle_seconds)
+        rss, pss, processes = process_tree_memory(os.getpid())
+        memory.append({
+            "tabs": tab_widget.count(),
+            "all_loaded": all_loaded,
+            "rss_kb": rss,
+            "pss_kb": pss,
+            "processes": processes,
+            "pss_per_tab_kb": round(pss / tab_widget.count()),
+        })
+        print(f"{tab_widget.count()} 个标签页: PSS {pss / 1024:.0f} MB, {processes} 个进程", file=sys.stderr)
+
+    emit_result({
+        "add_new_tab_ms": add_ms,
+        "load_finished_ms": load_ms,
+        "tab_switch_ms": switch_ms,
+        "close_tab_ms": close_ms,
+        "memory": memory,
+    })
+
+
+# ---------------------------------------------------------------- 父进程
+
+def prepare_data_dir(url):
+    """干净的数据目录：基准配置 + 只有一个测试页面的会话快照"""
+    data_dir = tempfile.mkdtemp(prefix="pyro-bench-")
+    with open(os.path.join(data_dir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(BENCH_CONFIG, f, ensure_ascii=False, indent=2)
+    os.makedirs(os.path.join(data_dir, "session"))
+    with open(os.path.join(data_dir, "session", "session.snapshot"), "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "current": 1, "tabs": [[1, url, "基准测试"]]}, f)
+    return data_dir
+
+
+def run_child(mode, args, server):
+    """在干净的环境中运行一个场景，返回子进程输出的结果"""
+    data_dir = prepare_data_dir(server.page_url(1))
+    env = dict(os.environ)
+    env["PYRO_BROWSER_HOME"] = data_dir
+    env["QT_QPA_PLATFORM"] = "offscreen"
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        # Chromium 的沙箱不能以 root 运行
+        env.setdefault("QTWEBENGINE_DISABLE_SANDBOX", "1")
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--base-url", server.base_url,
+               "--samples", str(args.samples), "--tab-counts", ",".join(map(str, args.tab_counts)),
+               "--batch", str(args.batch), "--timeout", str(args.timeout),
+               "--settle-seconds", str(args.settle_seconds)]
+    if args.perf_profile:
+        command += ["--perf-profile", args.perf_profile]
+
+    spawned_at = time.time()
+    try:
+        completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, text=True,
+                                   timeout=args.timeout * 4 + len(args.tab_counts) * args.timeout)
+    except subprocess.TimeoutExpired:
+        print(f"场景 {mode} 超时", file=sys.stderr)
+        return None, spawned_at
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):]), spawned_at
+    print(f"场景 {mode} 没有输出结果（退出码 {completed.returncode}）", file=sys.stderr)
+    return None, spawned_at
+
+
+def measure_cold_start(args, server):
+    runs = []
+    perf_profile = None
+    for _ in range(args.cold_runs):
+        result, spawned_at = run_child("cold-start", args, server)
+        if result is None:
+            continue
+        perf_profile = result["perf_profile"]
+        phases = {item["phase"]: item["ms"] for item in result["trace"]["phases"]}
+        run = {phase: phases.get(phase) for phase in COLD_START_PHASES}
+        if phases.get("first_paint") is not None:
+            # 包含解释器启动和模块导入之前的时间
+            run["spawn_to_first_paint"] = round((result["wall_start"] - spawned_at) * 1000 + phases["first_paint"], 2)
+        runs.append(run)
+    metrics = {}
+    for phase in COLD_START_PHASES + ["spawn_to_first_paint"]:
+        value = median([run.get(phase) for run in runs])
+        if value is not None:
+            metrics[f"cold_start.{phase}_ms"] = round(value, 2)
+    return metrics, runs, perf_profile
+
+
+def measure_tabs(args, server):
+    result, _ = run_child("tabs", args, server)
+    if result is None:
+        return {}, None
+    metrics = {}
+    for name, key in (("add_new_tab", "add_new_tab_ms"), ("load_finished", "load_finished_ms"),
+                      ("tab_switch", "tab_switch_ms"), ("close_tab", "close_tab_ms")):
+        summary = summarize([value for value in result[key] if value is not None])
+        metrics[f"{name}.p50_ms"] = summary["p50_ms"]
+        metrics[f"{name}.p95_ms"] = summary["p95_ms"]
+    for sample in result["memory"]:
+        metrics[f"memory.tabs_{sample['tabs']}.pss_per_tab_kb"] = sample["pss_per_tab_kb"]
+        metrics[f"memory.tabs_{sample['tabs']}.rss_kb"] = sample["rss_kb"]
+    return metrics, result
+
+
+def check_thresholds(metrics, thresholds, baseline=None):
+    """绝对上限与相对基线的回归检查，所有指标都是越小越好"""
+    checks = []
+    for name, limit in thresholds.get("max", {}).items():
+        value = metrics.get(name)
+        if value is None:
+            continue
+        checks.append({"metric": name, "value": value, "limit": limit, "kind": "max", "passed": value <= limit})
+    if baseline:
+        tolerance = thresholds.get("regression_tolerance", 0.2)
+        for name, base_value in baseline.get("metrics", {}).items():
+            value = metrics.get(name)
+            if value is None or not base_value:
+                continue
+            limit = round(base_value * (1 + tolerance), 2)
+            checks.append({"metric": name, "value": value, "limit": limit, "kind": "baseline",
+                           "passed": value <= limit})
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="浏览器整体性能基准")
+    parser.add_argument("--latency-ms", type=float, default=20, help="测试服务器每个请求的延迟")
+    parser.add_argument("--tab-counts", default="1,10,100,500", help="测量内存时的标签页数量")
+    parser.add_argument("--samples", type=int, default=20, help="新建、切换、关闭标签页的测量次数")
+    parser.add_argument("--cold-runs", type=int, default=3, help="冷启动测量次数（取中位数）")
+    parser.add_argument("--batch", type=int, default=25, help="测量内存时每批同时加载的标签页数")
+    parser.add_argument("--timeout", type=float, default=60, help="单次等待的超时（秒）")
+    parser.add_argument("--settle-seconds", type=float, default=2, help="采样内存前等待的秒数")
+    parser.add_argument("--perf-profile", help="low-memory / balanced / throughput")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--baseline", help="之前的结果文件，超出其指标一定比例视为回归")
+    parser.add_argument("--json", help="结果文件，默认写入 benchmarks/results/")
+    parser.add_argument("--skip-cold-start", action="store_true")
+    parser.add_argument("--skip-tabs", action="store_true")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.tab_counts = [int(count) for count in args.tab_counts.split(",") if count.strip()]
+
+    if args.child == "cold-start":
+        run_cold_start_child(args)
+        return
+    if args.child == "tabs":
+        run_tabs_child(args)
+        return
+
+    server = FixtureServer(args.latency_ms).start()
+    metrics = {}
+    details = {}
+    perf_profile = None
+    try:
+        if not args.skip_cold_start:
+            cold_metrics, details["cold_start_runs"], perf_profile = measure_cold_start(args, server)
+            metrics.update(cold_metrics)
+        if not args.skip_tabs:
+            tab_metrics, details["tabs"] = measure_tabs(args, server)
+            metrics.update(tab_metrics)
+    finally:
+        server.stop()
+
+    try:
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            thresholds = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"阈值文件读取失败: {e}", file=sys.stderr)
+        thresholds = {}
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    checks = check_thresholds(metrics, thresholds, baseline)
+
+    result = {
+        "version": CURRENT_VERSION,
+        "timestamp": int(time.time()),
+        "platform": {"system": platform.platform(), "python": platform.python_version(),
+                     "cpus": os.cpu_count()},
+        "perf_profile": perf_profile,
+        "settings": {"latency_ms": args.latency_ms, "tab_counts": args.tab_counts, "samples": args.samples},
+        "metrics": metrics,
+        "checks": checks,
+        "passed": all(check["passed"] for check in checks),
+        "details": details,
+    }
+    output_path = args.json
+    if not output_path:
+        os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+        output_path = os.path.join(DEFAULT_RESULTS_DIR,
+                                   f"{CURRENT_VERSION}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(json.dumps(metrics, ensure_ascii=False, indent=2))
+    for check in checks:
+        if not check["passed"]:
+            print(f"超出阈值: {check['metric']} = {check['value']} > {check['limit']} ({check['kind']})",
+                  file=sys.stderr)
+    print(f"结果已写入 {output_path}", file=sys.stderr)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
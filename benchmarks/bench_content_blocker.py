@@ -0,0 +1,131 @@
+# bench_content_blocker.py - 广告拦截规则的编译、缓存加载与单次判断耗时
+#
+# 用法:
+#   python benchmarks/bench_content_blocker.py                      # 生成 6 万条模拟规则
+#   python benchmarks/bench_content_blocker.py --filters easylist.txt
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_blocker import compile_filter_lists, load_filter_engine  # noqa: E402
+
+RESOURCE_TYPES = ["script", "image", "stylesheet", "xmlhttprequest", "subdocument", "other"]
+WORDS = ["ads", "banner", "track", "pixel", "analytics", "promo", "sponsor", "beacon", "metrics",
+         "widget", "static", "cdn", "img", "media", "assets", "news", "video", "user", "login", "api"]
+
+
+def random_word(rng):
+    return rng.choice(WORDS) + "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(4))
+
+
+def generate_filter_list(rule_count, rng):
+    """生成与 EasyList 结构相近的模拟规则：以主机名规则为主，夹杂路径、通配符、选项和例外规则"""
+    lines = ["[Adblock Plus 2.0]", "! Title: 模拟规则"]
+    for i in range(rule_count):
+        roll = rng.random()
+        host = f"{random_word(rng)}.{random_word(rng)}.com"
+        if roll < 0.55:
+            lines.append(f"||{host}^")
+        elif roll < 0.65:
+            lines.append(f"||{host}^$third-party")
+        elif roll < 0.80:
+            lines.append(f"/{random_word(rng)}/{random_word(rng)}.")
+        elif roll < 0.88:
+            lines.append(f"||{host}/{random_word(rng)}/*/{random_word(rng)}$script,image")
+        elif roll < 0.92:
+            lines.append(f"@@||{host}^$domain={random_word(rng)}.org")
+        elif roll < 0.97:
+            lines.append(f"{random_word(rng)}.com##.{random_word(rng)}")
+        else:
+            lines.append(f"&{random_word(rng)}_id=")
+    return "\n".join(lines), lines
+
+
+def generate_requests(lines, request_count, rng):
+    """一半请求指向规则中的主机名，另一半是普通网址"""
+    hosts = [line[2:].rstrip("^") for line in lines if line.startswith("||") and line.endswith("^")]
+    requests = []
+    for _ in range(request_count):
+        if hosts and rng.random() < 0.3:
+            host = rng.choice(hosts)
+        else:
+            host = f"www.{random_word(rng)}.net"
+        path = "/".join(random_word(rng) for _ in range(rng.randint(1, 4)))
+        url = f"https://{host}/{path}.js?v={rng.randint(1, 99999)}"
+        requests.append((url, host, "www.example.net", rng.choice(RESOURCE_TYPES)))
+    return requests
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="广告拦截引擎微基准")
+    parser.add_argument("--filters", help="真实的规则文件（如 easylist.txt），不指定时生成模拟规则")
+    parser.add_argument("--rules", type=int, default=60000, help="模拟规则数量")
+    parser.add_argument("--requests", type=int, default=20000, help="判断的请求数量")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.filters:
+            filter_path = args.filters
+            with open(filter_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        else:
+            text, lines = generate_filter_list(args.rules, rng)
+            filter_path = os.path.join(tmp_dir, "filters.txt")
+            with open(filter_path, "w", encoding="utf-8") as f:
+                f.write(text)
+        cache_path = os.path.join(tmp_dir, "filters.compiled")
+
+        started = time.perf_counter()
+        engine = compile_filter_lists([filter_path])
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        load_filter_engine([filter_path], cache_path)   # 写入缓存
+        started = time.perf_counter()
+        engine = load_filter_engine([filter_path], cache_path)
+        cache_load_ms = (time.perf_counter() - started) * 1000
+
+    requests = generate_requests(lines, args.requests, rng)
+    timings = []
+    blocked = 0
+    check = engine.check
+    perf_counter = time.perf_counter
+    for url, host, first_party, resource_type in requests:
+        started = perf_counter()
+        result = check(url, host, first_party, resource_type)
+        timings.append((perf_counter() - started) * 1e6)
+        if result is not None:
+            blocked += 1
+
+    result = {
+        "filter_lines": len(lines),
+        "engine": engine.stats(),
+        "compile_ms": round(compile_ms, 1),
+        "cache_load_ms": round(cache_load_ms, 1),
+        "requests": len(requests),
+        "blocked": blocked,
+        "mean_us": round(sum(timings) / len(timings), 2),
+        "p50_us": round(percentile(timings, 0.5), 2),
+        "p99_us": round(percentile(timings, 0.99), 2),
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# fixture_server.py - 基准测试用的本地 HTTP 服务器（可配置延迟，不依赖外部网络）
+#
+# 用法:
+#   python benchmarks/fixture_server.py --port 8000 --latency-ms 50
+#
+# 路径:
+#   /page/<n>          带标题、样式表、图片和图标的测试页面
+#   /style/<n>.css     页面引用的样式表
+#   /image/<n>.svg     页面引用的图片
+#   /favicon.ico       网站图标
+# 任何路径都可以加 ?latency=毫秒 覆盖全局延迟
+import sys
+import time
+import struct
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PARAGRAPH = ("烈焰浏览器基准测试页面。" * 8 + "\n") * 4
+
+
+def make_favicon():
+    """16x16 的单色 ICO（32 位 BMP）"""
+    pixels = b"\x20\x60\xf0\xff" * 256
+    mask = b"\x00" * 64
+    bitmap = struct.pack("<IiiHHIIiiII", 40, 16, 32, 1, 32, 0, len(pixels), 0, 0, 0, 0) + pixels + mask
+    return struct.pack("<HHH", 0, 1, 1) + struct.pack("<BBBBHHII", 16, 16, 0, 0, 1, 32, len(bitmap), 22) + bitmap
+
+
+FAVICON = make_favicon()
+
+
+def render_page(number):
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Fixture {number}</title>
+<link rel="stylesheet" href="/style/{number}.css">
+<link rel="icon" href="/favicon.ico"></head>
+<body><h1>Fixture {number}</h1>
+<img src="/image/{number}.svg" width="320" height="180">
+{"".join(f"<p>{PARAGRAPH}</p>" for _ in range(20))}
+<a href="/page/{number + 1}">下一页</a>
+</body></html>""".encode("utf-8")
+
+
+def render_style(number):
+    hue = number * 37 % 360
+    return f"body {{ font-family: sans-serif; margin: 24px; }} h1 {{ color: hsl({hue}, 60%, 40%); }}".encode()
+
+
+def render_image(number):
+    hue = number * 37 % 360
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="320" height="180">'
+            f'<rect width="320" height="180" fill="hsl({hue}, 70%, 60%)"/>'
+            f'<text x="20" y="100" font-size="48">#{number}</text></svg>').encode()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        latency_ms = float(query.get("latency", [self.server.latency_ms])[0])
+        if latency_ms > 0:
+            time.sleep(latency_ms / 1000)
+
+        segments = [segment for segment in parts.path.split("/") if segment]
+        try:
+            if parts.path == "/favicon.ico":
+                self.send_body(FAVICON, "image/x-icon")
+            elif len(segments) == 2 and segments[0] == "page":
+                self.send_body(render_page(int(segments[1])), "text/html; charset=utf-8")
+            elif len(segments) == 2 and segments[0] == "style":
+                self.send_body(render_style(int(segments[1].split(".")[0])), "text/css")
+            elif len(segments) == 2 and segments[0] == "image":
+                self.send_body(render_image(int(segments[1].split(".")[0])), "image/svg+xml")
+            else:
+                self.send_error(404)
+        except ValueError:
+            self.send_error(400)
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureServer:
+    """在后台线程中运行的测试服务器"""
+
+    def __init__(self, latency_ms=0, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency_ms = latency_ms
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_url(self, number):
+        return f"{self.base_url}/page/{number}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="基准测试用的本地 HTTP 服务器")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = FixtureServer(args.latency_ms, port=args.port).start()
+    print(f"测试服务器: {server.base_url}/page/1 (延迟 {args.latency_ms} ms)", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# bookmarks.py - 书签（文件夹树 + 规范化网址哈希索引 + 后台原子保存）
+import os
+import json
+import time
+import threading
+from urllib.parse import urlsplit, urlunsplit
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from config import get_data_path
+from debounced_saver import DebouncedSaver
+
+BOOKMARKS_FILE_NAME = "bookmarks.json"
+
+# 磁盘格式（紧凑的嵌套数组）：
+#   文件夹 ["f", 名称, [子节点...]]
+#   书签   ["b", 标题, 网址, 添加时间]
+NODE_FOLDER = "f"
+NODE_BOOKMARK = "b"
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """规范化网址：协议和主机名小写、去掉默认端口和锚点、空路径补为 /"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+    if not parts.netloc:
+        return urlunsplit((scheme, "", parts.path, parts.query, ""))
+
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+class BookmarkStore(QObject):
+    """书签存储：文件夹树保存在磁盘上，内存中维护规范化网址到书签数量的哈希索引"""
+
+    # 定义信号
+    bookmarks_changed = pyqtSignal()
+
+    def __init__(self, path=None, parent=None):
+        super().__init__(parent)
+        self.path = path or get_data_path(BOOKMARKS_FILE_NAME)
+        self.lock = threading.Lock()   # 保存线程序列化时防止树被修改
+        self.root = [NODE_FOLDER, "书签栏", []]
+        self.url_index = {}            # 规范化网址 -> 书签数量
+        self.dirty = False
+        self.load()
+
+        self.saver = DebouncedSaver(self)
+        self.saver.start()
+
+    def load(self):
+        """读取书签文件并建立索引"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                root = json.load(f)
+            if isinstance(root, list) and root and root[0] == NODE_FOLDER:
+                self.root = root
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"书签文件读取失败: {e}")
+        self.rebuild_index()
+
+    def rebuild_index(self):
+        self.url_index = {}
+        for node in self.iter_bookmarks():
+            key = normalize_url(node[2])
+            self.url_index[key] = self.url_index.get(key, 0) + 1
+
+    def iter_bookmarks(self, folder=None):
+        """遍历某个文件夹（默认根目录）下的全部书签"""
+        stack = [folder or self.root]
+        while stack:
+            for child in stack.pop()[2]:
+                if child[0] == NODE_FOLDER:
+                    stack.append(child)
+                else:
+                    yield child
+
+    def is_bookmarked(self, url):
+        """O(1) 判断网址是否已收藏"""
+        return normalize_url(url) in self.url_index
+
+    def find_folder(self, path):
+        """按名称路径查找文件夹，不存在时创建"""
+        folder = self.root
+        for name in path or ():
+            for child in folder[2]:
+                if child[0] == NODE_FOLDER and child[1] == name:
+                    folder = child
+                    break
+            else:
+                child = [NODE_FOLDER, name, []]
+                folder[2].append(child)
+                folder = child
+        return folder
+
+    def add_bookmark(self, url, title="", folder_path=None):
+        """添加书签"""
+        with self.lock:
+            folder = self.find_folder(folder_path)
+            folder[2].append([NODE_BOOKMARK, title or url, url, int(time.time())])
+            key = normalize_url(url)
+            self.url_index[key] = self.url_index.get(key, 0) + 1
+        self.schedule_save()
+
+    def remove_bookmark(self, url):
+        """删除指向该网址的全部书签"""
+        key = normalize_url(url)
+        if key not in self.url_index:
+            return
+        with self.lock:
+            stack = [self.root]
+            while stack:
+                folder = stack.pop()
+                folder[2][:] = [child for child in folder[2]
+                                if child[0] == NODE_FOLDER or normalize_url(child[2]) != key]
+                stack.extend(child for child in folder[2] if child[0] == NODE_FOLDER)
+            del self.url_index[key]
+        self.schedule_save()
+
+    def toggle_bookmark(self, url, title=""):
+        """切换收藏状态，返回切换后是否已收藏"""
+        if self.is_bookmarked(url):
+            self.remove_bookmark(url)
+            return False
+        self.add_bookmark(url, title)
+        return True
+
+    def schedule_save(self):
+        self.dirty = True
+        self.bookmarks_changed.emit()
+        self.saver.request_save()
+
+    def write_to_disk(self):
+        """在保存线程中调用：序列化后原子替换书签文件"""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = json.dumps(self.root, ensure_ascii=False, separators=(",", ":"))
+            self.dirty = False
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.dirty = True
+            print(f"书签保存失败: {e}")
+
+    def close(self):
+        """退出时调用，确保最后的修改写入磁盘"""
+        if self.saver.isRunning():
+            self.saver.stop()
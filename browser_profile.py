@@ -0,0 +1,79 @@
+# browser_profile.py - 全局共享的浏览器配置文件（缓存、Cookie、默认字体）
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile, QWebEngineSettings
+
+from config import get_config, get_data_path
+
+# 配置文件名称，决定磁盘上的存储目录
+PROFILE_NAME = "default"
+
+DEFAULT_PROFILE_SETTINGS = {
+    "cache_type": "disk",            # disk / memory / none
+    "cache_size_mb": 256,            # 0 表示由 Chromium 自动决定
+    "cache_path": "",                # 为空时使用数据目录下的 cache
+    "persistent_cookies": "allow",   # allow / force / none
+    "font_family": "Microsoft YaHei",
+    "default_font_size": 14,
+}
+
+CACHE_TYPES = {
+    "disk": QWebEngineProfile.DiskHttpCache,
+    "memory": QWebEngineProfile.MemoryHttpCache,
+    "none": QWebEngineProfile.NoCache,
+}
+
+COOKIE_POLICIES = {
+    "allow": QWebEngineProfile.AllowPersistentCookies,
+    "force": QWebEngineProfile.ForcePersistentCookies,
+    "none": QWebEngineProfile.NoPersistentCookies,
+}
+
+_browser_profile = None
+
+
+class BrowserProfile(QWebEngineProfile):
+    """持久化的浏览器配置文件，所有标签页共用"""
+    
+    def __init__(self, name=PROFILE_NAME, parent=None):
+        super().__init__(name, parent)
+        self.options = get_config("profile", DEFAULT_PROFILE_SETTINGS)
+        self.apply_storage_options()
+        self.apply_default_fonts()
+    
+    def apply_storage_options(self):
+        """设置磁盘缓存和 Cookie 策略"""
+        storage_path = get_data_path("profiles", self.storageName(), "storage")
+        cache_path = self.options["cache_path"] or get_data_path("profiles", self.storageName(), "cache")
+        
+        self.setPersistentStoragePath(storage_path)
+        self.setCachePath(cache_path)
+        self.setHttpCacheType(CACHE_TYPES.get(self.options["cache_type"], QWebEngineProfile.DiskHttpCache))
+        self.setHttpCacheMaximumSize(int(self.options["cache_size_mb"]) * 1024 * 1024)
+        self.setPersistentCookiesPolicy(
+            COOKIE_POLICIES.get(self.options["persistent_cookies"], QWebEngineProfile.AllowPersistentCookies))
+    
+    def apply_default_fonts(self):
+        """默认字体只在配置文件上设置一次，所有页面继承"""
+        settings = self.settings()
+        font_family = self.options["font_family"]
+        settings.setFontFamily(QWebEngineSettings.StandardFont, font_family)
+        settings.setFontFamily(QWebEngineSettings.SerifFont, font_family)
+        settings.setFontFamily(QWebEngineSettings.SansSerifFont, font_family)
+        settings.setFontSize(QWebEngineSettings.DefaultFontSize, int(self.options["default_font_size"]))
+    
+    def cache_info(self):
+        """返回当前缓存配置，便于调试"""
+        return {
+            "cache_path": self.cachePath(),
+            "cache_type": self.options["cache_type"],
+            "cache_size_bytes": self.httpCacheMaximumSize(),
+            "storage_path": self.persistentStoragePath(),
+            "persistent_cookies": self.options["persistent_cookies"],
+        }
+
+
+def get_browser_profile():
+    """获取应用级共享配置文件（首次调用时创建）"""
+    global _browser_profile
+    if _browser_profile is None:
+        _browser_profile = BrowserProfile()
+    return _browser_profile
@@ -1,13 +1,30 @@
-import sys
-from PyQt5.QtCore import *
-from PyQt5.QtWidgets import *
-from PyQt5.QtWebEngineWidgets import *
+from PyQt5.QtCore import QEvent, QTimer, QUrl
+from PyQt5.QtWidgets import (QApplication, QLineEdit, QMainWindow, QProgressBar, QPushButton, QShortcut,
+                             QSizePolicy, QToolBar, QVBoxLayout, QWidget)
 from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
 
-from tab_widget import AnimatedTabWidget
-from web_view import FadeWebEngineView
-from dialogs import AboutDialog, AuthorDialog
-from styles import get_main_window_style, get_toolbar_button_style, get_url_bar_style
+from tab_widget import AnimatedTabWidget, PlaceholderTab
+from tab_state import TabState, TabUIUpdater
+from web_view import BrowserPage, FadeWebEngineView
+from browser_profile import get_browser_profile
+from tab_lifecycle import TabLifecycleManager
+from session_journal import SessionJournal
+from omnibox import OmniboxCompleter
+from bookmarks import BookmarkStore
+from content_blocker import ContentBlocker
+from speculative import SpeculativeNavigator
+from download_manager import DownloadManager, format_bytes
+from memory_governor import MemoryGovernor
+from thumbnails import TabHoverPreview, ThumbnailStore
+from favicons import FaviconStore
+from search_suggest import SearchSuggestProvider, get_default_engine, select_engine
+from history import (HistoryStore, should_record, TRANSITION_LINK, TRANSITION_TYPED, TRANSITION_SEARCH,
+                     TRANSITION_RELOAD, TRANSITION_HOME, TRANSITION_RESTORE)
+from styles import THEMES, apply_theme, get_current_theme, set_widget_variant
+from startup_trace import get_startup_trace
+from tracing import counter, get_tracer, instant, start_tracing, traced
+from config import get_config
 
 class PyroBrowser(QMainWindow):
     def __init__(self):
@@ -15,23 +32,81 @@ class PyroBrowser(QMainWindow):
         self.setWindowTitle("烈焰浏览器")
         self.setGeometry(100, 100, 1400, 900)
         
-        # 设置Edge风格的深色主题
-        self.set_modern_dark_theme()
+        # 应用级样式表（main.py 通常已经设置过，这里确保直接创建窗口时也有主题）
+        if get_current_theme() is None:
+            apply_theme(QApplication.instance())
+        
+        # 后台标签页冻结/丢弃管理
+        self.lifecycle_manager = TabLifecycleManager(self)
+        self.lifecycle_manager.state_changed.connect(
+            lambda view, state: instant("lifecycle", "tab", tab=getattr(view, "tab_id", None), state=state))
+        
+        # 会话日志，用于崩溃或关闭后恢复标签页
+        self.session_journal = SessionJournal(self)
+        
+        # 浏览历史记录
+        self.history = HistoryStore(self)
+        
+        # 书签
+        self.bookmarks = BookmarkStore(parent=self)
+        
+        # 广告与跟踪器拦截（规则在首次绘制后于后台加载）
+        self.content_blocker = ContentBlocker(self)
+        
+        # 预测导航：悬停的链接只预解析主机名，地址栏首个候选在隐藏页面中预渲染
+        self.speculation = SpeculativeNavigator(self.create_page, self)
+        
+        # 下载管理：排队、限速，进度合并后再刷新界面
+        self.download_manager = DownloadManager(self)
+        self.download_manager.entries_updated.connect(self.update_download_button)
+        self.download_manager.entry_added.connect(self.on_download_added)
+        
+        # 内存紧张时逐级释放缓存和后台标签页
+        self.memory_governor = MemoryGovernor(self, self)
+        self.memory_governor.register_cache("filter_regex", self.content_blocker.trim_memory)
+        self.memory_governor.register_cache("prerenders", self.speculation.release_memory)
+        
+        # 网站图标：按内容去重，标签栏、地址栏候选共用同一份解码后的图标
+        self.favicons = FaviconStore(self)
+        self.memory_governor.register_cache("favicons", self.favicons.trim)
         
         # 创建动画标签页系统
         self.tab_widget = AnimatedTabWidget()
         self.tab_widget.setTabsClosable(True)
+        self.tab_widget.setMovable(True)
         self.tab_widget.tabCloseRequested.connect(self.close_tab)
+        self.tab_widget.tabBar().tabMoved.connect(self.session_journal.record_move)
         
-        # 创建第一个标签页
-        self.add_new_tab("https://www.bing.com", "必应首页")
+        # 标签页缩略图：切走前和加载完成后截取可见标签页，用于悬停预览和标签页概览
+        self.thumbnails = ThumbnailStore(self)
+        self.tab_widget.current_about_to_change.connect(self.thumbnails.capture)
+        self.memory_governor.register_cache("thumbnails", self.thumbnails.trim)
+        if self.thumbnails.enabled and self.thumbnails.settings["hover_preview"]:
+            self.tab_preview = TabHoverPreview(self.tab_widget, self.thumbnails)
+        self.tab_overview = None
+        
+        # 各标签页的状态变化合并后每帧最多刷新一次界面
+        self.ui_updater = TabUIUpdater(self)
         
         # 创建现代化的地址栏
         self.url_bar = QLineEdit()
-        self.url_bar.setPlaceholderText("在必应中搜索或输入网址")
-        self.url_bar.setStyleSheet(get_url_bar_style())
+        self.url_bar.setPlaceholderText(f"在{get_default_engine().display_name}中搜索或输入网址")
+        self.url_bar.setObjectName("urlBar")
         self.url_bar.returnPressed.connect(self.navigate_to_url)
         
+        # 地址栏自动补全（按 frecency 排序的历史记录，首次绘制后再加载索引）
+        self.omnibox = OmniboxCompleter(self.url_bar, parent=self)
+        self.omnibox.suggestion_activated.connect(self.open_suggestion)
+        self.omnibox.top_candidate_changed.connect(self.speculation.on_omnibox_candidate)
+        self.omnibox.model.icon_provider = self.favicons.icon_for_url
+        
+        # 搜索建议异步获取，结果追加到自动补全列表中
+        self.search_suggest = SearchSuggestProvider(self)
+        self.search_suggest.suggestions_ready.connect(self.omnibox.add_search_suggestions)
+        self.memory_governor.register_cache("search_suggestions", self.search_suggest.clear_cache)
+        self.url_bar.textEdited.connect(
+            lambda text: self.search_suggest.request(text, select_engine(self.get_current_url())))
+        
         # 创建现代化的导航按钮
         后退按钮 = self.create_styled_button("←", "后退")
         后退按钮.clicked.connect(self.go_back)
@@ -49,24 +124,26 @@ class PyroBrowser(QMainWindow):
         搜索按钮 = self.create_styled_button("🔍", "搜索")
         搜索按钮.clicked.connect(self.navigate_to_url)
         
+        # 创建收藏按钮
+        self.bookmark_button = self.create_styled_button("☆", "收藏此页")
+        self.bookmark_button.clicked.connect(self.toggle_bookmark)
+        
+        # 创建拦截计数按钮，点击开关广告拦截
+        self.blocker_button = self.create_styled_button("🛡", "")
+        self.blocker_button.clicked.connect(self.toggle_content_blocking)
+        if not self.content_blocker.enabled:
+            self.blocker_button.setProperty("variant", "off")
+        self.update_blocked_count(0)
+        
+        # 创建下载按钮，显示进行中的下载数
+        self.download_button = self.create_styled_button("⬇", "下载")
+        self.download_button.clicked.connect(self.show_downloads)
+        
         # 创建进度条
         self.progress = QProgressBar()
         self.progress.setMaximumHeight(3)
         self.progress.setVisible(False)
-        self.progress.setStyleSheet("""
-            QProgressBar {
-                border: none;
-                background: transparent;
-                border-radius: 0px;
-            }
-            QProgressBar::chunk {
-                background: qlineargradient(
-                    x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #0078d4, stop:1 #00bcf2
-                );
-                border-radius: 0px;
-            }
-        """)
+        self.progress.setObjectName("pageProgress")
         
         # 创建新标签页按钮
         新标签按钮 = self.create_styled_button("+", "新建标签页")
@@ -83,15 +160,7 @@ class PyroBrowser(QMainWindow):
         # 创建工具栏
         toolbar = QToolBar()
         toolbar.setMovable(False)
-        toolbar.setStyleSheet("""
-            QToolBar {
-                background: #2d2d2d;
-                border: none;
-                border-bottom: 1px solid #3c3c3c;
-                padding: 6px 8px;
-                spacing: 4px;
-            }
-        """)
+        toolbar.setObjectName("mainToolbar")
         self.addToolBar(toolbar)
         
         # 添加组件到工具栏
@@ -102,6 +171,9 @@ class PyroBrowser(QMainWindow):
         toolbar.addSeparator()
         toolbar.addWidget(self.url_bar)
         toolbar.addWidget(搜索按钮)
+        toolbar.addWidget(self.bookmark_button)
+        toolbar.addWidget(self.blocker_button)
+        toolbar.addWidget(self.download_button)
         toolbar.addSeparator()
         toolbar.addWidget(新标签按钮)
         toolbar.addWidget(关闭网页按钮)  # 添加关闭网页按钮
@@ -131,44 +203,336 @@ class PyroBrowser(QMainWindow):
         # 添加快捷键
         self.setup_shortcuts()
         
+        # 窗口首次绘制后再创建网页视图，先让窗口框架尽快显示出来
+        self.first_paint_done = False
+        
+        # 任务管理器在首次打开时创建
+        self.task_manager = None
+        
+        # 下载面板在首次打开时创建
+        self.downloads_dialog = None
+        
+    @property
+    def profile(self):
+        """所有标签页共用的持久化配置文件（首次使用时创建）"""
+        return get_browser_profile()
+    
+    def event(self, event):
+        if not self.first_paint_done and event.type() == QEvent.Paint:
+            self.first_paint_done = True
+            get_startup_trace().mark("first_paint")
+            QTimer.singleShot(0, self.on_first_paint)
+        return super().event(event)
+    
+    def changeEvent(self, event):
+        # 窗口失去焦点时截取当前标签页
+        if event.type() == QEvent.ActivationChange and not self.isActiveWindow():
+            self.thumbnails.capture(self.current_browser())
+        super().changeEvent(event)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 某些平台上主窗口本身收不到绘制事件，超时后同样开始加载
+        QTimer.singleShot(200, self.on_first_paint)
+    
+    def on_first_paint(self):
+        """窗口框架显示后恢复会话并创建第一个网页视图"""
+        if self.tab_widget.count() > 0:
+            return
+        trace = get_startup_trace()
+        self.content_blocker.load()
+        self.download_manager.attach(self.profile)
+        self.restore_session()
+        trace.mark("first_view_created")
+        self.thumbnails.prune(self.tab_widget.widget(i).tab_id for i in range(self.tab_widget.count()))
+        self.omnibox.load_from_history(self.history)
+        # 网页一直没有加载完成时也输出计时
+        QTimer.singleShot(15000, trace.report)
+        self.schedule_update_check()
+        self.memory_governor.start()
+    
+    def schedule_update_check(self):
+        """启动一段时间后静默检查更新，关于对话框打开时即可直接使用缓存结果"""
+        from update_checker import DEFAULT_UPDATE_SETTINGS
+        settings = get_config("updates", DEFAULT_UPDATE_SETTINGS)
+        if settings["check_on_startup"]:
+            QTimer.singleShot(int(settings["startup_delay_seconds"] * 1000), self.check_updates_quietly)
+    
+    def check_updates_quietly(self):
+        from update_checker import get_update_checker
+        checker = get_update_checker()
+        if not checker.is_cache_fresh():
+            checker.update_available.connect(self.on_quiet_update_available)
+            checker.no_update.connect(self.end_quiet_update_check)
+            checker.check_failed.connect(self.end_quiet_update_check)
+            checker.check()
+    
+    def end_quiet_update_check(self, *args):
+        """静默检查得出任何结果后都断开连接，之后在“关于”中手动检查不会再触发状态栏提示"""
+        from update_checker import get_update_checker
+        checker = get_update_checker()
+        for signal, slot in ((checker.update_available, self.on_quiet_update_available),
+                             (checker.no_update, self.end_quiet_update_check),
+                             (checker.check_failed, self.end_quiet_update_check)):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
+    
+    def on_quiet_update_available(self, version_info):
+        """静默检查发现新版本时只在状态栏提示一次"""
+        self.end_quiet_update_check()
+        self.statusBar().showMessage(
+            f"发现新版本 {version_info.get('latest_version', '')}，可在“关于”中下载更新", 10000)
+    
     def show_about(self):
+        # 对话框和更新检查模块在首次使用时才导入
+        from dialogs import AboutDialog
         about_dialog = AboutDialog(self)
         about_dialog.exec_()
+    
+    def show_task_manager(self):
+        """显示任务管理器（非模态，重复打开时复用同一个窗口）"""
+        if self.task_manager is None:
+            from task_manager import TaskManagerDialog
+            self.task_manager = TaskManagerDialog(self)
+        self.task_manager.show()
+        self.task_manager.raise_()
+        self.task_manager.activateWindow()
         
+    def show_downloads(self):
+        """显示下载面板（非模态，重复打开时复用同一个窗口）"""
+        if self.downloads_dialog is None:
+            from downloads_dialog import DownloadsDialog
+            self.downloads_dialog = DownloadsDialog(self.download_manager, self)
+        self.downloads_dialog.show()
+        self.downloads_dialog.raise_()
+        self.downloads_dialog.activateWindow()
+    
+    def show_tab_overview(self):
+        """显示所有标签页的缩略图网格"""
+        if self.tab_overview is None:
+            from tab_overview import TabOverviewDialog
+            self.tab_overview = TabOverviewDialog(self, self.thumbnails)
+        self.thumbnails.capture(self.current_browser())
+        self.tab_overview.show()
+        self.tab_overview.raise_()
+        self.tab_overview.activateWindow()
+    
+    def on_download_added(self, entry):
+        self.update_download_button()
+        self.statusBar().showMessage(f"开始下载 {entry.file_name}", 3000)
+    
+    def update_download_button(self, changed_ids=None):
+        """只在下载管理器合并后的通知中刷新，不随每个数据块重绘"""
+        pending, speed = self.download_manager.summary()
+        self.download_button.setText(str(pending) if pending else "⬇")
+        self.download_button.setToolTip(f"{pending} 个下载进行中，{format_bytes(speed)}/s" if pending else "下载")
+    
     def create_styled_button(self, text, tooltip):
         btn = QPushButton(text)
         btn.setToolTip(tooltip)
         btn.setFixedSize(32, 32)
-        btn.setStyleSheet(get_toolbar_button_style())
+        btn.setProperty("role", "toolbar-button")
         return btn
     
-    def create_browser_tab(self, url="https://www.bing.com"):
-        browser = FadeWebEngineView()
+    def create_browser_tab(self, url="https://www.bing.com", tab_id=None, transition=TRANSITION_LINK):
+        # 字体和缓存设置由共享配置文件提供，无需逐个标签页设置
+        browser = FadeWebEngineView(profile=self.profile)
         
-        # 设置网页的字体和样式
-        settings = browser.settings()
-        settings.setFontFamily(QWebEngineSettings.StandardFont, "Microsoft YaHei")
-        settings.setFontFamily(QWebEngineSettings.SerifFont, "Microsoft YaHei")
-        settings.setFontFamily(QWebEngineSettings.SansSerifFont, "Microsoft YaHei")
-        settings.setFontSize(QWebEngineSettings.DefaultFontSize, 14)
+        browser.pending_transition = transition
+        # 网址、标题、进度等先收集到标签页自己的状态中，再由界面更新器统一应用
+        browser.tab_state = TabState(browser, self.favicons)
+        # 页面加载前先显示上次记住的图标
+        browser.tab_state.icon = self.favicons.icon_for_url(url)
+        self.ui_updater.watch(browser.tab_state)
         
+        # 每个页面单独的请求拦截器，拦截计数记在标签页状态中
+        self.prepare_page(browser.page())
+        browser.page().request_interceptor.blocked_count_changed.connect(browser.tab_state.on_blocked_count_changed)
+        browser.loadFinished.connect(self.on_first_load_finished)
+        browser.loadFinished.connect(lambda ok, b=browser: self.thumbnails.schedule_capture(b))
         browser.setUrl(QUrl(url))
-        browser.urlChanged.connect(self.update_urlbar)
-        browser.loadFinished.connect(self.page_loaded)
-        browser.loadProgress.connect(self.update_progress)
-        browser.titleChanged.connect(self.update_window_title)
+        
+        # 记录到会话日志
+        browser.tab_id = tab_id if tab_id is not None else self.session_journal.new_tab_id()
+        browser.urlChanged.connect(
+            lambda q, b=browser: self.session_journal.record_navigate(b.tab_id, q.toString()))
+        browser.titleChanged.connect(
+            lambda title, b=browser: self.session_journal.record_title(b.tab_id, title))
+        
+        # 记录浏览历史
+        browser.urlChanged.connect(lambda q, b=browser: self.record_history_visit(b, q))
+        browser.titleChanged.connect(lambda title, b=browser: self.record_history_title(b, title))
+        browser.loadFinished.connect(lambda ok, b=browser: self.record_loaded_title(b))
+        self.lifecycle_manager.track(browser)
         return browser
     
+    def create_page(self):
+        """创建不属于任何标签页的页面（用于预渲染）"""
+        page = BrowserPage(self.profile)
+        self.prepare_page(page)
+        return page
+    
+    def prepare_page(self, page):
+        """为页面安装请求拦截器、导航钩子和链接悬停预测"""
+        page.request_interceptor = self.content_blocker.attach(page)
+        page.navigation_hook = self.on_navigation_request
+        page.linkHovered.connect(self.speculation.on_link_hovered)
+    
+    def on_navigation_request(self, page, url, navigation_type):
+        """点击的链接已经预渲染时取消这次导航，改为换入预渲染页面"""
+        if navigation_type != QWebEnginePage.NavigationTypeLinkClicked:
+            return False
+        url = url.toString()
+        browser = page.view()
+        if browser is None or self.tab_widget.indexOf(browser) < 0 or not self.speculation.has(url):
+            return False
+        # 不能在 acceptNavigationRequest 中替换页面，回到事件循环后再换入
+        QTimer.singleShot(0, lambda: self.swap_prerendered(browser, url, TRANSITION_LINK) or browser.setUrl(QUrl(url)))
+        return True
+    
+    def swap_prerendered(self, browser, url, transition):
+        """把预渲染好的页面换入标签页，未命中时返回 False"""
+        page, loaded = self.speculation.take(url)
+        if page is None:
+            return False
+        old_page = browser.page()
+        browser.pending_transition = transition
+        browser.setPage(page)
+        page.setParent(browser)
+        # 新页面的生命周期信号和拦截计数重新接到这个标签页
+        self.lifecycle_manager.track(browser)
+        page.request_interceptor.blocked_count_changed.connect(browser.tab_state.on_blocked_count_changed)
+        browser.tab_state.on_blocked_count_changed(page.request_interceptor.blocked_count)
+        browser.tab_state.on_icon_changed(page.icon())
+        if loaded:
+            browser.tab_state.on_load_finished(True)
+        old_page.deleteLater()
+        return True
+    
+    def record_history_visit(self, browser, q):
+        """网址变化时写入历史，来源类型由发起导航的操作决定
+
+        此时页面标题通常还是上一个页面的，先不写标题（已有记录保留原标题），
+        由 titleChanged 或加载完成时补上。
+        """
+        transition = browser.pending_transition
+        browser.pending_transition = TRANSITION_LINK
+        url = q.toString()
+        self.history.record_visit(url, "", transition)
+        if should_record(url):
+            self.omnibox.record_visit(url, "", transition)
+    
+    def record_history_title(self, browser, title):
+        url = browser.url().toString()
+        self.history.update_title(url, title)
+        self.omnibox.update_title(url, title)
+    
+    def record_loaded_title(self, browser):
+        """标题与上一个页面相同时不会触发 titleChanged，加载完成后再写一次"""
+        title = browser.title()
+        # 没有 <title> 的页面标题就是网址本身，不写入
+        if title and title != browser.url().toString():
+            self.record_history_title(browser, title)
+    
+    @traced()
     def add_new_tab(self, url="https://www.bing.com", title="新标签页"):
         browser = self.create_browser_tab(url)
-        index = self.tab_widget.addTab(browser, title)
+        index = self.tab_widget.addTab(browser, browser.tab_state.icon, title)
+        self.session_journal.record_open(browser.tab_id, index, url, title)
         self.tab_widget.setCurrentIndexWithAnimation(index)
+        counter("tabs", count=self.tab_widget.count())
         return browser
     
+    def add_lazy_tab(self, url, title="新标签页", index=-1, tab_id=None):
+        """添加占位标签页，网页视图在首次激活时才创建"""
+        placeholder = PlaceholderTab(url, title)
+        显示标题 = title[:20] + "..." if len(title) > 20 else title
+        index = self.tab_widget.insertTab(index, placeholder, self.favicons.icon_for_url(url), 显示标题)
+        self.tab_widget.setTabToolTip(index, title)
+        if tab_id is None:
+            placeholder.tab_id = self.session_journal.new_tab_id()
+            self.session_journal.record_open(placeholder.tab_id, index, url, title)
+        else:
+            # 从会话恢复的标签页已在日志中
+            placeholder.tab_id = tab_id
+        return placeholder
+    
+    def add_lazy_tabs(self, tabs, tab_ids=None):
+        """批量添加占位标签页（如恢复会话），tabs 为 (url, title) 列表"""
+        tab_ids = tab_ids or [None] * len(tabs)
+        self.tab_widget.setUpdatesEnabled(False)
+        try:
+            return [self.add_lazy_tab(url, title, tab_id=tab_id)
+                    for (url, title), tab_id in zip(tabs, tab_ids)]
+        finally:
+            self.tab_widget.setUpdatesEnabled(True)
+    
+    def restore_session(self):
+        """恢复上次的会话，没有会话时打开主页"""
+        tabs, current_id = self.session_journal.restored_tabs()
+        if not tabs:
+            self.add_new_tab("https://www.bing.com", "必应首页")
+            return
+        
+        tab_ids = [tab_id for tab_id, _, _ in tabs]
+        # 恢复期间屏蔽信号，只有最终的当前标签页会创建网页视图
+        self.tab_widget.blockSignals(True)
+        try:
+            self.add_lazy_tabs([(url, title or url) for _, url, title in tabs], tab_ids)
+            current_index = tab_ids.index(current_id) if current_id in tab_ids else 0
+            self.tab_widget.setCurrentIndex(current_index)
+        finally:
+            self.tab_widget.blockSignals(False)
+        self.tab_changed(current_index)
+    
+    @traced()
+    def materialize_tab(self, index):
+        """把占位标签页替换为真正的网页视图"""
+        placeholder = self.tab_widget.widget(index)
+        if not isinstance(placeholder, PlaceholderTab):
+            return placeholder
+        
+        browser = self.create_browser_tab(placeholder.pending_url, placeholder.tab_id, TRANSITION_RESTORE)
+        tab_text = self.tab_widget.tabText(index)
+        tab_tooltip = self.tab_widget.tabToolTip(index)
+        
+        # 替换过程中屏蔽信号，避免临时的当前标签变化触发 tab_changed
+        self.tab_widget.blockSignals(True)
+        try:
+            self.tab_widget.removeTab(index)
+            self.tab_widget.insertTab(index, browser, browser.tab_state.icon, tab_text)
+            self.tab_widget.setTabToolTip(index, tab_tooltip)
+            self.tab_widget.setCurrentIndex(index)
+        finally:
+            self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+        return browser
+    
+    def current_browser(self):
+        """返回当前的网页视图，占位标签页返回 None"""
+        current_browser = self.tab_widget.currentWidget()
+        if isinstance(current_browser, PlaceholderTab):
+            return None
+        return current_browser
+    
+    @traced()
     def close_tab(self, index):
         if self.tab_widget.count() > 1:
+            browser = self.tab_widget.widget(index)
             self.tab_widget.removeTab(index)
+            if browser:
+                self.session_journal.record_close(browser.tab_id)
+                if not isinstance(browser, PlaceholderTab):
+                    self.ui_updater.forget(browser.tab_state)
+                # removeTab 不会销毁页面，需要手动释放渲染进程
+                self.lifecycle_manager.forget(browser)
+                self.thumbnails.remove(browser.tab_id)
+                browser.deleteLater()
+            counter("tabs", count=self.tab_widget.count())
         else:
+            # 关闭最后一个标签页时保留会话，下次启动恢复
             self.close()
     
     def close_current_tab(self):
@@ -176,14 +540,18 @@ class PyroBrowser(QMainWindow):
         current_index = self.tab_widget.currentIndex()
         self.close_tab(current_index)
     
+    @traced()
     def tab_changed(self, index):
         if index >= 0:
             browser = self.tab_widget.widget(index)
+            if isinstance(browser, PlaceholderTab):
+                browser = self.materialize_tab(index)
             if browser:
-                self.update_urlbar(browser.url())
-                title = browser.page().title()
-                self.update_window_title(title)
+                self.session_journal.record_select(browser.tab_id)
+                self.lifecycle_manager.activate(browser)
+                self.ui_updater.refresh(browser.tab_state)
     
+    @traced()
     def update_window_title(self, title):
         if title:
             title = title.replace('\n', ' ').strip()
@@ -194,18 +562,21 @@ class PyroBrowser(QMainWindow):
             self.setWindowTitle("烈焰浏览器")
     
     def go_back(self):
-        current_browser = self.tab_widget.currentWidget()
+        current_browser = self.current_browser()
         if current_browser:
             current_browser.back()
     
     def go_forward(self):
-        current_browser = self.tab_widget.currentWidget()
+        current_browser = self.current_browser()
         if current_browser:
             current_browser.forward()
     
     def reload_page(self):
-        current_browser = self.tab_widget.currentWidget()
+        current_browser = self.current_browser()
         if current_browser:
+            # 刷新不会触发 urlChanged，直接记录
+            self.history.record_visit(current_browser.url().toString(),
+                                      current_browser.page().title(), TRANSITION_RELOAD)
             current_browser.reload()
     
     def previous_tab(self):
@@ -222,52 +593,108 @@ class PyroBrowser(QMainWindow):
         url = self.url_bar.text().strip()
         if not url:
             return
+        self.search_suggest.cancel()
         
-        current_url = self.get_current_url()
-        if current_url and 'bilibili.com' in current_url and not url.startswith(('http://', 'https://')):
-            if '.' not in url:
-                search_url = f'https://search.bilibili.com/all?keyword={url.replace(" ", "+")}'
-                self.load_url_in_current_tab(search_url)
-                return
-        
+        transition = TRANSITION_TYPED
         if not url.startswith(('http://', 'https://')):
             if '.' in url:
                 url = 'https://' + url
             else:
-                url = f'https://www.bing.com/search?q={url.replace(" ", "+")}'
+                # 浏览哔哩哔哩等站点时使用站内搜索，否则使用默认搜索引擎
+                url = select_engine(self.get_current_url()).search_url_for(url)
+                transition = TRANSITION_SEARCH
         
-        self.load_url_in_current_tab(url)
+        self.load_url_in_current_tab(url, transition)
+    
+    def open_suggestion(self, text):
+        """选中自动补全候选后打开：网址直接打开，搜索建议交给搜索引擎"""
+        self.url_bar.setText(text)
+        if text.startswith(('http://', 'https://')):
+            self.search_suggest.cancel()
+            self.load_url_in_current_tab(text, TRANSITION_TYPED)
+        else:
+            self.navigate_to_url()
     
     def get_current_url(self):
-        current_browser = self.tab_widget.currentWidget()
+        current_browser = self.current_browser()
         if current_browser:
             return current_browser.url().toString()
         return ""
     
-    def load_url_in_current_tab(self, url):
-        current_browser = self.tab_widget.currentWidget()
+    def load_url_in_current_tab(self, url, transition=TRANSITION_LINK):
+        current_browser = self.current_browser()
         if current_browser:
+            if self.swap_prerendered(current_browser, url, transition):
+                return
+            current_browser.pending_transition = transition
             current_browser.setUrl(QUrl(url))
     
     def navigate_home(self):
-        self.load_url_in_current_tab("https://www.bing.com")
+        self.load_url_in_current_tab("https://www.bing.com", TRANSITION_HOME)
     
+    @traced()
     def update_urlbar(self, q):
         self.url_bar.setText(q.toString())
         self.url_bar.setCursorPosition(0)
-        
-        current_browser = self.tab_widget.currentWidget()
-        if current_browser:
-            title = current_browser.page().title()
-            if title:
-                显示标题 = title[:20] + "..." if len(title) > 20 else title
-                current_index = self.tab_widget.currentIndex()
-                self.tab_widget.setTabText(current_index, 显示标题)
+        self.update_bookmark_button(q.toString())
+    
+    @traced()
+    def update_tab_title(self, index, title):
+        """更新某个标签页自己的标签文字"""
+        显示标题 = title[:20] + "..." if len(title) > 20 else title
+        self.tab_widget.setTabText(index, 显示标题)
+        self.tab_widget.setTabToolTip(index, title)
     
+    def update_bookmark_button(self, url):
+        """根据当前网址是否已收藏更新星标按钮"""
+        if self.bookmarks.is_bookmarked(url):
+            self.bookmark_button.setText("★")
+            self.bookmark_button.setToolTip("取消收藏")
+        else:
+            self.bookmark_button.setText("☆")
+            self.bookmark_button.setToolTip("收藏此页")
+    
+    def toggle_bookmark(self):
+        """收藏或取消收藏当前页面"""
+        current_browser = self.current_browser()
+        if not current_browser:
+            return
+        url = current_browser.url().toString()
+        if not url:
+            return
+        self.bookmarks.toggle_bookmark(url, current_browser.page().title())
+        self.update_bookmark_button(url)
+    
+    def update_blocked_count(self, count):
+        """显示当前标签页拦截的请求数"""
+        if not self.content_blocker.enabled:
+            self.blocker_button.setText("🛡")
+            self.blocker_button.setToolTip("广告拦截已关闭")
+            return
+        self.blocker_button.setText(("99+" if count > 99 else str(count)) if count else "🛡")
+        self.blocker_button.setToolTip(f"已拦截 {count} 个广告和跟踪请求")
+    
+    def toggle_content_blocking(self):
+        """开关广告拦截，刷新当前页面后生效"""
+        enabled = not self.content_blocker.enabled
+        self.content_blocker.set_enabled(enabled)
+        set_widget_variant(self.blocker_button, "" if enabled else "off")
+        current_browser = self.current_browser()
+        self.update_blocked_count(current_browser.tab_state.blocked if current_browser else 0)
+        self.statusBar().showMessage("广告拦截已开启" if enabled else "广告拦截已关闭", 2000)
+    
+    def on_first_load_finished(self):
+        trace = get_startup_trace()
+        if trace.elapsed("first_load_finished") is None:
+            trace.mark("first_load_finished")
+            trace.report()
+    
+    @traced()
     def page_loaded(self):
         self.progress.setVisible(False)
         self.statusBar().showMessage("页面加载完成", 2000)
     
+    @traced()
     def update_progress(self, progress):
         self.progress.setValue(progress)
         self.progress.setVisible(progress < 100)
@@ -282,11 +709,52 @@ class PyroBrowser(QMainWindow):
         QShortcut(QKeySequence("Ctrl+Tab"), self).activated.connect(self.next_tab)
         QShortcut(QKeySequence("Ctrl+Shift+Tab"), self).activated.connect(self.previous_tab)
         QShortcut(QKeySequence("F1"), self).activated.connect(self.show_about)
+        QShortcut(QKeySequence("Ctrl+D"), self).activated.connect(self.toggle_bookmark)
+        QShortcut(QKeySequence("Ctrl+Shift+L"), self).activated.connect(self.toggle_theme)
+        QShortcut(QKeySequence("Shift+Esc"), self).activated.connect(self.show_task_manager)
+        QShortcut(QKeySequence("Ctrl+J"), self).activated.connect(self.show_downloads)
+        QShortcut(QKeySequence("Ctrl+Shift+A"), self).activated.connect(self.show_tab_overview)
+        QShortcut(QKeySequence("Ctrl+Shift+E"), self).activated.connect(self.toggle_tracing)
+    
+    def toggle_tracing(self):
+        """开始记录跟踪事件；再次按下时导出为 Chrome trace JSON 并停止"""
+        tracer = get_tracer()
+        if not tracer.enabled:
+            start_tracing()
+            self.statusBar().showMessage("开始记录跟踪事件，再次按 Ctrl+Shift+E 导出", 3000)
+            return
+        path = tracer.export(tracer.output_path or None)
+        tracer.stop()
+        if path:
+            self.statusBar().showMessage(f"跟踪事件已导出到 {path}", 5000)
     
     def focus_urlbar(self):
         self.url_bar.selectAll()
         self.url_bar.setFocus()
     
-    def set_modern_dark_theme(self):
-        self.setStyleSheet(get_main_window_style())
+    def closeEvent(self, event):
+        """退出前写入最终的会话快照"""
+        if self.task_manager is not None:
+            self.task_manager.close()
+        if self.downloads_dialog is not None:
+            self.downloads_dialog.close()
+        if self.tab_overview is not None:
+            self.tab_overview.close()
+        self.memory_governor.stop()
+        self.thumbnails.close()
+        self.favicons.close()
+        self.speculation.cancel_all()
+        self.speculation.save_stats()
+        self.session_journal.close()
+        self.history.close()
+        self.bookmarks.close()
+        get_tracer().close()
+        super().closeEvent(event)
+    
+    def toggle_theme(self):
+        """在深色和浅色主题之间切换"""
+        names = list(THEMES)
+        current = get_current_theme()
+        next_theme = names[(names.index(current) + 1) % len(names)] if current in names else names[0]
+        apply_theme(QApplication.instance(), next_theme, remember=True)
         
\ No newline at end of file
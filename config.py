@@ -0,0 +1,65 @@
+# config.py - 浏览器配置与数据目录
+import os
+import json
+
+# 配置文件名
+CONFIG_FILE_NAME = "config.json"
+
+_config_cache = None
+
+
+def get_data_dir():
+    """获取浏览器数据目录（可通过环境变量 PYRO_BROWSER_HOME 覆盖）"""
+    data_dir = os.environ.get("PYRO_BROWSER_HOME") or os.path.join(os.path.expanduser("~"), ".pyro_browser")
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+
+def get_data_path(*parts):
+    """获取数据目录下的路径，自动创建上级目录"""
+    path = os.path.join(get_data_dir(), *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def load_config():
+    """读取配置文件，结果会被缓存"""
+    global _config_cache
+    if _config_cache is None:
+        try:
+            with open(get_data_path(CONFIG_FILE_NAME), "r", encoding="utf-8") as f:
+                _config_cache = json.load(f)
+        except FileNotFoundError:
+            _config_cache = {}
+        except (OSError, ValueError) as e:
+            print(f"配置文件读取失败: {e}")
+            _config_cache = {}
+    return _config_cache
+
+
+def get_config(section, defaults=None):
+    """获取某个配置节，缺失的键使用默认值补全"""
+    values = dict(defaults or {})
+    stored = load_config().get(section)
+    if isinstance(stored, dict):
+        values.update(stored)
+    return values
+
+
+def set_config(section, values):
+    """更新某个配置节并写回磁盘"""
+    config = load_config()
+    config.setdefault(section, {}).update(values)
+    save_config()
+
+
+def save_config():
+    """原子地写回配置文件"""
+    path = get_data_path(CONFIG_FILE_NAME)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(load_config(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"配置文件保存失败: {e}")
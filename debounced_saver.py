@@ -0,0 +1,41 @@
+# debounced_saver.py - 后台保存线程（合并短时间内的多次修改后再写盘）
+import time
+import threading
+from PyQt5.QtCore import QThread
+
+# 修改后等待这么久再保存，合并连续的编辑
+SAVE_DELAY = 0.5
+
+
+class DebouncedSaver(QThread):
+    """保存线程：收到保存请求后等待 delay 秒再调用 store.write_to_disk()
+
+    store.write_to_disk() 在本线程中执行，需要自己加锁取出要写的数据并原子地替换文件。
+    书签、网站图标等存储各自持有一个。
+    """
+
+    def __init__(self, store, delay=SAVE_DELAY, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.delay = delay
+        self.save_requested = threading.Event()
+        self.stopping = False
+
+    def run(self):
+        while True:
+            self.save_requested.wait()
+            if not self.stopping:
+                time.sleep(self.delay)
+            self.save_requested.clear()
+            self.store.write_to_disk()
+            if self.stopping:
+                return
+
+    def request_save(self):
+        self.save_requested.set()
+
+    def stop(self):
+        """写入最后的修改后结束线程"""
+        self.stopping = True
+        self.save_requested.set()
+        self.wait()
@@ -1,54 +1,12 @@
 import sys
-import requests
-from PyQt5.QtCore import *
-from PyQt5.QtWidgets import *
-from PyQt5.QtGui import *
-from PyQt5.QtWebEngineWidgets import *
+from PyQt5.QtCore import Qt, QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt5.QtWidgets import (QDialog, QFrame, QGridLayout, QHBoxLayout, QLabel, QMessageBox,
+                             QProgressBar, QPushButton, QScrollArea, QTextEdit, QVBoxLayout, QWidget)
 
-class UpdateChecker(QThread):
-    """版本检查线程"""
-    
-    # 定义信号
-    update_available = pyqtSignal(dict)  # 有新版本可用
-    no_update = pyqtSignal()             # 已是最新版本
-    check_failed = pyqtSignal(str)       # 检查失败
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.timeout = 10  # 10秒超时
-    
-    def run(self):
-        """执行版本检查"""
-        try:
-            # 模拟版本检查（实际使用时需要配置真实的URL）
-            # 这里使用模拟数据来演示功能
-            self.msleep(2000)  # 模拟网络延迟
-            
-            # 模拟版本信息（50%概率显示有更新）
-            import random
-            if random.random() > 0.5:
-                # 模拟有新版本
-                version_info = {
-                    "latest_version": "2.2.0",
-                    "release_date": "2024-12-15",
-                    "download_url": "https://github.com/your-username/pyro-browser/releases/latest",
-                    "changelog": "https://github.com/your-username/pyro-browser/blob/main/CHANGELOG.md",
-                    "update_priority": "normal",
-                    "changes": [
-                        "新增：自动更新检查功能",
-                        "优化：关于对话框滚动体验",
-                        "修复：已知的性能问题",
-                        "改进：标签页管理逻辑",
-                        "增强：浏览器稳定性"
-                    ]
-                }
-                self.update_available.emit(version_info)
-            else:
-                # 模拟已是最新版本
-                self.no_update.emit()
-                
-        except Exception as e:
-            self.check_failed.emit(f"检查更新时发生错误: {str(e)}")
+from styles import set_widget_variant
+from update_checker import compare_versions, get_update_checker
+from update_downloader import UpdateDownloader
+from version import CURRENT_VERSION, RELEASE_DATE
 
 class AuthorDialog(QDialog):
     def __init__(self, parent=None):
@@ -57,49 +15,7 @@ class AuthorDialog(QDialog):
         self.setWindowTitle("关于开发者")
         self.setFixedSize(500, 450)
         
-        self.setStyleSheet("""
-            QDialog {
-                background: #202020;
-                color: #ffffff;
-                border: 1px solid #3c3c3c;
-                border-radius: 8px;
-                font-family: "Microsoft YaHei", "Segoe UI", Arial, sans-serif;
-            }
-            QLabel {
-                color: #ffffff;
-                background: transparent;
-                font-family: "Microsoft YaHei", "Segoe UI", Arial, sans-serif;
-            }
-            QPushButton {
-                background: #0078d4;
-                border: 1px solid #0078d4;
-                border-radius: 6px;
-                color: white;
-                padding: 10px 16px;
-                font-size: 13px;
-                font-weight: bold;
-                margin: 6px;
-                font-family: "Microsoft YaHei", "Segoe UI", Arial, sans-serif;
-                min-height: 18px;
-            }
-            QPushButton:hover {
-                background: #106ebe;
-                border-color: #106ebe;
-            }
-            QPushButton:pressed {
-                background: #005a9e;
-                border-color: #005a9e;
-            }
-            QPushButton.link-button {
-                background: transparent;
-                border: 1px solid #0078d4;
-                color: #0078d4;
-                padding: 8px 12px;
-            }
-            QPushButton.link-button:hover {
-                background: rgba(0, 120, 212, 0.1);
-            }
-        """)
+        self.setObjectName("authorDialog")
         
         self.init_ui()
         
@@ -110,7 +26,7 @@ class AuthorDialog(QDialog):
         
         # 标题
         title_label = QLabel("👨‍💻 开发者信息")
-        title_label.setStyleSheet("font-size: 24px; font-weight: bold; color: #ffffff; margin-bottom: 10px;")
+        title_label.setProperty("role", "dialog-title")
         title_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(title_label)
         
@@ -119,20 +35,20 @@ class AuthorDialog(QDialog):
         
         # 头像区域
         avatar_label = QLabel("💻")
-        avatar_label.setStyleSheet("font-size: 64px; margin-right: 20px;")
+        avatar_label.setProperty("role", "avatar")
         avatar_label.setAlignment(Qt.AlignCenter)
         developer_info_layout.addWidget(avatar_label)
         
         # 基本信息
         info_layout = QVBoxLayout()
         name_label = QLabel("一只苦力怕")
-        name_label.setStyleSheet("font-size: 20px; font-weight: bold; color: #ffffff; margin-bottom: 5px;")
+        name_label.setProperty("role", "name")
         
         role_label = QLabel("全栈开发者 & 开源爱好者")
-        role_label.setStyleSheet("font-size: 14px; color: #cccccc; margin-bottom: 10px;")
+        role_label.setProperty("role", "subtitle")
         
         desc_label = QLabel("专注于 Python 桌面应用开发，热爱开源技术，致力于创造优秀的用户体验。")
-        desc_label.setStyleSheet("font-size: 13px; color: #aaaaaa; line-height: 1.5;")
+        desc_label.setProperty("role", "description")
         desc_label.setWordWrap(True)
         
         info_layout.addWidget(name_label)
@@ -146,20 +62,20 @@ class AuthorDialog(QDialog):
         # 分隔线
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
-        separator.setStyleSheet("background: #3c3c3c; margin: 15px 0;")
+        separator.setProperty("role", "separator")
         separator.setFixedHeight(1)
         layout.addWidget(separator)
         
         # 技术栈
         tech_label = QLabel("🛠️ 技术栈")
-        tech_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #ffffff; margin-bottom: 8px;")
+        tech_label.setProperty("role", "section-title")
         layout.addWidget(tech_label)
         
         tech_skills = QLabel(
             "Python • PyQt5 • QtWebEngine • JavaScript • HTML/CSS • \n"
             "Git • 开源项目维护 • 跨平台开发"
         )
-        tech_skills.setStyleSheet("font-size: 13px; color: #cccccc; background: #2d2d2d; padding: 12px; border-radius: 6px; line-height: 1.6;")
+        tech_skills.setProperty("role", "chip-block")
         tech_skills.setWordWrap(True)
         layout.addWidget(tech_skills)
         
@@ -169,12 +85,12 @@ class AuthorDialog(QDialog):
         bilibili_btn = QPushButton("📺 B站主页")
         bilibili_btn.setCursor(Qt.PointingHandCursor)
         bilibili_btn.clicked.connect(self.open_bilibili)
-        bilibili_btn.setStyleSheet("QPushButton { background: #fb7299; border-color: #fb7299; } QPushButton:hover { background: #ff8ab0; }")
+        bilibili_btn.setProperty("variant", "bilibili")
         
         github_btn = QPushButton("🐙 GitHub")
         github_btn.setCursor(Qt.PointingHandCursor)
         github_btn.clicked.connect(self.open_github)
-        github_btn.setStyleSheet("QPushButton { background: #333; border-color: #333; } QPushButton:hover { background: #555; }")
+        github_btn.setProperty("variant", "github")
         
         qq_btn = QPushButton("💬 技术交流")
         qq_btn.setCursor(Qt.PointingHandCursor)
@@ -220,105 +136,11 @@ class AboutDialog(QDialog):
         self.setWindowTitle("关于烈焰浏览器")
         self.setFixedSize(700, 600)
         
-        # 版本检查器
-        self.update_checker = None
-        
-        self.setStyleSheet("""
-            QDialog {
-                background: #202020;
-                color: #ffffff;
-                border: 1px solid #3c3c3c;
-                border-radius: 8px;
-                font-family: "Microsoft YaHei", "Segoe UI", Arial, sans-serif;
-            }
-            QScrollArea {
-                border: none;
-                background: transparent;
-            }
-            QScrollBar:vertical {
-                background: #2d2d2d;
-                width: 14px;
-                margin: 0px;
-                border-radius: 7px;
-            }
-            QScrollBar::handle:vertical {
-                background: #5e5e5e;
-                border-radius: 7px;
-                min-height: 30px;
-                margin: 2px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background: #707070;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                border: none;
-                background: none;
-                height: 0px;
-            }
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
-                background: none;
-            }
-            QLabel {
-                color: #ffffff;
-                background: transparent;
-                font-family: "Microsoft YaHei", "Segoe UI", Arial, sans-serif;
-            }
-            QPushButton {
-                background: #0078d4;
-                border: 1px solid #0078d4;
-                border-radius: 4px;
-                color: white;
-                padding: 10px 16px;
-                font-size: 13px;
-                font-weight: bold;
-                font-family: "Microsoft YaHei", "Segoe UI", Arial, sans-serif;
-                min-height: 18px;
-            }
-            QPushButton:hover {
-                background: #106ebe;
-                border-color: #106ebe;
-            }
-            QPushButton:pressed {
-                background: #005a9e;
-                border-color: #005a9e;
-            }
-            QPushButton:disabled {
-                background: #5e5e5e;
-                border-color: #5e5e5e;
-                color: #aaaaaa;
-            }
-            QPushButton.update-available {
-                background: #107c10;
-                border-color: #107c10;
-            }
-            QPushButton.update-available:hover {
-                background: #0d6b0d;
-                border-color: #0d6b0d;
-            }
-            QProgressBar {
-                border: none;
-                background: #2d2d2d;
-                border-radius: 4px;
-                text-align: center;
-                color: white;
-            }
-            QProgressBar::chunk {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #0078d4, stop:1 #00bcf2);
-                border-radius: 4px;
-            }
-            QFrame.section {
-                background: #2d2d2d;
-                border-radius: 8px;
-                border: 1px solid #3c3c3c;
-            }
-            QFrame.feature-card {
-                background: #2d2d2d;
-                border-radius: 8px;
-                border: 1px solid #3c3c3c;
-                padding: 0px;
-            }
-        """)
+        # 版本检查服务（应用级共用，启动时已在后台检查过）
+        self.update_checker = get_update_checker()
+        self.downloader = None
+        
+        self.setObjectName("aboutDialog")
         
         self.init_ui()
         
@@ -330,32 +152,20 @@ class AboutDialog(QDialog):
         # 标题栏（仿Edge）
         title_bar = QWidget()
         title_bar.setFixedHeight(45)
-        title_bar.setStyleSheet("background: #2d2d2d; border-top-left-radius: 8px; border-top-right-radius: 8px;")
+        title_bar.setObjectName("dialogTitleBar")
+        title_bar.setAttribute(Qt.WA_StyledBackground, True)
         title_layout = QHBoxLayout(title_bar)
         title_layout.setContentsMargins(20, 0, 20, 0)
         
         title_label = QLabel("关于烈焰浏览器")
-        title_label.setStyleSheet("color: #ffffff; font-size: 16px; font-weight: bold;")
+        title_label.setProperty("role", "titlebar-text")
         title_layout.addWidget(title_label)
         title_layout.addStretch()
         
         # 关闭按钮
         close_btn = QPushButton("×")
         close_btn.setFixedSize(28, 28)
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: 1px solid transparent;
-                border-radius: 4px;
-                color: #cccccc;
-                font-size: 18px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background: #e81123;
-                color: white;
-            }
-        """)
+        close_btn.setProperty("variant", "close")
         close_btn.clicked.connect(self.close)
         title_layout.addWidget(close_btn)
         
@@ -369,7 +179,7 @@ class AboutDialog(QDialog):
         
         # 创建滚动内容部件
         scroll_content = QWidget()
-        scroll_content.setStyleSheet("background: #202020;")
+        scroll_content.setObjectName("aboutScrollContent")
         content_layout = QVBoxLayout(scroll_content)
         content_layout.setContentsMargins(30, 25, 30, 25)
         content_layout.setSpacing(20)
@@ -380,13 +190,10 @@ class AboutDialog(QDialog):
         # 浏览器图标
         icon_frame = QFrame()
         icon_frame.setFixedSize(80, 80)
-        icon_frame.setStyleSheet("""
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #ff6b35, stop:1 #ff8e53); 
-            border-radius: 12px;
-        """)
+        icon_frame.setObjectName("browserIcon")
         icon_layout = QVBoxLayout(icon_frame)
         icon_label = QLabel("🌋")
-        icon_label.setStyleSheet("font-size: 40px;")
+        icon_label.setProperty("role", "app-icon")
         icon_label.setAlignment(Qt.AlignCenter)
         icon_layout.addWidget(icon_label)
         
@@ -396,21 +203,14 @@ class AboutDialog(QDialog):
         # 名称和版本信息
         name_layout = QVBoxLayout()
         name_label = QLabel("烈焰浏览器")
-        name_label.setStyleSheet("font-size: 28px; font-weight: bold; color: #ffffff; margin-bottom: 5px;")
+        name_label.setProperty("role", "app-name")
         
-        version_label = QLabel("版本 2.1.0")
-        version_label.setStyleSheet("font-size: 16px; color: #cccccc; margin-bottom: 8px;")
+        version_label = QLabel(f"版本 {CURRENT_VERSION}")
+        version_label.setProperty("role", "app-version")
         
         # 版本特性标签
         version_badge = QLabel("🚀 最新稳定版")
-        version_badge.setStyleSheet("""
-            background: #0078d4;
-            color: white;
-            padding: 4px 12px;
-            border-radius: 12px;
-            font-size: 12px;
-            font-weight: bold;
-        """)
+        version_badge.setProperty("role", "badge")
         version_badge.setAlignment(Qt.AlignCenter)
         version_badge.setFixedWidth(120)
         
@@ -427,18 +227,17 @@ class AboutDialog(QDialog):
         # 分隔线
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
-        separator.setStyleSheet("background: #3c3c3c; margin: 10px 0;")
+        separator.setProperty("role", "separator")
         separator.setFixedHeight(1)
         content_layout.addWidget(separator)
         
         # === 浏览器简介 ===
         intro_frame = QFrame()
-        intro_frame.setProperty("class", "section")
-        intro_frame.setStyleSheet("QFrame.section { padding: 20px; }")
+        intro_frame.setProperty("role", "section")
         intro_layout = QVBoxLayout(intro_frame)
         
         intro_label = QLabel("📖 浏览器简介")
-        intro_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #ffffff; margin-bottom: 12px;")
+        intro_label.setProperty("role", "section-heading")
         intro_layout.addWidget(intro_label)
         
         intro_text = QLabel(
@@ -448,7 +247,7 @@ class AboutDialog(QDialog):
             "浏览器采用深色主题设计，支持多标签页管理、智能地址栏、丰富的快捷键"
             "等特性，是日常上网和开发的理想选择。"
         )
-        intro_text.setStyleSheet("font-size: 14px; color: #cccccc; line-height: 1.6;")
+        intro_text.setProperty("role", "body")
         intro_text.setWordWrap(True)
         intro_layout.addWidget(intro_text)
         
@@ -456,7 +255,7 @@ class AboutDialog(QDialog):
         
         # === 主要特性 ===
         features_label = QLabel("✨ 主要特性")
-        features_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #ffffff; margin: 10px 0 15px 0;")
+        features_label.setProperty("role", "section-heading")
         content_layout.addWidget(features_label)
         
         # 创建特性网格布局
@@ -481,8 +280,7 @@ class AboutDialog(QDialog):
         
         for i, (icon, title, desc) in enumerate(features):
             feature_frame = QFrame()
-            feature_frame.setProperty("class", "feature-card")
-            feature_frame.setStyleSheet("QFrame.feature-card { background: #2d2d2d; border-radius: 8px; border: 1px solid #3c3c3c; }")
+            feature_frame.setProperty("role", "feature-card")
             feature_layout = QVBoxLayout(feature_frame)
             feature_layout.setContentsMargins(15, 15, 15, 15)
             feature_layout.setSpacing(8)
@@ -490,9 +288,9 @@ class AboutDialog(QDialog):
             # 图标和标题
             title_layout = QHBoxLayout()
             icon_label = QLabel(icon)
-            icon_label.setStyleSheet("font-size: 18px; margin-right: 8px;")
+            icon_label.setProperty("role", "feature-icon")
             title_label = QLabel(title)
-            title_label.setStyleSheet("font-size: 14px; font-weight: bold; color: #ffffff;")
+            title_label.setProperty("role", "feature-title")
             
             title_layout.addWidget(icon_label)
             title_layout.addWidget(title_label)
@@ -500,7 +298,7 @@ class AboutDialog(QDialog):
             
             # 描述
             desc_label = QLabel(desc)
-            desc_label.setStyleSheet("font-size: 12px; color: #aaaaaa; line-height: 1.4;")
+            desc_label.setProperty("role", "feature-desc")
             desc_label.setWordWrap(True)
             desc_label.setMinimumHeight(35)
             
@@ -514,12 +312,11 @@ class AboutDialog(QDialog):
         
         # === 系统信息 ===
         sysinfo_frame = QFrame()
-        sysinfo_frame.setProperty("class", "section")
-        sysinfo_frame.setStyleSheet("QFrame.section { padding: 20px; }")
+        sysinfo_frame.setProperty("role", "section")
         sysinfo_layout = QVBoxLayout(sysinfo_frame)
         
         sysinfo_label = QLabel("💻 系统信息")
-        sysinfo_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #ffffff; margin-bottom: 15px;")
+        sysinfo_label.setProperty("role", "section-heading")
         sysinfo_layout.addWidget(sysinfo_label)
         
         # 系统信息网格
@@ -539,9 +336,9 @@ class AboutDialog(QDialog):
         
         for i, (key, value) in enumerate(sys_info):
             key_label = QLabel(key)
-            key_label.setStyleSheet("font-size: 13px; color: #cccccc; font-weight: bold; min-width: 120px;")
+            key_label.setProperty("role", "info-key")
             value_label = QLabel(value)
-            value_label.setStyleSheet("font-size: 13px; color: #ffffff;")
+            value_label.setProperty("role", "info-value")
             
             sysinfo_grid.addWidget(key_label, i, 0)
             sysinfo_grid.addWidget(value_label, i, 1)
@@ -551,12 +348,11 @@ class AboutDialog(QDialog):
         
         # === 版本信息区域 ===
         version_frame = QFrame()
-        version_frame.setProperty("class", "section")
-        version_frame.setStyleSheet("QFrame.section { padding: 20px; }")
+        version_frame.setProperty("role", "section")
         version_layout = QVBoxLayout(version_frame)
         
         version_label = QLabel("🔄 版本信息")
-        version_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #ffffff; margin-bottom: 15px;")
+        version_label.setProperty("role", "section-heading")
         version_layout.addWidget(version_label)
         
         # 版本信息网格
@@ -565,19 +361,21 @@ class AboutDialog(QDialog):
         version_grid.setVerticalSpacing(10)
         
         version_info = [
-            ("当前版本:", "2.1.0"),
-            ("发布日期:", "2025-11-22"),
-            ("检查状态:", "点击检查更新按钮查看")
+            ("当前版本:", CURRENT_VERSION),
+            ("发布日期:", RELEASE_DATE),
+            ("检查状态:", self.update_status_text(self.update_checker.cached_result()))
         ]
         
         for i, (key, value) in enumerate(version_info):
             key_label = QLabel(key)
-            key_label.setStyleSheet("font-size: 13px; color: #cccccc; font-weight: bold; min-width: 120px;")
+            key_label.setProperty("role", "info-key")
             value_label = QLabel(value)
-            value_label.setStyleSheet("font-size: 13px; color: #ffffff;")
+            value_label.setProperty("role", "info-value")
             
             version_grid.addWidget(key_label, i, 0)
             version_grid.addWidget(value_label, i, 1)
+        # 检查完成后更新状态行
+        self.check_status_label = value_label
         
         version_layout.addLayout(version_grid)
         
@@ -613,7 +411,7 @@ class AboutDialog(QDialog):
         
         # === 版权信息 ===
         copyright_label = QLabel("© 2025 烈焰浏览器")
-        copyright_label.setStyleSheet("font-size: 12px; color: #666666; margin-top: 20px;")
+        copyright_label.setProperty("role", "copyright")
         copyright_label.setAlignment(Qt.AlignCenter)
         content_layout.addWidget(copyright_label)
         
@@ -624,26 +422,45 @@ class AboutDialog(QDialog):
         scroll_area.setWidget(scroll_content)
         main_layout.addWidget(scroll_area)
     
+    def update_status_text(self, version_info):
+        """检查状态行的文字：有缓存的检查结果（启动时的后台检查）时直接显示"""
+        if version_info is None:
+            return "点击检查更新按钮查看"
+        latest_version = version_info.get("latest_version", "")
+        if compare_versions(CURRENT_VERSION, latest_version):
+            return f"发现新版本 {latest_version}"
+        return "已是最新版本"
+    
     def check_updates(self):
         """检查更新"""
         self.update_btn.setEnabled(False)
         self.update_btn.setText("检查中...")
         self.update_progress.setVisible(True)
         
-        # 创建并启动更新检查线程
-        self.update_checker = UpdateChecker(self)
+        # 缓存有效时立即得到结果，否则并行请求所有镜像
         self.update_checker.update_available.connect(self.on_update_available)
         self.update_checker.no_update.connect(self.on_no_update)
         self.update_checker.check_failed.connect(self.on_check_failed)
-        self.update_checker.start()
+        self.update_checker.check()
+    
+    def disconnect_checker(self):
+        """检查服务是全局的，收到结果后断开本对话框的连接"""
+        for signal, slot in ((self.update_checker.update_available, self.on_update_available),
+                             (self.update_checker.no_update, self.on_no_update),
+                             (self.update_checker.check_failed, self.on_check_failed)):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
     
     def on_update_available(self, version_info):
         """有新版本可用"""
+        self.disconnect_checker()
         self.update_progress.setVisible(False)
         self.update_btn.setEnabled(True)
         self.update_btn.setText("🎉 下载更新")
-        self.update_btn.setProperty("class", "update-available")
-        self.update_btn.setStyleSheet("QPushButton { background: #107c10; border-color: #107c10; } QPushButton:hover { background: #0d6b0d; }")
+        self.check_status_label.setText(self.update_status_text(version_info))
+        set_widget_variant(self.update_btn, "success")
         self.update_btn.clicked.disconnect()
         self.update_btn.clicked.connect(lambda: self.download_update(version_info))
         
@@ -652,23 +469,26 @@ class AboutDialog(QDialog):
     
     def on_no_update(self):
         """已是最新版本"""
+        self.disconnect_checker()
         self.update_progress.setVisible(False)
         self.update_btn.setEnabled(True)
         self.update_btn.setText("✅ 已是最新版本")
-        self.update_btn.setStyleSheet("")
+        self.check_status_label.setText("已是最新版本")
+        set_widget_variant(self.update_btn, "")
         
         QMessageBox.information(self, "检查更新", 
             f"✅ 您的浏览器已是最新版本！\n\n"
-            f"当前版本: 2.1.0\n"
-            f"发布日期: 2024-12-01"
+            f"当前版本: {CURRENT_VERSION}\n"
+            f"发布日期: {RELEASE_DATE}"
         )
     
     def on_check_failed(self, error_message):
         """检查更新失败"""
+        self.disconnect_checker()
         self.update_progress.setVisible(False)
         self.update_btn.setEnabled(True)
         self.update_btn.setText("🔄 检查更新")
-        self.update_btn.setStyleSheet("")
+        set_widget_variant(self.update_btn, "")
         
         QMessageBox.warning(self, "检查更新", 
             f"❌ 检查更新失败\n\n"
@@ -687,38 +507,7 @@ class AboutDialog(QDialog):
         update_dialog = QDialog(self)
         update_dialog.setWindowTitle("发现新版本")
         update_dialog.setFixedSize(500, 400)
-        update_dialog.setStyleSheet("""
-            QDialog {
-                background: #202020;
-                color: #ffffff;
-                border: 1px solid #3c3c3c;
-                border-radius: 8px;
-                font-family: "Microsoft YaHei", "Segoe UI", Arial, sans-serif;
-            }
-            QLabel {
-                color: #ffffff;
-                background: transparent;
-            }
-            QPushButton {
-                background: #0078d4;
-                border: 1px solid #0078d4;
-                border-radius: 4px;
-                color: white;
-                padding: 8px 16px;
-                font-size: 13px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background: #106ebe;
-            }
-            QPushButton.download-btn {
-                background: #107c10;
-                border-color: #107c10;
-            }
-            QPushButton.download-btn:hover {
-                background: #0d6b0d;
-            }
-        """)
+        update_dialog.setObjectName("updateDialog")
         
         layout = QVBoxLayout(update_dialog)
         layout.setContentsMargins(25, 25, 25, 25)
@@ -726,20 +515,20 @@ class AboutDialog(QDialog):
         
         # 标题
         title_label = QLabel("🎉 发现新版本！")
-        title_label.setStyleSheet("font-size: 20px; font-weight: bold; color: #ffffff;")
+        title_label.setProperty("role", "update-title")
         title_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(title_label)
         
         # 版本信息
         version_layout = QHBoxLayout()
-        current_version_label = QLabel(f"当前版本: 2.1.0")
-        current_version_label.setStyleSheet("font-size: 14px; color: #cccccc;")
+        current_version_label = QLabel(f"当前版本: {CURRENT_VERSION}")
+        current_version_label.setProperty("role", "body")
         
         arrow_label = QLabel("→")
-        arrow_label.setStyleSheet("font-size: 16px; color: #0078d4; font-weight: bold; margin: 0 10px;")
+        arrow_label.setProperty("role", "version-arrow")
         
         new_version_label = QLabel(f"最新版本: {latest_version}")
-        new_version_label.setStyleSheet("font-size: 14px; color: #4caf50; font-weight: bold;")
+        new_version_label.setProperty("role", "version-new")
         
         version_layout.addWidget(current_version_label)
         version_layout.addWidget(arrow_label)
@@ -749,21 +538,12 @@ class AboutDialog(QDialog):
         
         # 更新内容
         changes_label = QLabel("📝 更新内容:")
-        changes_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #ffffff; margin-top: 10px;")
+        changes_label.setProperty("role", "section-title")
         layout.addWidget(changes_label)
         
         changes_text = QTextEdit()
         changes_text.setReadOnly(True)
-        changes_text.setStyleSheet("""
-            QTextEdit {
-                background: #2d2d2d;
-                border: 1px solid #3c3c3c;
-                border-radius: 6px;
-                padding: 10px;
-                color: #cccccc;
-                font-size: 13px;
-            }
-        """)
+        changes_text.setObjectName("changesText")
         
         changes_html = "<ul style='margin: 0; padding-left: 20px;'>"
         for change in changes:
@@ -781,8 +561,7 @@ class AboutDialog(QDialog):
         later_btn.clicked.connect(update_dialog.close)
         
         download_btn = QPushButton("立即下载")
-        download_btn.setProperty("class", "download-btn")
-        download_btn.setStyleSheet("QPushButton { background: #107c10; border-color: #107c10; } QPushButton:hover { background: #0d6b0d; }")
+        download_btn.setProperty("variant", "success")
         download_btn.clicked.connect(lambda: self.download_update(version_info))
         
         button_layout.addWidget(later_btn)
@@ -795,6 +574,10 @@ class AboutDialog(QDialog):
     
     def download_update(self, version_info):
         """下载更新"""
+        if version_info.get('package_url'):
+            # 清单提供了安装包地址时在后台分段下载并校验
+            self.start_package_download(version_info)
+            return
         download_url = version_info.get('download_url', '#')
         
         # 在浏览器中打开下载页面
@@ -808,10 +591,70 @@ class AboutDialog(QDialog):
         
         # 重置更新按钮状态
         self.update_btn.setText("🔄 检查更新")
-        self.update_btn.setStyleSheet("")
+        set_widget_variant(self.update_btn, "")
         self.update_btn.clicked.disconnect()
         self.update_btn.clicked.connect(self.check_updates)
     
+    def start_package_download(self, version_info):
+        """后台下载安装包，按钮改为取消下载"""
+        self.downloader = UpdateDownloader(version_info, parent=self)
+        self.downloader.progress.connect(self.on_download_progress)
+        self.downloader.status_changed.connect(self.update_btn.setToolTip)
+        self.downloader.download_finished.connect(self.on_download_finished)
+        self.downloader.download_failed.connect(self.on_download_failed)
+
+        self.update_progress.setRange(0, 0)
+        self.update_progress.setVisible(True)
+        self.update_btn.setText("⏹ 取消下载")
+        set_widget_variant(self.update_btn, "")
+        self.update_btn.clicked.disconnect()
+        self.update_btn.clicked.connect(self.cancel_download)
+        self.downloader.start()
+
+    def on_download_progress(self, received, total):
+        if total > 0:
+            self.update_progress.setRange(0, 100)
+            self.update_progress.setValue(int(received * 100 / total))
+
+    def cancel_download(self):
+        if self.downloader is not None:
+            self.update_btn.setEnabled(False)
+            self.downloader.cancel()
+
+    def on_download_finished(self, path):
+        self.reset_after_download()
+        QMessageBox.information(self, "下载更新",
+            f"新版本安装包已下载并通过校验：\n{path}\n\n"
+            "请关闭浏览器后运行安装包完成更新。"
+        )
+
+    def on_download_failed(self, error_message):
+        self.reset_after_download()
+        QMessageBox.warning(self, "下载更新", error_message)
+
+    def reset_after_download(self):
+        self.downloader = None
+        self.update_progress.setVisible(False)
+        self.update_progress.setRange(0, 0)
+        self.update_btn.setEnabled(True)
+        self.update_btn.setToolTip("")
+        self.update_btn.setText("🔄 检查更新")
+        set_widget_variant(self.update_btn, "")
+        self.update_btn.clicked.disconnect()
+        self.update_btn.clicked.connect(self.check_updates)
+
+    def done(self, result):
+        """关闭对话框前停止下载线程，已下载的部分保留到下次续传"""
+        if self.downloader is not None:
+            # 对话框已关闭，不再处理下载线程的结果
+            self.downloader.download_finished.disconnect()
+            self.downloader.download_failed.disconnect()
+            self.downloader.cancel()
+            self.downloader.wait()
+            self.downloader = None
+        self.disconnect_checker()
+        super().done(result)
+
     def show_author_info(self):
         """显示作者信息对话框"""
         author_dialog = AuthorDialog(self.parent_browser)
@@ -0,0 +1,304 @@
+# download_manager.py - 下载管理（排队、并发上限、令牌桶限速、暂停继续、合并的进度刷新）
+import os
+import time
+from PyQt5.QtCore import QObject, QStandardPaths, QTimer, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEngineDownloadItem
+
+from config import get_config
+
+DEFAULT_DOWNLOAD_SETTINGS = {
+    "directory": "",                  # 为空时使用系统的下载目录
+    "max_concurrent": 3,              # 同时传输的下载数，其余排队
+    "global_limit_kbps": 0,           # 所有下载合计的速度上限，0 表示不限速
+    "per_download_limit_kbps": 0,     # 单个下载的速度上限，0 表示不限速
+    "ui_refresh_ms": 250,             # 下载面板和工具栏按钮的最快刷新间隔
+}
+
+# 调度间隔（毫秒）：读取进度、结算令牌桶、按需暂停或恢复传输
+SCHEDULER_INTERVAL_MS = 100
+# 速度的指数平滑系数
+SPEED_SMOOTHING = 0.3
+
+STATE_QUEUED = "queued"
+STATE_DOWNLOADING = "downloading"
+STATE_PAUSED = "paused"
+STATE_COMPLETED = "completed"
+STATE_CANCELLED = "cancelled"
+STATE_FAILED = "failed"
+
+FINISHED_STATES = (STATE_COMPLETED, STATE_CANCELLED, STATE_FAILED)
+
+STATE_LABELS = {
+    STATE_QUEUED: "排队中",
+    STATE_DOWNLOADING: "下载中",
+    STATE_PAUSED: "已暂停",
+    STATE_COMPLETED: "已完成",
+    STATE_CANCELLED: "已取消",
+    STATE_FAILED: "失败",
+}
+
+
+class TokenBucket:
+    """令牌桶限速：rate 为每秒字节数，0 表示不限速
+
+    QtWebEngine 没有提供下载限速接口，这里按实际收到的字节扣除令牌，
+    令牌为负（欠账）时暂停传输，补足后再恢复。
+    """
+
+    def __init__(self, rate=0, burst_seconds=1.0):
+        self.burst_seconds = burst_seconds
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        self.rate = max(0, int(rate))
+        self.capacity = self.rate * self.burst_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, amount):
+        if self.rate:
+            self.tokens -= amount
+
+    def in_debt(self):
+        return self.rate > 0 and self.tokens < 0
+
+
+class DownloadEntry:
+    """一个下载任务"""
+    __slots__ = ("id", "item", "url", "path", "state", "received", "total", "speed", "bucket",
+                 "throttled", "error", "started", "sampled_at")
+
+    def __init__(self, entry_id, item, path, rate):
+        self.id = entry_id
+        self.item = item
+        self.url = item.url().toString()
+        self.path = path
+        self.state = STATE_QUEUED
+        self.received = 0
+        self.total = -1
+        self.speed = 0.0            # 字节/秒
+        self.bucket = TokenBucket(rate)
+        self.throttled = False      # 因限速被暂停（与用户暂停区分）
+        self.error = ""
+        self.started = time.time()
+        self.sampled_at = time.monotonic()
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.path)
+
+    def is_finished(self):
+        return self.state in FINISHED_STATES
+
+
+def unique_path(directory, file_name):
+    """目标文件已存在时在文件名后追加序号"""
+    base, extension = os.path.splitext(file_name or "download")
+    path = os.path.join(directory, base + extension)
+    counter = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{base} ({counter}){extension}")
+        counter += 1
+    return path
+
+
+def format_bytes(size):
+    if size is None or size < 0:
+        return "—"
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+class DownloadManager(QObject):
+    """接管配置文件的 downloadRequested：排队、限速并合并进度通知
+
+    传输本身由 Chromium 完成；调度定时器定期读取各下载的已接收字节数，
+    结算令牌桶并决定暂停或恢复。界面只接收合并后的通知，不连接每个数据块的进度信号。
+    """
+
+    # 定义信号
+    entry_added = pyqtSignal(object)        # DownloadEntry
+    entries_updated = pyqtSignal(object)    # 本次刷新中有变化的下载 id 集合
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = get_config("downloads", DEFAULT_DOWNLOAD_SETTINGS)
+        self.entries = []
+        self.next_id = 1
+        self.global_bucket = TokenBucket(int(self.settings["global_limit_kbps"]) * 1024)
+        self.dirty = set()
+        self.last_emit = 0.0
+
+        self.scheduler = QTimer(self)
+        self.scheduler.setInterval(SCHEDULER_INTERVAL_MS)
+        self.scheduler.timeout.connect(self.tick)
+
+    def attach(self, profile):
+        profile.downloadRequested.connect(self.on_download_requested)
+
+    def download_directory(self):
+        directory = self.settings["directory"] or \
+            QStandardPaths.writableLocation(QStandardPaths.DownloadLocation) or os.path.expanduser("~")
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def on_download_requested(self, item):
+        """必须在这个槽函数中 accept，否则 Chromium 会取消下载"""
+        if hasattr(item, "downloadFileName"):
+            file_name = item.downloadFileName()
+        else:
+            file_name = os.path.basename(item.path())
+        path = unique_path(self.download_directory(), file_name)
+        if hasattr(item, "setDownloadDirectory"):
+            item.setDownloadDirectory(os.path.dirname(path))
+            item.setDownloadFileName(os.path.basename(path))
+        else:
+            item.setPath(path)
+
+        entry = DownloadEntry(self.next_id, item, path, int(self.settings["per_download_limit_kbps"]) * 1024)
+        self.next_id += 1
+        item.finished.connect(lambda e=entry: self.on_item_finished(e))
+        item.accept()
+        self.entries.append(entry)
+
+        if self.active_count() < self.max_concurrent():
+            entry.state = STATE_DOWNLOADING
+        else:
+            # 超出并发上限时先暂停，轮到它时再恢复
+            item.pause()
+        self.entry_added.emit(entry)
+        self.scheduler.start()
+
+    def max_concurrent(self):
+        return max(1, int(self.settings["max_concurrent"]))
+
+    def active_count(self):
+        return sum(1 for entry in self.entries if entry.state == STATE_DOWNLOADING)
+
+    def tick(self):
+        now = time.monotonic()
+        self.global_bucket.refill(now)
+        active = [entry for entry in self.entries if entry.state == STATE_DOWNLOADING]
+        for entry in active:
+            self.sample(entry, now)
+
+        global_debt = self.global_bucket.in_debt()
+        for entry in active:
+            self.set_throttled(entry, global_debt or entry.bucket.in_debt())
+
+        self.start_queued()
+        self.emit_updates()
+        if not any(entry.state in (STATE_DOWNLOADING, STATE_QUEUED) for entry in self.entries):
+            self.scheduler.stop()
+
+    def sample(self, entry, now):
+        """读取进度并结算令牌"""
+        received = entry.item.receivedBytes()
+        total = entry.item.totalBytes()
+        delta = max(0, received - entry.received)
+        elapsed = now - entry.sampled_at
+        entry.sampled_at = now
+        entry.bucket.refill(now)
+        entry.bucket.consume(delta)
+        self.global_bucket.consume(delta)
+        if elapsed > 0:
+            entry.speed += SPEED_SMOOTHING * (delta / elapsed - entry.speed)
+        if delta or total != entry.total:
+            entry.received = received
+            entry.total = total
+            self.dirty.add(entry.id)
+
+    def set_throttled(self, entry, throttled):
+        if throttled == entry.throttled:
+            return
+        entry.throttled = throttled
+        if throttled:
+            entry.item.pause()
+        else:
+            entry.item.resume()
+        self.dirty.add(entry.id)
+
+    def start_queued(self):
+        slots = self.max_concurrent() - self.active_count()
+        for entry in self.entries:
+            if slots <= 0:
+                break
+            if entry.state == STATE_QUEUED:
+                entry.state = STATE_DOWNLOADING
+                entry.sampled_at = time.monotonic()
+                entry.item.resume()
+                self.dirty.add(entry.id)
+                slots -= 1
+
+    def emit_updates(self, force=False):
+        """把一段时间内的变化合并为一次通知"""
+        now = time.monotonic()
+        if not self.dirty or (not force and now - self.last_emit < self.settings["ui_refresh_ms"] / 1000):
+            return
+        self.last_emit = now
+        changed, self.dirty = self.dirty, set()
+        self.entries_updated.emit(changed)
+
+    def on_item_finished(self, entry):
+        item = entry.item
+        entry.received = item.receivedBytes()
+        entry.total = item.totalBytes()
+        entry.speed = 0.0
+        state = item.state()
+        if state == QWebEngineDownloadItem.DownloadCompleted:
+            entry.state = STATE_COMPLETED
+        elif state == QWebEngineDownloadItem.DownloadCancelled:
+            entry.state = STATE_CANCELLED
+        else:
+            entry.state = STATE_FAILED
+            entry.error = item.interruptReasonString()
+            print(f"下载失败 {entry.url}: {entry.error}")
+        self.dirty.add(entry.id)
+        self.start_queued()
+        self.emit_updates(force=True)
+
+    def pause(self, entry):
+        """用户暂停：让出并发名额"""
+        if entry.state not in (STATE_DOWNLOADING, STATE_QUEUED):
+            return
+        entry.state = STATE_PAUSED
+        entry.throttled = False
+        entry.speed = 0.0
+        entry.item.pause()
+        self.dirty.add(entry.id)
+        self.start_queued()
+        self.emit_updates(force=True)
+
+    def resume(self, entry):
+        """继续下载：重新排队，有空闲名额时立即开始"""
+        if entry.state != STATE_PAUSED:
+            return
+        entry.state = STATE_QUEUED
+        self.dirty.add(entry.id)
+        self.start_queued()
+        self.emit_updates(force=True)
+        self.scheduler.start()
+
+    def cancel(self, entry):
+        if not entry.is_finished():
+            entry.item.cancel()
+
+    def clear_finished(self):
+        self.entries = [entry for entry in self.entries if not entry.is_finished()]
+
+    def cancel_all(self):
+        for entry in self.entries:
+            self.cancel(entry)
+
+    def summary(self):
+        """(未完成的下载数, 合计速度)"""
+        pending = [entry for entry in self.entries if not entry.is_finished()]
+        return len(pending), sum(entry.speed for entry in pending if entry.state == STATE_DOWNLOADING)
@@ -0,0 +1,166 @@
+# downloads_dialog.py - 下载面板（首次打开时才导入）
+import os
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QUrl
+from PyQt5.QtGui import QDesktopServices
+from PyQt5.QtWidgets import (QAbstractItemView, QDialog, QHBoxLayout, QHeaderView, QLabel, QPushButton,
+                             QTableView, QVBoxLayout)
+
+from download_manager import STATE_COMPLETED, STATE_DOWNLOADING, STATE_LABELS, STATE_PAUSED, format_bytes
+
+# 表格列
+COLUMN_NAME = 0
+COLUMN_SIZE = 1
+COLUMN_PROGRESS = 2
+COLUMN_SPEED = 3
+COLUMN_STATE = 4
+COLUMN_HEADERS = ["文件名", "大小", "进度", "速度", "状态"]
+
+
+class DownloadsModel(QAbstractTableModel):
+    """下载列表的数据，只在收到合并后的通知时刷新有变化的行"""
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.rows = list(manager.entries)
+        manager.entry_added.connect(self.on_entry_added)
+        manager.entries_updated.connect(self.on_entries_updated)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMN_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.ToolTipRole:
+            return entry.error or entry.url
+        if role == Qt.TextAlignmentRole and column != COLUMN_NAME:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+
+        if column == COLUMN_NAME:
+            return entry.file_name
+        if column == COLUMN_SIZE:
+            return format_bytes(entry.total)
+        if column == COLUMN_PROGRESS:
+            if entry.total > 0:
+                return f"{entry.received * 100 / entry.total:.0f}%"
+            return format_bytes(entry.received)
+        if column == COLUMN_SPEED:
+            return f"{format_bytes(entry.speed)}/s" if entry.state == STATE_DOWNLOADING else ""
+        label = STATE_LABELS.get(entry.state, entry.state)
+        return "限速中" if entry.state == STATE_DOWNLOADING and entry.throttled else label
+
+    def on_entry_added(self, entry):
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows))
+        self.rows.append(entry)
+        self.endInsertRows()
+
+    def on_entries_updated(self, changed_ids):
+        rows = [row for row, entry in enumerate(self.rows) if entry.id in changed_ids]
+        if rows:
+            # 合并为一个连续范围，每次刷新只发一次 dataChanged
+            self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), len(COLUMN_HEADERS) - 1))
+
+    def reload(self):
+        self.beginResetModel()
+        self.rows = list(self.manager.entries)
+        self.endResetModel()
+
+    def entry_at(self, row):
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+
+class DownloadsDialog(QDialog):
+    """下载面板：暂停、继续、取消下载，打开所在文件夹"""
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.setWindowTitle("下载")
+        self.resize(720, 420)
+        self.setObjectName("downloadsDialog")
+
+        self.model = DownloadsModel(manager, self)
+        manager.entries_updated.connect(self.update_summary)
+
+        self.init_ui()
+        self.update_summary()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(12)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(COLUMN_NAME, QHeaderView.Stretch)
+        self.table.doubleClicked.connect(self.open_selected)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.summary_label.setProperty("role", "description")
+        button_layout.addWidget(self.summary_label)
+        button_layout.addStretch()
+
+        for text, slot in (("暂停/继续", self.toggle_selected), ("取消", self.cancel_selected),
+                           ("打开文件夹", self.open_selected_folder), ("清除已完成", self.clear_finished)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            button_layout.addWidget(button)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def update_summary(self, changed_ids=None):
+        pending, speed = self.manager.summary()
+        self.summary_label.setText(f"{pending} 个下载进行中，{format_bytes(speed)}/s" if pending else "没有进行中的下载")
+
+    def selected_entry(self):
+        indexes = self.table.selectionModel().selectedRows()
+        return self.model.entry_at(indexes[0].row()) if indexes else None
+
+    def toggle_selected(self):
+        entry = self.selected_entry()
+        if entry is None:
+            return
+        if entry.state == STATE_PAUSED:
+            self.manager.resume(entry)
+        else:
+            self.manager.pause(entry)
+
+    def cancel_selected(self):
+        entry = self.selected_entry()
+        if entry is not None:
+            self.manager.cancel(entry)
+
+    def open_selected(self, index):
+        entry = self.model.entry_at(index.row())
+        if entry is not None and entry.state == STATE_COMPLETED:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(entry.path))
+
+    def open_selected_folder(self):
+        entry = self.selected_entry()
+        directory = os.path.dirname(entry.path) if entry is not None else self.manager.download_directory()
+        QDesktopServices.openUrl(QUrl.fromLocalFile(directory))
+
+    def clear_finished(self):
+        self.manager.clear_finished()
+        self.model.reload()
+        self.update_summary()
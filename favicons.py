@@ -0,0 +1,210 @@
+# favicons.py - 网站图标（按内容哈希去重、网址与主机名映射、解码后的 QIcon LRU）
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QObject, QSize
+from PyQt5.QtGui import QIcon, QPixmap
+
+from bookmarks import normalize_url
+from config import get_config, get_data_path
+from debounced_saver import DebouncedSaver
+
+FAVICONS_DIR_NAME = "favicons"
+INDEX_FILE_NAME = "index.json"
+
+DEFAULT_FAVICON_SETTINGS = {
+    "max_pages": 5000,       # 记住图标的网址数，超出时丢弃最久未更新的
+    "memory_icons": 256,     # 内存中保留的解码后图标数
+}
+
+# 保存到磁盘的图标尺寸
+ICON_SIZE = QSize(32, 32)
+
+
+def encode_icon(icon):
+    """把图标编码为 PNG 字节，相同的图片得到相同的字节"""
+    pixmap = icon.pixmap(icon.actualSize(ICON_SIZE))
+    if pixmap.isNull():
+        return None
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    pixmap.save(buffer, "PNG")
+    buffer.close()
+    return bytes(data)
+
+
+def url_host(url):
+    try:
+        return (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+class FaviconStore(QObject):
+    """所有标签页、历史记录和书签共用的网站图标
+
+    图标文件以内容的 SHA-1 命名，不同网址的相同图标只保存一份；索引把规范化网址
+    和主机名映射到图标哈希。内存中每个哈希只解码一次，恢复的标签页在页面加载前即可显示图标。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = get_config("favicons", DEFAULT_FAVICON_SETTINGS)
+        self.directory = os.path.dirname(get_data_path(FAVICONS_DIR_NAME, INDEX_FILE_NAME))
+        self.path = os.path.join(self.directory, INDEX_FILE_NAME)
+        self.lock = threading.Lock()    # 保存线程序列化时防止索引被修改
+        self.pages = {}                 # 规范化网址 -> 图标哈希（按更新顺序）
+        self.hosts = {}                 # 主机名 -> 最近一次看到的图标哈希
+        self.stored = set()             # 磁盘上已有的图标哈希
+        self.pending_icons = {}         # 等待写入磁盘的 {哈希: PNG 字节}
+        self.pending_deletes = set()    # 等待删除的无用图标文件
+        self.icons = OrderedDict()      # 哈希 -> QIcon
+        self.dirty = False
+        self.load()
+
+        self.saver = DebouncedSaver(self)
+        self.saver.start()
+        if self.pending_deletes:
+            self.saver.request_save()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if isinstance(index, dict):
+                self.pages = dict(index.get("pages", {}))
+                self.hosts = dict(index.get("hosts", {}))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"网站图标索引读取失败: {e}")
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        referenced = set(self.pages.values()) | set(self.hosts.values())
+        for name in names:
+            digest, extension = os.path.splitext(name)
+            if extension != ".png":
+                continue
+            if digest in referenced:
+                self.stored.add(digest)
+            else:
+                self.pending_deletes.add(digest)
+
+    def icon_path(self, digest):
+        return os.path.join(self.directory, f"{digest}.png")
+
+    def remember(self, url, icon):
+        """页面图标变化时调用，返回共享的 QIcon；图标为空（刚开始导航）时返回已知的图标"""
+        if icon.isNull():
+            return self.icon_for_url(url)
+        data = encode_icon(icon)
+        if data is None:
+            return icon
+        digest = hashlib.sha1(data).hexdigest()
+        shared = self.icons.get(digest)
+        if shared is None:
+            shared = icon
+            self.cache_icon(digest, icon)
+        else:
+            self.icons.move_to_end(digest)
+
+        key = normalize_url(url)
+        host = url_host(url)
+        with self.lock:
+            # 启动时判为无用的同一图标又被用到了，不能再删除
+            self.pending_deletes.discard(digest)
+            if digest not in self.stored and digest not in self.pending_icons:
+                self.pending_icons[digest] = data
+                self.dirty = True
+            if self.pages.get(key) != digest or (host and self.hosts.get(host) != digest):
+                self.pages.pop(key, None)
+                self.pages[key] = digest
+                if host:
+                    self.hosts[host] = digest
+                self.trim_pages()
+                self.dirty = True
+            dirty = self.dirty
+        if dirty:
+            self.saver.request_save()
+        return shared
+
+    def trim_pages(self):
+        """超出上限时丢弃最久未更新的网址映射（持有锁时调用）"""
+        excess = len(self.pages) - int(self.settings["max_pages"])
+        if excess <= 0:
+            return
+        for key in list(self.pages)[:excess]:
+            del self.pages[key]
+
+    def icon_for_url(self, url):
+        """按网址查找图标，没有时退回到同一主机名的图标，都没有时返回空图标"""
+        digest = self.pages.get(normalize_url(url)) or self.hosts.get(url_host(url))
+        return self.icon(digest) if digest else QIcon()
+
+    def icon(self, digest):
+        icon = self.icons.get(digest)
+        if icon is not None:
+            self.icons.move_to_end(digest)
+            return icon
+        data = self.pending_icons.get(digest)
+        if data is None:
+            try:
+                with open(self.icon_path(digest), "rb") as f:
+                    data = f.read()
+            except OSError:
+                return QIcon()
+        pixmap = QPixmap()
+        if not pixmap.loadFromData(data):
+            return QIcon()
+        icon = QIcon(pixmap)
+        self.cache_icon(digest, icon)
+        return icon
+
+    def cache_icon(self, digest, icon):
+        self.icons[digest] = icon
+        while len(self.icons) > int(self.settings["memory_icons"]):
+            self.icons.popitem(last=False)
+
+    def trim(self):
+        """内存紧张时清空解码后的图标（标签页仍持有正在显示的图标），返回清除的数量"""
+        count = len(self.icons)
+        self.icons.clear()
+        return count
+
+    def write_to_disk(self):
+        """在保存线程中调用：删除无用图标、写入新图标，原子替换索引文件"""
+        with self.lock:
+            icons, self.pending_icons = self.pending_icons, {}
+            deletes, self.pending_deletes = self.pending_deletes, set()
+            data = json.dumps({"pages": self.pages, "hosts": self.hosts}, separators=(",", ":")) \
+                if self.dirty else None
+            self.dirty = False
+        try:
+            # 先删除再写入，同一图标既待删除又待写入时以写入为准
+            for digest in deletes - icons.keys():
+                if os.path.exists(self.icon_path(digest)):
+                    os.remove(self.icon_path(digest))
+            for digest, icon_data in icons.items():
+                tmp_path = self.icon_path(digest) + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(icon_data)
+                os.replace(tmp_path, self.icon_path(digest))
+                self.stored.add(digest)
+            if data is not None:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"网站图标保存失败: {e}")
+
+    def close(self):
+        """退出时调用，确保最后的修改写入磁盘"""
+        if self.saver.isRunning():
+            self.saver.stop()
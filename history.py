@@ -0,0 +1,225 @@
+# history.py - 浏览历史记录（SQLite WAL + 后台批量写入）
+import time
+import queue
+import sqlite3
+from PyQt5.QtCore import QObject, QThread
+
+from config import get_config, get_data_path
+
+HISTORY_DB_NAME = "history.db"
+
+# 访问来源类型
+TRANSITION_LINK = "link"          # 点击链接或页面跳转
+TRANSITION_TYPED = "typed"        # 在地址栏输入网址
+TRANSITION_SEARCH = "search"      # 在地址栏输入搜索词
+TRANSITION_RELOAD = "reload"      # 刷新
+TRANSITION_HOME = "home"          # 主页按钮
+TRANSITION_RESTORE = "restore"    # 会话恢复
+
+DEFAULT_HISTORY_SETTINGS = {
+    "enabled": True,
+    "retention_days": 90,           # 超过这个天数的访问记录会被清理
+    "compact_interval_hours": 6,
+    "flush_interval_ms": 1000,      # 合并这段时间内的写入为一个事务
+}
+
+# 不记录的网址前缀
+IGNORED_PREFIXES = ("about:", "data:", "blob:", "chrome:", "qrc:", "view-source:")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    visit_count INTEGER NOT NULL DEFAULT 0,
+    typed_count INTEGER NOT NULL DEFAULT 0,
+    last_visit REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS visits (
+    id INTEGER PRIMARY KEY,
+    url_id INTEGER NOT NULL,
+    visit_time REAL NOT NULL,
+    transition TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS visits_time ON visits(visit_time);
+CREATE INDEX IF NOT EXISTS visits_url ON visits(url_id);
+"""
+
+_STOP = object()
+
+
+def open_history_db(path):
+    """打开历史数据库并启用 WAL 模式"""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def should_record(url):
+    return bool(url) and not url.startswith(IGNORED_PREFIXES)
+
+
+class HistoryWriter(QThread):
+    """历史写入线程：批量事务写入，定期清理过期记录"""
+
+    def __init__(self, db_path, settings, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.settings = settings
+        self.operations = queue.Queue()
+        self.last_compact_time = 0
+
+    def run(self):
+        """执行写入循环"""
+        try:
+            connection = open_history_db(self.db_path)
+        except sqlite3.Error as e:
+            print(f"历史数据库打开失败: {e}")
+            return
+
+        flush_interval = self.settings["flush_interval_ms"] / 1000
+        compact_interval = self.settings["compact_interval_hours"] * 3600
+        try:
+            self.compact(connection)
+            while True:
+                batch, stopping = self.collect_batch(flush_interval, compact_interval)
+                if batch:
+                    self.write_batch(connection, batch)
+                if time.monotonic() - self.last_compact_time >= compact_interval:
+                    self.compact(connection)
+                if stopping:
+                    return
+        finally:
+            connection.close()
+
+    def collect_batch(self, flush_interval, timeout):
+        """等待第一条操作，然后收集 flush_interval 内的其余操作"""
+        try:
+            first = self.operations.get(timeout=timeout)
+        except queue.Empty:
+            return [], False
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + flush_interval
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                operation = self.operations.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if operation is _STOP:
+                return batch, True
+            batch.append(operation)
+        return batch, False
+
+    def write_batch(self, connection, batch):
+        """在一个事务中写入一批访问和标题更新"""
+        try:
+            with connection:
+                for operation in batch:
+                    if operation[0] == "visit":
+                        _, url, title, visit_time, transition = operation
+                        typed = 1 if transition in (TRANSITION_TYPED, TRANSITION_SEARCH) else 0
+                        connection.execute(
+                            "INSERT INTO urls (url, title, visit_count, typed_count, last_visit) "
+                            "VALUES (?, ?, 1, ?, ?) "
+                            "ON CONFLICT(url) DO UPDATE SET visit_count = visit_count + 1, "
+                            "typed_count = typed_count + excluded.typed_count, last_visit = excluded.last_visit, "
+                            "title = CASE WHEN excluded.title != '' THEN excluded.title ELSE title END",
+                            (url, title, typed, visit_time))
+                        connection.execute(
+                            "INSERT INTO visits (url_id, visit_time, transition) "
+                            "SELECT id, ?, ? FROM urls WHERE url = ?",
+                            (visit_time, transition, url))
+                    elif operation[0] == "title":
+                        _, url, title = operation
+                        connection.execute("UPDATE urls SET title = ? WHERE url = ?", (title, url))
+                    elif operation[0] == "clear":
+                        connection.execute("DELETE FROM visits")
+                        connection.execute("DELETE FROM urls")
+        except sqlite3.Error as e:
+            print(f"历史记录写入失败: {e}")
+
+    def compact(self, connection):
+        """删除过期的访问记录和不再被引用的网址"""
+        self.last_compact_time = time.monotonic()
+        cutoff = time.time() - self.settings["retention_days"] * 86400
+        try:
+            with connection:
+                connection.execute("DELETE FROM visits WHERE visit_time < ?", (cutoff,))
+                connection.execute(
+                    "DELETE FROM urls WHERE last_visit < ? AND NOT EXISTS "
+                    "(SELECT 1 FROM visits WHERE visits.url_id = urls.id)", (cutoff,))
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            print(f"历史记录清理失败: {e}")
+
+    def submit(self, operation):
+        self.operations.put(operation)
+
+    def stop(self):
+        """写完剩余操作后退出"""
+        self.operations.put(_STOP)
+        self.wait()
+
+
+class HistoryStore(QObject):
+    """浏览历史：GUI 线程只负责入队，写入全部在后台线程完成"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = get_config("history", DEFAULT_HISTORY_SETTINGS)
+        self.db_path = get_data_path(HISTORY_DB_NAME)
+        self.writer = HistoryWriter(self.db_path, self.settings)
+        if self.settings["enabled"]:
+            self.writer.start()
+
+    def record_visit(self, url, title="", transition=TRANSITION_LINK):
+        """记录一次访问"""
+        if self.settings["enabled"] and should_record(url):
+            self.writer.submit(("visit", url, title, time.time(), transition))
+
+    def update_title(self, url, title):
+        """页面标题变化时更新"""
+        if self.settings["enabled"] and title and should_record(url):
+            self.writer.submit(("title", url, title))
+
+    def clear(self):
+        """清除全部历史记录"""
+        self.writer.submit(("clear",))
+
+    def connect_reader(self):
+        """为调用方所在线程打开一个只读连接"""
+        connection = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        connection.execute("PRAGMA query_only=ON")
+        return connection
+
+    def search(self, text, limit=20):
+        """按网址或标题搜索历史（在调用方线程执行）"""
+        pattern = f"%{text}%"
+        try:
+            connection = self.connect_reader()
+        except sqlite3.Error:
+            # 首次启动时数据库可能还没有创建
+            return []
+        try:
+            return connection.execute(
+                "SELECT url, title, visit_count, typed_count, last_visit FROM urls "
+                "WHERE url LIKE ? OR title LIKE ? ORDER BY last_visit DESC LIMIT ?",
+                (pattern, pattern, limit)).fetchall()
+        except sqlite3.Error as e:
+            print(f"历史记录查询失败: {e}")
+            return []
+        finally:
+            connection.close()
+
+    def close(self):
+        """退出时调用，等待写入线程完成"""
+        if self.writer.isRunning():
+            self.writer.stop()
@@ -1,19 +1,45 @@
 import sys
+from startup_trace import get_startup_trace, configure_startup_trace, parse_startup_trace_args
+from tracing import configure_tracing, parse_trace_args
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QFont
+from perf_profiles import apply_perf_profile, parse_perf_profile_args
+# QtWebEngine 必须在创建 QApplication 之前导入
+import PyQt5.QtWebEngineWidgets  # noqa: F401
+get_startup_trace().mark("qt_imported")
 from browser_window import PyroBrowser
+from styles import apply_theme
+from version import CURRENT_VERSION
+get_startup_trace().mark("modules_imported")
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    # --startup-trace[=输出文件] 输出启动各阶段耗时
+    argv, trace_enabled, trace_output = parse_startup_trace_args(sys.argv)
+    trace = configure_startup_trace(trace_enabled, trace_output)
+    
+    # --trace[=输出文件] 记录界面线程的跟踪事件，退出时导出为 Chrome trace JSON（运行中也可按 Ctrl+Shift+E）
+    argv, tracing_enabled, tracing_output = parse_trace_args(argv)
+    configure_tracing(tracing_enabled, tracing_output)
+    
+    # --perf-profile=low-memory|balanced|throughput，Chromium 参数必须在创建 QApplication 之前设置
+    argv, perf_profile = parse_perf_profile_args(argv)
+    trace.info["perf_profile"] = apply_perf_profile(perf_profile)
+    
+    app = QApplication(argv)
     
     # 强制设置应用字体
     app.setFont(QFont("Microsoft YaHei", 9))
     
     app.setApplicationName("烈焰浏览器")
-    app.setApplicationVersion("2.1.0")
+    app.setApplicationVersion(CURRENT_VERSION)
+    
+    # 整个应用只设置一份样式表
+    apply_theme(app)
+    trace.mark("qapplication_created")
     
     browser = PyroBrowser()
+    trace.mark("window_created")
     browser.show()
+    trace.mark("window_shown")
     
     sys.exit(app.exec_())
-    
\ No newline at end of file
@@ -0,0 +1,270 @@
+# memory_governor.py - 内存压力调节（/proc/meminfo 与 PSI，逐级释放缓存和标签页）
+import os
+import gc
+import json
+import time
+import threading
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineProfile
+
+from config import get_config, get_data_path
+from tracing import counter, instant
+
+DEFAULT_GOVERNOR_SETTINGS = {
+    "enabled": True,
+    "interval_seconds": 5,
+    # 各级响应的阈值，依次为：收缩缓存、清空 HTTP 缓存、冻结空闲标签页、丢弃最久未用的标签页
+    # 可用内存占比低于阈值，或 PSI some avg10（内存等待时间占比）高于阈值时进入该级
+    "available_percent_levels": [20, 15, 10, 5],
+    "psi_some_levels": [10, 20, 35, 50],
+    "cooldown_seconds": 60,          # 同一级响应两次执行的最小间隔
+    "freeze_idle_seconds": 60,       # 后台超过这么久的标签页才会被冻结
+    "discard_batch": 1,              # 每次最多丢弃的标签页数
+}
+
+LEVEL_NORMAL = 0
+LEVEL_SHRINK_CACHES = 1
+LEVEL_CLEAR_HTTP_CACHE = 2
+LEVEL_FREEZE_TABS = 3
+LEVEL_DISCARD_TABS = 4
+
+LEVEL_NAMES = {
+    LEVEL_NORMAL: "normal",
+    LEVEL_SHRINK_CACHES: "shrink_caches",
+    LEVEL_CLEAR_HTTP_CACHE: "clear_http_cache",
+    LEVEL_FREEZE_TABS: "freeze_tabs",
+    LEVEL_DISCARD_TABS: "discard_tabs",
+}
+
+# 动作日志（JSON Lines），超过大小后轮换为 .1
+LOG_FILE_NAME = "memory_governor.log"
+LOG_MAX_BYTES = 256 * 1024
+
+
+def read_meminfo():
+    """读取 /proc/meminfo，单位 KB"""
+    values = {}
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("MemTotal", "MemAvailable", "SwapTotal", "SwapFree"):
+                    values[name] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+
+def read_memory_pressure():
+    """读取 /proc/pressure/memory 的 avg10，内核不支持 PSI 时返回 None"""
+    try:
+        with open("/proc/pressure/memory", "r") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    pressure = {}
+    for line in lines:
+        kind, *fields = line.split()
+        for field in fields:
+            name, _, value = field.partition("=")
+            if name == "avg10":
+                pressure[kind] = float(value)
+    return pressure
+
+
+def pressure_level(sample, settings):
+    """根据可用内存占比和 PSI 计算压力等级，两者取较高的一级"""
+    level = LEVEL_NORMAL
+    available = sample.get("available_percent")
+    psi_some = sample.get("psi_some")
+    for index, threshold in enumerate(settings["available_percent_levels"], start=1):
+        if available is not None and available < threshold:
+            level = max(level, index)
+    for index, threshold in enumerate(settings["psi_some_levels"], start=1):
+        if psi_some is not None and psi_some > threshold:
+            level = max(level, index)
+    return min(level, LEVEL_DISCARD_TABS)
+
+
+class MemorySampler(QThread):
+    """后台采样线程：定期读取系统内存和 PSI"""
+
+    # 定义信号
+    sampled = pyqtSignal(object)   # {"available_percent", "available_kb", "swap_used_kb", "psi_some", "psi_full"}
+
+    def __init__(self, interval, parent=None):
+        super().__init__(parent)
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.sampled.emit(self.sample())
+            self.stop_event.wait(self.interval)
+
+    def sample(self):
+        meminfo = read_meminfo()
+        pressure = read_memory_pressure() or {}
+        total = meminfo.get("MemTotal")
+        available = meminfo.get("MemAvailable")
+        return {
+            "available_kb": available,
+            "available_percent": round(available * 100 / total, 1) if total and available is not None else None,
+            "swap_used_kb": meminfo.get("SwapTotal", 0) - meminfo.get("SwapFree", 0),
+            "psi_some": pressure.get("some"),
+            "psi_full": pressure.get("full"),
+        }
+
+    def stop(self):
+        self.stop_event.set()
+        self.wait()
+
+
+class MemoryGovernor(QObject):
+    """内存紧张时逐级释放内存，赶在系统开始换出渲染进程之前
+
+    1. 收缩 Python 侧缓存（搜索建议、拦截规则的正则、预渲染页面）
+    2. 清空配置文件的内存 HTTP 缓存（磁盘缓存时跳过）
+    3. 冻结空闲的后台标签页，让 Chromium 回收其内存
+    4. 丢弃最久未使用的后台标签页
+    等级越高，越低等级的动作也一并执行；每级动作有冷却时间，每个动作都写入日志。
+    """
+
+    # 定义信号
+    level_changed = pyqtSignal(int)
+    action_taken = pyqtSignal(str, str)   # (动作, 说明)
+
+    def __init__(self, browser_window, parent=None):
+        super().__init__(parent)
+        self.browser_window = browser_window
+        self.settings = get_config("memory_governor", DEFAULT_GOVERNOR_SETTINGS)
+        self.cache_trimmers = []     # [(名称, 函数)]，函数返回释放的条目数
+        self.level = LEVEL_NORMAL
+        self.last_sample = {}
+        self.last_action = {}        # 等级 -> 上次执行的时间
+        self.log_path = get_data_path(LOG_FILE_NAME)
+
+        self.sampler = MemorySampler(float(self.settings["interval_seconds"]), self)
+        self.sampler.sampled.connect(self.on_sampled)
+
+    def register_cache(self, name, trim):
+        """登记一个可以在内存紧张时清空的缓存"""
+        self.cache_trimmers.append((name, trim))
+
+    def start(self):
+        if self.settings["enabled"] and not self.sampler.isRunning():
+            self.sampler.stop_event.clear()
+            self.sampler.start()
+
+    def stop(self):
+        self.sampler.stop()
+
+    def on_sampled(self, sample):
+        self.last_sample = sample
+        counter("memory", "memory", available_percent=sample.get("available_percent"),
+                psi_some=sample.get("psi_some"))
+        level = pressure_level(sample, self.settings)
+        if level != self.level:
+            self.log("level", f"{LEVEL_NAMES[self.level]} -> {LEVEL_NAMES[level]}")
+            self.level = level
+            self.level_changed.emit(level)
+        if level == LEVEL_NORMAL:
+            return
+
+        now = time.monotonic()
+        actions = {
+            LEVEL_SHRINK_CACHES: self.shrink_caches,
+            LEVEL_CLEAR_HTTP_CACHE: self.clear_http_cache,
+            LEVEL_FREEZE_TABS: self.freeze_idle_tabs,
+            LEVEL_DISCARD_TABS: self.discard_lru_tabs,
+        }
+        for stage in range(LEVEL_SHRINK_CACHES, level + 1):
+            if now - self.last_action.get(stage, -1e9) < self.settings["cooldown_seconds"]:
+                continue
+            self.last_action[stage] = now
+            actions[stage]()
+
+    def shrink_caches(self):
+        freed = []
+        for name, trim in self.cache_trimmers:
+            try:
+                count = trim()
+            except Exception as e:
+                print(f"缓存清理失败 {name}: {e}")
+                continue
+            if count:
+                freed.append(f"{name}={count}")
+        collected = gc.collect()
+        self.log("shrink_caches", ", ".join(freed + [f"gc={collected}"]))
+
+    def clear_http_cache(self):
+        """只清空内存中的 HTTP 缓存；磁盘缓存几乎不占内存，清空它只会在内存紧张时增加网络和磁盘读写"""
+        profile = self.browser_window.profile
+        if profile.httpCacheType() != QWebEngineProfile.MemoryHttpCache:
+            self.log("clear_http_cache_skipped", "HTTP 缓存在磁盘上")
+            return
+        profile.clearHttpCache()
+        self.log("clear_http_cache", "内存缓存")
+
+    def freeze_idle_tabs(self):
+        lifecycle_manager = self.browser_window.lifecycle_manager
+        min_idle = self.settings["freeze_idle_seconds"]
+        views = [view for view in lifecycle_manager.idle_views()
+                 if lifecycle_manager.background_seconds(view) >= min_idle
+                 and view.page().lifecycleState() == QWebEnginePage.Active]
+        self.transition_views(views, QWebEnginePage.Frozen, len(views), self.on_tabs_frozen)
+
+    def on_tabs_frozen(self, frozen):
+        if frozen:
+            self.log("freeze_tabs", "; ".join(frozen))
+
+    def discard_lru_tabs(self):
+        lifecycle_manager = self.browser_window.lifecycle_manager
+        views = [view for view in lifecycle_manager.idle_views()
+                 if view.page().lifecycleState() != QWebEnginePage.Discarded]
+        self.transition_views(views, QWebEnginePage.Discarded, int(self.settings["discard_batch"]),
+                              self.on_tabs_discarded)
+
+    def on_tabs_discarded(self, discarded):
+        if discarded:
+            self.log("discard_tabs", "; ".join(discarded))
+            self.browser_window.statusBar().showMessage(
+                f"内存不足，已丢弃 {len(discarded)} 个后台标签页", 5000)
+
+    def transition_views(self, views, target_state, limit, on_finished, done=None):
+        """依次请求切换标签页状态，直到 limit 个切换成功或没有候选
+
+        有未提交输入的页面会被生命周期管理器跳过，跳过的不计入 limit；
+        on_finished(标题列表) 只收到确实完成切换的标签页。
+        """
+        done = [] if done is None else done
+        lifecycle_manager = self.browser_window.lifecycle_manager
+        while views and len(done) < limit:
+            view = views.pop(0)
+            if view not in lifecycle_manager.background_since:
+                continue   # 等待期间已关闭
+
+            def on_done(v, applied):
+                if applied:
+                    done.append(v.title() or v.url().toString())
+                self.transition_views(views, target_state, limit, on_finished, done)
+
+            lifecycle_manager.request_transition(view, target_state, on_done)
+            return
+        on_finished(done)
+
+    def log(self, action, detail=""):
+        """输出并追加到动作日志，附带当时的内存状况"""
+        sample = self.last_sample
+        print(f"内存调节 [{action}] {detail} (可用 {sample.get('available_percent')}%, "
+              f"PSI {sample.get('psi_some')})")
+        self.action_taken.emit(action, detail)
+        instant(f"memory_governor.{action}", "memory", detail=detail)
+        record = {"time": round(time.time(), 3), "action": action, "detail": detail, **sample}
+        try:
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > LOG_MAX_BYTES:
+                os.replace(self.log_path, self.log_path + ".1")
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"内存调节日志写入失败: {e}")
@@ -0,0 +1,350 @@
+# omnibox.py - 地址栏自动补全（前缀/词索引 + frecency 排序）
+import re
+import math
+import time
+import heapq
+import bisect
+from PyQt5.QtCore import QObject, QThread, Qt, QStringListModel, pyqtSignal
+from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import QCompleter
+
+# frecency 半衰期（天）：一次访问的权重每过这么多天减半
+HALF_LIFE_DAYS = 30
+DECAY_RATE = math.log(2) / HALF_LIFE_DAYS
+EPOCH = 1577836800  # 2020-01-01，避免指数过大
+
+# 不同来源的访问权重
+TRANSITION_WEIGHTS = {
+    "typed": 2.0,
+    "search": 1.5,
+    "link": 1.0,
+    "home": 1.0,
+    "restore": 0.3,
+    "reload": 0.3,
+}
+
+# 出现在大多数网址中的词，不参与候选集选择
+STOP_TOKENS = frozenset(["http", "https", "www", "com", "cn", "net", "org", "html", "htm", "php", "index"])
+
+# 候选数超过这个值时改为按 frecency 顺序扫描
+CANDIDATE_LIMIT = 1500
+# 按顺序扫描的时间上限（秒），保证每次按键的耗时有上限
+SCAN_BUDGET = 0.001
+# 有这么多条目分数变化后重新排序
+RESORT_THRESHOLD = 2000
+
+TOKEN_RE = re.compile(r"\w+")
+SCHEME_RE = re.compile(r"^[a-z][a-z0-9+.-]*://(www\.)?")
+
+
+def tokenize_url(url):
+    """网址分词：去掉协议和 www 后的主机名整体作为一个词，再按非字母数字切分"""
+    lowered = SCHEME_RE.sub("", url.lower())
+    host = lowered.split("/", 1)[0]
+    return [host] + TOKEN_RE.findall(lowered)
+
+
+def tokenize_query(text):
+    return TOKEN_RE.findall(SCHEME_RE.sub("", text.lower().strip()))
+
+
+def visit_score(visit_time, transition):
+    """一次访问在对数空间中的分数，越新越大"""
+    days = (visit_time - EPOCH) / 86400
+    return math.log(TRANSITION_WEIGHTS.get(transition, 1.0)) + DECAY_RATE * days
+
+
+def log_add(a, b):
+    """log(exp(a) + exp(b))，用于累加访问分数"""
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+class OmniboxEntry:
+    """索引中的一个网址"""
+    __slots__ = ("url", "title", "score", "tokens", "text")
+
+    def __init__(self, url, title, score):
+        self.url = url
+        self.title = title
+        self.score = score
+        self.tokens = ()
+        self.text = ""
+
+
+class FrecencyIndex:
+    """内存中的前缀/词索引，按 frecency 排序返回候选
+
+    分数保存在对数空间中：每次访问贡献 weight * exp(λ·t)，因此分数只增不减，
+    不同条目之间的相对顺序不会随时间推移改变，无需定期重新计算。
+    """
+
+    def __init__(self):
+        self.entries = {}      # url -> OmniboxEntry
+        self.postings = {}     # token -> set(OmniboxEntry)
+        self.tokens = []       # 有序词表，用于前缀范围查找
+        self.ranked = []       # 上次排序时按分数降序排列的条目
+        self.recent = set()    # 排序后分数发生变化的条目
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add_visit(self, url, title="", visit_time=None, transition="link"):
+        """记录一次访问（增量更新索引）"""
+        score = visit_score(visit_time or time.time(), transition)
+        entry = self.entries.get(url)
+        if entry is None:
+            entry = OmniboxEntry(url, title, score)
+            self.entries[url] = entry
+            self.index_entry(entry)
+        else:
+            entry.score = log_add(entry.score, score)
+            if title and title != entry.title:
+                self.update_title(url, title)
+        self.mark_recent(entry)
+        return entry
+
+    def add_entry(self, url, title, score):
+        """批量加载时直接添加带分数的条目（不排序，需随后调用 rebuild_order）"""
+        entry = OmniboxEntry(url, title, score)
+        self.entries[url] = entry
+        self.index_entry(entry, bulk=True)
+
+    def update_title(self, url, title):
+        entry = self.entries.get(url)
+        if entry is None or not title or title == entry.title:
+            return
+        self.unindex_entry(entry)
+        entry.title = title
+        self.index_entry(entry)
+
+    def index_entry(self, entry, bulk=False):
+        tokens = tokenize_url(entry.url) + TOKEN_RE.findall(entry.title.lower())
+        entry.tokens = tuple(dict.fromkeys(tokens))
+        entry.text = " " + " ".join(entry.tokens)
+        for token in entry.tokens:
+            if token in STOP_TOKENS or token.isdigit():
+                # 常见词和纯数字只参与过滤，不建立倒排索引
+                continue
+            posting = self.postings.get(token)
+            if posting is None:
+                self.postings[token] = {entry}
+                if not bulk:
+                    bisect.insort(self.tokens, token)
+            else:
+                posting.add(entry)
+
+    def unindex_entry(self, entry):
+        for token in entry.tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(entry)
+            if not posting:
+                del self.postings[token]
+                index = bisect.bisect_left(self.tokens, token)
+                if index < len(self.tokens) and self.tokens[index] == token:
+                    del self.tokens[index]
+
+    def mark_recent(self, entry):
+        self.recent.add(entry)
+        if len(self.recent) >= RESORT_THRESHOLD:
+            self.rebuild_order()
+
+    def rebuild_order(self):
+        """重新排序（数据基本有序时 Timsort 接近线性）"""
+        self.tokens = sorted(self.postings)
+        self.ranked = sorted(self.entries.values(), key=lambda e: e.score, reverse=True)
+        self.recent.clear()
+
+    def clear(self):
+        self.__init__()
+
+    def token_range(self, prefix):
+        lo = bisect.bisect_left(self.tokens, prefix)
+        hi = bisect.bisect_left(self.tokens, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def search(self, text, limit=8):
+        """返回与输入匹配的前 limit 个条目，按 frecency 降序"""
+        terms = tokenize_query(text)
+        if not terms:
+            return []
+        needles = [" " + term for term in terms]
+
+        def matches(entry):
+            entry_text = entry.text
+            for needle in needles:
+                if needle not in entry_text:
+                    return False
+            return True
+
+        candidates = self.collect_candidates(terms)
+        if candidates is not None:
+            return heapq.nlargest(limit, filter(matches, candidates), key=lambda e: e.score)
+        return self.scan_ranked(matches, limit)
+
+    def collect_candidates(self, terms):
+        """用最有区分度的词收集候选集，候选过多时返回 None"""
+        best = None
+        for term in terms:
+            if term in STOP_TOKENS or term.isdigit():
+                continue
+            lo, hi = self.token_range(term)
+            if best is None or hi - lo < best[1] - best[0]:
+                best = (lo, hi)
+        if best is None:
+            return None
+
+        candidates = set()
+        for token in self.tokens[best[0]:best[1]]:
+            candidates.update(self.postings[token])
+            if len(candidates) > CANDIDATE_LIMIT:
+                return None
+        return candidates
+
+    def scan_ranked(self, matches, limit):
+        """候选过多时按分数顺序扫描，找到 limit 个匹配或用完时间预算即停止
+
+        超出预算时返回的是分数最高的那部分条目中的匹配，对自动补全来说已经足够。
+        """
+        recent = self.recent
+        found = []
+        deadline = time.perf_counter() + SCAN_BUDGET
+        for position, entry in enumerate(self.ranked):
+            if position & 511 == 0 and position and time.perf_counter() > deadline:
+                break
+            if entry in recent:
+                continue
+            if matches(entry):
+                found.append(entry)
+                if len(found) >= limit:
+                    break
+        # 排序后分数变化的条目单独检查
+        found.extend(entry for entry in recent if matches(entry))
+        return heapq.nlargest(limit, found, key=lambda e: e.score)
+
+
+class OmniboxIndexLoader(QThread):
+    """后台从历史数据库构建索引"""
+
+    # 定义信号
+    index_ready = pyqtSignal(object)
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+
+    def run(self):
+        index = FrecencyIndex()
+        try:
+            connection = self.history.connect_reader()
+        except Exception as e:
+            print(f"自动补全索引加载失败: {e}")
+            self.index_ready.emit(index)
+            return
+        try:
+            rows = connection.execute(
+                "SELECT url, title, visit_count, typed_count, last_visit FROM urls")
+            for url, title, visit_count, typed_count, last_visit in rows:
+                # 用访问次数和最近访问时间近似还原分数
+                weight = visit_count + typed_count * (TRANSITION_WEIGHTS["typed"] - 1)
+                score = math.log(max(weight, 1)) + visit_score(last_visit, "link")
+                index.add_entry(url, title or "", score)
+        except Exception as e:
+            print(f"自动补全索引加载失败: {e}")
+        finally:
+            connection.close()
+        index.rebuild_order()
+        self.index_ready.emit(index)
+
+
+class SuggestionListModel(QStringListModel):
+    """候选列表，网址前显示网站图标"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.icon_provider = None   # 网址 -> QIcon
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DecorationRole:
+            if self.icon_provider is None or not index.isValid():
+                return None
+            text = super().data(index, Qt.DisplayRole)
+            return self.icon_provider(text) if "://" in text else QIcon()
+        return super().data(index, role)
+
+
+class OmniboxCompleter(QObject):
+    """把 frecency 索引接到地址栏上"""
+
+    # 定义信号
+    suggestion_activated = pyqtSignal(str)
+    top_candidate_changed = pyqtSignal(str, str)   # (输入文字, 首个候选网址)
+
+    def __init__(self, url_bar, parent=None):
+        super().__init__(parent)
+        self.url_bar = url_bar
+        self.index = FrecencyIndex()
+        self.pending_visits = []   # 索引加载期间的访问，加载完成后补上
+        self.loader = None
+        self.max_suggestions = 8
+        self.history_rows = []     # 当前显示的历史记录候选，搜索建议追加在后面
+
+        self.model = SuggestionListModel(self)
+        self.completer = QCompleter(self.model, self)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.completer.activated[str].connect(self.suggestion_activated)
+        url_bar.setCompleter(self.completer)
+        url_bar.textEdited.connect(self.update_suggestions)
+
+    def load_from_history(self, history):
+        """在后台线程中从历史数据库构建索引"""
+        self.loader = OmniboxIndexLoader(history, self)
+        self.loader.index_ready.connect(self.on_index_ready)
+        self.loader.start()
+
+    def on_index_ready(self, index):
+        self.index = index
+        for visit in self.pending_visits:
+            self.index.add_visit(*visit)
+        self.pending_visits = []
+        self.loader = None
+
+    def record_visit(self, url, title="", transition="link"):
+        """页面加载时增量更新索引"""
+        visit = (url, title, time.time(), transition)
+        if self.loader is not None:
+            self.pending_visits.append(visit)
+        self.index.add_visit(*visit)
+
+    def update_title(self, url, title):
+        self.index.update_title(url, title)
+
+    def update_suggestions(self, text):
+        """每次按键时刷新候选"""
+        entries = self.index.search(text, self.max_suggestions)
+        self.history_rows = [entry.url for entry in entries]
+        self.model.setStringList(self.history_rows)
+        if entries:
+            self.completer.complete()
+            self.top_candidate_changed.emit(text, entries[0].url)
+        else:
+            self.completer.popup().hide()
+
+    def add_search_suggestions(self, prefix, suggestions):
+        """搜索建议异步返回后追加在历史记录候选之后（地址栏内容已变化时忽略）"""
+        if prefix != self.url_bar.text().strip() or not suggestions:
+            return
+        rows = self.history_rows + [s for s in suggestions if s not in self.history_rows and s != prefix]
+        if not rows:
+            return
+        self.model.setStringList(rows)
+        self.completer.complete()
+
+    def clear(self):
+        self.index.clear()
+        self.history_rows = []
+        self.model.setStringList([])
@@ -0,0 +1,122 @@
+# perf_profiles.py - 渲染进程模型与 Chromium 性能配置档
+import os
+import sys
+import json
+import time
+
+from config import get_config, get_data_path
+
+# QtWebEngine 在初始化时读取这个环境变量作为 Chromium 命令行参数
+CHROMIUM_FLAGS_ENV = "QTWEBENGINE_CHROMIUM_FLAGS"
+
+# 记录当前生效的配置档，便于对比不同配置下的基准测试结果
+ACTIVE_PROFILE_FILE_NAME = "active_perf_profile.json"
+
+# 命名配置档 -> Chromium 参数
+PROFILES = {
+    "low-memory": {
+        "description": "内存优先：同一站点共用渲染进程，限制进程数和 V8 堆大小",
+        "flags": [
+            "--process-per-site",
+            "--renderer-process-limit=2",
+            "--js-flags=--max-old-space-size=256",
+            "--num-raster-threads=1",
+        ],
+    },
+    "balanced": {
+        "description": "均衡：Chromium 默认进程模型，适度限制进程数",
+        "flags": [
+            "--renderer-process-limit=8",
+            "--num-raster-threads=2",
+        ],
+    },
+    "throughput": {
+        "description": "吞吐优先：每个标签页独立进程，更大的 V8 堆和更多光栅化线程",
+        "flags": [
+            "--process-per-tab",
+            "--js-flags=--max-old-space-size=2048",
+            "--num-raster-threads=4",
+        ],
+    },
+}
+
+DEFAULT_PROFILE = "balanced"
+
+# 配置文件中的 "performance" 节
+DEFAULT_PERFORMANCE_SETTINGS = {
+    "profile": DEFAULT_PROFILE,
+    "extra_flags": [],
+}
+
+_active_profile = None
+
+
+def parse_perf_profile_args(argv):
+    """从命令行参数中取出 --perf-profile=名称，返回 (剩余参数, 配置档名称或 None)"""
+    remaining = []
+    name = None
+    for arg in argv:
+        if arg.startswith("--perf-profile="):
+            name = arg.split("=", 1)[1] or None
+        else:
+            remaining.append(arg)
+    return remaining, name
+
+
+def resolve_profile(name=None):
+    """命令行指定的配置档优先，其次是配置文件，未知名称回退到默认配置档"""
+    settings = get_config("performance", DEFAULT_PERFORMANCE_SETTINGS)
+    name = name or settings["profile"]
+    if name not in PROFILES:
+        print(f"未知的性能配置档: {name}，可选: {', '.join(PROFILES)}", file=sys.stderr)
+        name = DEFAULT_PROFILE
+    return name
+
+
+def build_chromium_flags(name, extra_flags=(), existing=""):
+    """合并配置档参数、额外参数和环境变量中已有的参数
+
+    已有参数放在最后，用户在环境变量中手动指定的同名参数优先生效。
+    """
+    flags = list(PROFILES[name]["flags"]) + list(extra_flags)
+    flags.extend(existing.split())
+    return " ".join(flags)
+
+
+def apply_perf_profile(name=None):
+    """在创建 QApplication 之前调用：设置 Chromium 参数并记录生效的配置档"""
+    global _active_profile
+    name = resolve_profile(name)
+    settings = get_config("performance", DEFAULT_PERFORMANCE_SETTINGS)
+    flags = build_chromium_flags(name, settings["extra_flags"], os.environ.get(CHROMIUM_FLAGS_ENV, ""))
+    os.environ[CHROMIUM_FLAGS_ENV] = flags
+
+    _active_profile = {
+        "profile": name,
+        "flags": flags,
+        "applied_at": int(time.time()),
+    }
+    record_active_profile(_active_profile)
+    return name
+
+
+def record_active_profile(info):
+    path = get_data_path(ACTIVE_PROFILE_FILE_NAME)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"性能配置档记录失败: {e}")
+
+
+def get_active_profile():
+    """返回本次运行生效的配置档信息，未调用 apply_perf_profile 时读取上次记录"""
+    if _active_profile is not None:
+        return _active_profile
+    try:
+        with open(get_data_path(ACTIVE_PROFILE_FILE_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,49 @@
+# procstats.py - 从 /proc 读取进程的内存与 CPU 占用（不依赖 Qt）
+import os
+
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    CLOCK_TICKS = 100
+
+
+def read_process_memory(pid):
+    """读取进程内存 (RSS, PSS)，单位 KB；smaps_rollup 不可用时只返回 RSS"""
+    rss = pss = None
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                if line.startswith("Rss:"):
+                    rss = int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+                    break
+        return rss, pss
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError):
+        return None, None
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1])
+                    break
+    except (OSError, ValueError):
+        pass
+    return rss, pss
+
+
+def read_process_cpu_ticks(pid):
+    """读取进程累计的用户态与内核态 CPU 时间（时钟滴答数）"""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # 进程名可能包含空格和括号，从最后一个 ')' 之后开始解析
+    fields = data[data.rfind(")") + 2:].split()
+    try:
+        return int(fields[11]) + int(fields[12])   # utime + stime
+    except (IndexError, ValueError):
+        return None
@@ -0,0 +1,237 @@
+# search_suggest.py - 搜索引擎与地址栏搜索建议（异步、防抖、按前缀缓存）
+import json
+from collections import OrderedDict
+from urllib.parse import quote_plus
+from PyQt5.QtCore import QObject, QTimer, QUrl, pyqtSignal
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+
+from config import get_config
+
+DEFAULT_SEARCH_SETTINGS = {
+    "engine": "bing",
+    "suggest": True,
+    "debounce_ms": 120,
+    "timeout_ms": 3000,
+    "max_suggestions": 5,
+    # 自定义引擎，例如指向本地测试服务器：
+    # {"name": "local", "display_name": "本地", "search_url": "http://127.0.0.1:8000/s?q={query}",
+    #  "suggest_url": "http://127.0.0.1:8000/suggest?q={query}", "suggest_format": "opensearch"}
+    "custom_engines": [],
+}
+
+# 按前缀缓存的建议条数
+SUGGEST_CACHE_SIZE = 256
+
+
+def parse_opensearch(data):
+    """OpenSearch 建议格式: [输入, [建议...], ...]"""
+    result = json.loads(data)
+    if isinstance(result, list) and len(result) > 1 and isinstance(result[1], list):
+        return [str(item) for item in result[1]]
+    return []
+
+
+def parse_duckduckgo(data):
+    """DuckDuckGo 格式: [{"phrase": ...}, ...]，type=list 时与 OpenSearch 相同"""
+    result = json.loads(data)
+    if result and isinstance(result[0], dict):
+        return [str(item.get("phrase", "")) for item in result if item.get("phrase")]
+    return parse_opensearch(data)
+
+
+def parse_bilibili(data):
+    """哔哩哔哩站内搜索建议: {"result": {"tag": [{"value": ...}]}}，旧接口为 {"0": {"value": ...}}"""
+    result = json.loads(data)
+    if not isinstance(result, dict):
+        return []
+    items = result.get("result", {}).get("tag", []) if isinstance(result.get("result"), dict) else result.values()
+    return [str(item["value"]) for item in items if isinstance(item, dict) and item.get("value")]
+
+
+SUGGEST_PARSERS = {
+    "opensearch": parse_opensearch,
+    "duckduckgo": parse_duckduckgo,
+    "bilibili": parse_bilibili,
+}
+
+
+class SearchEngine:
+    """一个搜索引擎：搜索地址、建议地址和建议格式
+
+    site 不为空时是站内搜索，只在浏览该站点时使用（如哔哩哔哩）。
+    """
+
+    def __init__(self, name, display_name, search_url, suggest_url="", suggest_format="opensearch", site=""):
+        self.name = name
+        self.display_name = display_name
+        self.search_url = search_url
+        self.suggest_url = suggest_url
+        self.suggest_format = suggest_format
+        self.site = site
+
+    def search_url_for(self, query):
+        return self.search_url.replace("{query}", quote_plus(query))
+
+    def suggest_url_for(self, query):
+        return self.suggest_url.replace("{query}", quote_plus(query))
+
+    def parse_suggestions(self, data):
+        return SUGGEST_PARSERS.get(self.suggest_format, parse_opensearch)(data)
+
+
+ENGINES = {}
+
+
+def register_engine(engine):
+    """注册搜索引擎（同名时替换）"""
+    ENGINES[engine.name] = engine
+    return engine
+
+
+register_engine(SearchEngine("bing", "必应", "https://www.bing.com/search?q={query}",
+                             "https://api.bing.com/osjson.aspx?query={query}"))
+register_engine(SearchEngine("baidu", "百度", "https://www.baidu.com/s?wd={query}",
+                             "https://suggestion.baidu.com/su?wd={query}&action=opensearch&ie=utf-8"))
+register_engine(SearchEngine("google", "Google", "https://www.google.com/search?q={query}",
+                             "https://suggestqueries.google.com/complete/search?client=firefox&q={query}"))
+register_engine(SearchEngine("duckduckgo", "DuckDuckGo", "https://duckduckgo.com/?q={query}",
+                             "https://duckduckgo.com/ac/?q={query}&type=list", "duckduckgo"))
+register_engine(SearchEngine("bilibili", "哔哩哔哩", "https://search.bilibili.com/all?keyword={query}",
+                             "https://s.search.bilibili.com/main/suggest?term={query}", "bilibili",
+                             site="bilibili.com"))
+
+_custom_engines_loaded = False
+
+
+def load_custom_engines():
+    """注册配置文件中的自定义引擎（只读取一次）"""
+    global _custom_engines_loaded
+    if _custom_engines_loaded:
+        return
+    _custom_engines_loaded = True
+    for item in get_config("search", DEFAULT_SEARCH_SETTINGS)["custom_engines"]:
+        try:
+            register_engine(SearchEngine(
+                item["name"], item.get("display_name", item["name"]), item["search_url"],
+                item.get("suggest_url", ""), item.get("suggest_format", "opensearch"), item.get("site", "")))
+        except (KeyError, TypeError) as e:
+            print(f"自定义搜索引擎配置无效: {e}")
+
+
+def get_default_engine():
+    load_custom_engines()
+    name = get_config("search", DEFAULT_SEARCH_SETTINGS)["engine"]
+    return ENGINES.get(name, ENGINES["bing"])
+
+
+def select_engine(current_url=""):
+    """浏览站内搜索引擎对应的站点时使用站内搜索，否则使用默认引擎"""
+    load_custom_engines()
+    host = QUrl(current_url).host().lower() if current_url else ""
+    if host:
+        for engine in ENGINES.values():
+            if engine.site and (host == engine.site or host.endswith("." + engine.site)):
+                return engine
+    return get_default_engine()
+
+
+def looks_like_url(text):
+    return text.startswith(("http://", "https://")) or ("." in text and " " not in text)
+
+
+class SearchSuggestProvider(QObject):
+    """异步获取搜索建议
+
+    每次按键只重启防抖定时器；发出新请求前中止上一个仍未完成的请求；
+    结果按 (引擎, 前缀) 缓存在 LRU 中，命中时立即返回。输入从不等待网络。
+    """
+
+    # 定义信号
+    suggestions_ready = pyqtSignal(str, list)   # (前缀, 建议)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = get_config("search", DEFAULT_SEARCH_SETTINGS)
+        self.enabled = bool(self.settings["suggest"])
+        self.network = QNetworkAccessManager(self)
+        self.cache = OrderedDict()
+        self.pending = None        # (前缀, 引擎)，等待防抖结束
+        self.reply = None          # 正在进行的请求
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(int(self.settings["debounce_ms"]))
+        self.debounce_timer.timeout.connect(self.send_pending)
+
+    def request(self, text, engine):
+        """地址栏文字变化时调用"""
+        prefix = text.strip()
+        if not self.enabled or not prefix or not engine.suggest_url or looks_like_url(prefix):
+            self.cancel()
+            return
+        key = (engine.name, prefix.lower())
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.cancel()
+            self.suggestions_ready.emit(prefix, cached)
+            return
+        # 前缀已经变化，之前的请求结果不再需要
+        self.abort_reply()
+        self.pending = (prefix, engine)
+        self.debounce_timer.start()
+
+    def send_pending(self):
+        if self.pending is None:
+            return
+        prefix, engine = self.pending
+        self.pending = None
+        self.abort_reply()
+
+        request = QNetworkRequest(QUrl(engine.suggest_url_for(prefix)))
+        if hasattr(request, "setTransferTimeout"):
+            request.setTransferTimeout(int(self.settings["timeout_ms"]))
+        reply = self.network.get(request)
+        self.reply = reply
+        reply.finished.connect(lambda r=reply, p=prefix, e=engine: self.on_reply_finished(r, p, e))
+
+    def on_reply_finished(self, reply, prefix, engine):
+        reply.deleteLater()
+        if reply is self.reply:
+            self.reply = None
+        if reply.error() != QNetworkReply.NoError:
+            if reply.error() != QNetworkReply.OperationCanceledError:
+                print(f"搜索建议获取失败: {reply.errorString()}")
+            return
+        try:
+            suggestions = engine.parse_suggestions(bytes(reply.readAll()).decode("utf-8", "replace"))
+        except (ValueError, TypeError, AttributeError, KeyError) as e:
+            print(f"搜索建议解析失败: {e}")
+            return
+        suggestions = suggestions[:int(self.settings["max_suggestions"])]
+        self.store(engine.name, prefix, suggestions)
+        self.suggestions_ready.emit(prefix, suggestions)
+
+    def store(self, engine_name, prefix, suggestions):
+        self.cache[(engine_name, prefix.lower())] = suggestions
+        self.cache.move_to_end((engine_name, prefix.lower()))
+        while len(self.cache) > SUGGEST_CACHE_SIZE:
+            self.cache.popitem(last=False)
+
+    def clear_cache(self):
+        """清空建议缓存，返回清除的条目数"""
+        count = len(self.cache)
+        self.cache.clear()
+        return count
+
+    def abort_reply(self):
+        """中止前缀已经过时的请求"""
+        if self.reply is not None:
+            reply = self.reply
+            self.reply = None
+            reply.abort()
+
+    def cancel(self):
+        self.pending = None
+        self.debounce_timer.stop()
+        self.abort_reply()
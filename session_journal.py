@@ -0,0 +1,283 @@
+# session_journal.py - 崩溃安全的会话日志（追加写入 + 定期快照）
+import os
+import json
+import time
+import queue
+from PyQt5.QtCore import QObject, QThread
+
+from config import get_data_path
+
+JOURNAL_FILE_NAME = "session.journal"
+SNAPSHOT_FILE_NAME = "session.snapshot"
+
+# 日志记录类型
+OP_OPEN = "o"       # 打开标签页 {"op","id","i","u","t"}
+OP_CLOSE = "c"      # 关闭标签页 {"op","id"}
+OP_NAVIGATE = "n"   # 导航 {"op","id","u"}
+OP_TITLE = "t"      # 标题变化 {"op","id","t"}
+OP_MOVE = "m"       # 拖动排序 {"op","f","to"}
+OP_SELECT = "s"     # 切换当前标签页 {"op","id"}
+# 每条记录写入时还带有递增的序号 "q"，快照保存已包含的最后一个序号
+
+# 写入批处理参数
+FLUSH_INTERVAL = 0.5          # 秒，合并这段时间内的记录一次写入
+MAX_BATCH_SIZE = 500
+COMPACT_EVERY_RECORDS = 2000  # 日志超过这么多条时压缩为快照
+COMPACT_EVERY_SECONDS = 300
+
+_STOP = object()
+
+
+class SessionState:
+    """会话状态：按顺序排列的标签页及当前标签页"""
+
+    def __init__(self):
+        self.order = []   # 标签页 id 顺序
+        self.tabs = {}    # id -> {"u": url, "t": title}
+        self.current = None
+        self.seq = 0      # 已应用的最后一条记录的序号
+
+    def apply(self, record):
+        """应用一条日志记录；序号不大于 seq 的记录已经包含在快照中，跳过
+
+        快照替换后、清空日志前崩溃时，日志里会留下这些记录，而打开和移动记录不能重复应用。
+        """
+        seq = record.get("q")
+        if seq is not None:
+            if seq <= self.seq:
+                return
+            self.seq = seq
+        op = record.get("op")
+        tab_id = record.get("id")
+        if op == OP_OPEN:
+            if tab_id in self.tabs:
+                self.order.remove(tab_id)
+            index = record.get("i", -1)
+            if index < 0 or index > len(self.order):
+                index = len(self.order)
+            self.order.insert(index, tab_id)
+            self.tabs[tab_id] = {"u": record.get("u", ""), "t": record.get("t", "")}
+        elif op == OP_CLOSE:
+            if tab_id in self.tabs:
+                self.order.remove(tab_id)
+                del self.tabs[tab_id]
+            if self.current == tab_id:
+                self.current = None
+        elif op == OP_NAVIGATE:
+            if tab_id in self.tabs:
+                self.tabs[tab_id]["u"] = record.get("u", "")
+        elif op == OP_TITLE:
+            if tab_id in self.tabs:
+                self.tabs[tab_id]["t"] = record.get("t", "")
+        elif op == OP_MOVE:
+            from_index, to_index = record.get("f", -1), record.get("to", -1)
+            if 0 <= from_index < len(self.order) and 0 <= to_index < len(self.order):
+                self.order.insert(to_index, self.order.pop(from_index))
+        elif op == OP_SELECT:
+            if tab_id in self.tabs:
+                self.current = tab_id
+
+    def to_snapshot(self):
+        return {
+            "version": 1,
+            "seq": self.seq,
+            "current": self.current,
+            "tabs": [[tab_id, self.tabs[tab_id]["u"], self.tabs[tab_id]["t"]] for tab_id in self.order],
+        }
+
+    @classmethod
+    def from_snapshot(cls, data):
+        state = cls()
+        for tab_id, url, title in data.get("tabs", []):
+            state.order.append(tab_id)
+            state.tabs[tab_id] = {"u": url, "t": title}
+        if data.get("current") in state.tabs:
+            state.current = data["current"]
+        state.seq = data.get("seq", 0)
+        return state
+
+    def max_id(self):
+        return max(self.order, default=0)
+
+
+def load_session_state(snapshot_path, journal_path):
+    """读取快照并重放日志，恢复会话状态"""
+    state = SessionState()
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            state = SessionState.from_snapshot(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"会话快照读取失败: {e}")
+
+    try:
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    state.apply(json.loads(line))
+                except ValueError:
+                    # 崩溃时最后一行可能只写了一半
+                    break
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"会话日志读取失败: {e}")
+    return state
+
+
+class SessionJournalWriter(QThread):
+    """会话日志写入线程：批量写入并 fsync，定期压缩为快照"""
+
+    def __init__(self, state, snapshot_path, journal_path, parent=None):
+        super().__init__(parent)
+        self.state = state
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.records = queue.Queue()
+        self.failed = False   # 写入出错后不再接受记录，避免队列无限增长
+        self.records_since_snapshot = 0
+        self.last_snapshot_time = time.monotonic()
+
+    def run(self):
+        """执行写入循环"""
+        journal = None
+        try:
+            # 启动时先把恢复出来的状态写成快照，日志从空开始
+            self.write_snapshot()
+            journal = open(self.journal_path, "a", encoding="utf-8")
+            while True:
+                batch, stopping = self.collect_batch()
+                if batch:
+                    self.write_batch(journal, batch)
+                if stopping or self.should_compact():
+                    journal.close()
+                    self.write_snapshot()
+                    if stopping:
+                        return
+                    journal = open(self.journal_path, "a", encoding="utf-8")
+        except OSError as e:
+            self.failed = True
+            print(f"会话日志写入失败，本次运行不再记录会话: {e}")
+        finally:
+            if journal is not None and not journal.closed:
+                journal.close()
+
+    def collect_batch(self):
+        """等待第一条记录，然后收集 FLUSH_INTERVAL 内的其余记录"""
+        try:
+            first = self.records.get(timeout=COMPACT_EVERY_SECONDS)
+        except queue.Empty:
+            return [], False
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(batch) < MAX_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                record = self.records.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if record is _STOP:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    def write_batch(self, journal, batch):
+        """追加写入一批记录并刷到磁盘"""
+        for seq, record in enumerate(batch, start=self.state.seq + 1):
+            record["q"] = seq
+        journal.write("".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                              for record in batch))
+        journal.flush()
+        os.fsync(journal.fileno())
+        for record in batch:
+            self.state.apply(record)
+        self.records_since_snapshot += len(batch)
+
+    def should_compact(self):
+        if self.records_since_snapshot >= COMPACT_EVERY_RECORDS:
+            return True
+        return self.records_since_snapshot > 0 and \
+            time.monotonic() - self.last_snapshot_time >= COMPACT_EVERY_SECONDS
+
+    def write_snapshot(self):
+        """原子地写入快照，然后清空日志"""
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state.to_snapshot(), f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # 快照落盘后日志中的记录已全部包含在快照里
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.records_since_snapshot = 0
+        self.last_snapshot_time = time.monotonic()
+
+    def submit(self, record):
+        if not self.failed:
+            self.records.put(record)
+
+    def stop(self):
+        """写完剩余记录并生成最终快照"""
+        self.records.put(_STOP)
+        self.wait()
+
+
+class SessionJournal(QObject):
+    """会话日志：记录标签页的打开、关闭、导航和排序，启动时恢复"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.snapshot_path = get_data_path("session", SNAPSHOT_FILE_NAME)
+        self.journal_path = get_data_path("session", JOURNAL_FILE_NAME)
+
+        started = time.perf_counter()
+        self.restored_state = load_session_state(self.snapshot_path, self.journal_path)
+        self.restore_seconds = time.perf_counter() - started
+        self.next_id = self.restored_state.max_id() + 1
+
+        # 写入线程持有自己的状态副本，GUI 线程不再修改它
+        writer_state = SessionState.from_snapshot(self.restored_state.to_snapshot())
+        self.writer = SessionJournalWriter(writer_state, self.snapshot_path, self.journal_path)
+        self.writer.start()
+
+    def restored_tabs(self):
+        """返回需要恢复的标签页 [(id, url, title)] 以及当前标签页 id"""
+        state = self.restored_state
+        tabs = [(tab_id, state.tabs[tab_id]["u"], state.tabs[tab_id]["t"]) for tab_id in state.order]
+        return tabs, state.current
+
+    def new_tab_id(self):
+        tab_id = self.next_id
+        self.next_id += 1
+        return tab_id
+
+    def record_open(self, tab_id, index, url, title):
+        self.writer.submit({"op": OP_OPEN, "id": tab_id, "i": index, "u": url, "t": title})
+
+    def record_close(self, tab_id):
+        self.writer.submit({"op": OP_CLOSE, "id": tab_id})
+
+    def record_navigate(self, tab_id, url):
+        self.writer.submit({"op": OP_NAVIGATE, "id": tab_id, "u": url})
+
+    def record_title(self, tab_id, title):
+        self.writer.submit({"op": OP_TITLE, "id": tab_id, "t": title})
+
+    def record_move(self, from_index, to_index):
+        self.writer.submit({"op": OP_MOVE, "f": from_index, "to": to_index})
+
+    def record_select(self, tab_id):
+        self.writer.submit({"op": OP_SELECT, "id": tab_id})
+
+    def close(self):
+        """退出时调用，等待写入线程完成最终快照"""
+        if self.writer.isRunning():
+            self.writer.stop()
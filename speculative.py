@@ -0,0 +1,280 @@
+# speculative.py - 预测导航（预连接与隐藏页面预渲染）
+import os
+import json
+import time
+from PyQt5.QtCore import QObject, QTimer, QUrl
+from PyQt5.QtNetwork import QHostInfo
+
+from bookmarks import normalize_url
+from config import get_config, get_data_path
+from procstats import read_process_memory
+
+DEFAULT_SPECULATION_SETTINGS = {
+    "enabled": True,
+    # 悬停的链接默认只预解析主机名：预渲染会用用户的 Cookie 真正请求页面，
+    # 注销、删除等有副作用的 GET 链接会因为鼠标停留而被触发
+    "hover_prerender_same_origin": False,   # 是否预渲染与当前页面同源的悬停链接
+    "hover_prerender_ms": 200,       # 鼠标在同源链接上停留多久后预渲染
+    "omnibox_delay_ms": 150,         # 地址栏输入停顿多久后处理候选
+    "max_prerenders": 1,             # 同时保留的隐藏页面数
+    "prerender_memory_mb": 256,      # 预渲染页面所在渲染进程的内存上限
+    "prerender_ttl_seconds": 30,     # 预渲染页面多久没被使用就丢弃
+}
+
+# 同一主机在这段时间内只预解析一次（秒）
+PRECONNECT_TTL = 60
+# 检查预渲染内存预算的间隔（毫秒）
+BUDGET_CHECK_INTERVAL_MS = 2000
+# 地址栏输入少于这么多字符时不预渲染
+MIN_PRERENDER_INPUT = 3
+
+# 累计的预测统计，便于比较不同设置下的命中率
+STATS_FILE_NAME = "speculation_stats.json"
+
+
+def strip_scheme(url):
+    lowered = url.lower()
+    for prefix in ("https://", "http://"):
+        if lowered.startswith(prefix):
+            lowered = lowered[len(prefix):]
+            break
+    if lowered.startswith("www."):
+        lowered = lowered[4:]
+    return lowered
+
+
+def same_origin(a, b):
+    """两个 QUrl 的协议、主机名和端口是否相同"""
+    default_port = {"http": 80, "https": 443}.get(a.scheme(), -1)
+    return a.scheme() == b.scheme() and a.host().lower() == b.host().lower() \
+        and a.port(default_port) == b.port(default_port)
+
+
+class Prerender:
+    """一个正在后台加载的隐藏页面"""
+    __slots__ = ("url", "key", "page", "source", "started", "loaded")
+
+    def __init__(self, url, page, source):
+        self.url = url
+        self.key = normalize_url(url)
+        self.page = page
+        self.source = source
+        self.started = time.monotonic()
+        self.loaded = False
+
+
+class SpeculativeNavigator(QObject):
+    """根据悬停的链接和地址栏的首个候选预测下一次导航
+
+    悬停的链接只预解析主机名（可配置为预渲染同源链接）；地址栏的首个候选是强预测，
+    在隐藏页面中预渲染，导航到同一网址时直接把隐藏页面换入标签页。
+    猜错的页面会被替换或超时丢弃，内存超出预算时立即丢弃。
+    QtWebEngine 没有公开 Chromium 的预连接接口，这里用 QHostInfo 预解析 DNS 代替。
+    """
+
+    def __init__(self, create_page, parent=None):
+        super().__init__(parent)
+        self.create_page = create_page   # 创建已安装拦截器等设置的隐藏页面
+        self.settings = get_config("speculation", DEFAULT_SPECULATION_SETTINGS)
+        self.enabled = bool(self.settings["enabled"])
+        self.prerenders = []             # 按创建顺序排列的 Prerender
+        self.resolved_hosts = {}         # 主机名 -> 预解析时间
+        self.counters = {
+            "preconnects": 0,
+            "prerenders": 0,
+            "hits": 0,
+            "cancelled": 0,
+            "expired": 0,
+            "over_budget": 0,
+        }
+
+        # 悬停一段时间后才预渲染，划过的链接不处理
+        self.hovered_url = ""
+        self.hover_timer = QTimer(self)
+        self.hover_timer.setSingleShot(True)
+        self.hover_timer.setInterval(int(self.settings["hover_prerender_ms"]))
+        self.hover_timer.timeout.connect(self.on_hover_timeout)
+
+        self.omnibox_candidate = None
+        self.omnibox_timer = QTimer(self)
+        self.omnibox_timer.setSingleShot(True)
+        self.omnibox_timer.setInterval(int(self.settings["omnibox_delay_ms"]))
+        self.omnibox_timer.timeout.connect(self.on_omnibox_timeout)
+
+        self.budget_timer = QTimer(self)
+        self.budget_timer.setInterval(BUDGET_CHECK_INTERVAL_MS)
+        self.budget_timer.timeout.connect(self.check_budget)
+
+    def on_link_hovered(self, url):
+        """QWebEnginePage.linkHovered：离开链接时 url 为空"""
+        self.hovered_url = url
+        if not url or not self.enabled:
+            self.hover_timer.stop()
+            return
+        self.preconnect(url)
+        page = self.sender()
+        if self.settings["hover_prerender_same_origin"] and page is not None \
+                and same_origin(page.url(), QUrl(url)):
+            self.hover_timer.start()
+        else:
+            self.hover_timer.stop()
+
+    def on_hover_timeout(self):
+        if self.hovered_url:
+            self.prerender(self.hovered_url, "hover")
+
+    def on_omnibox_candidate(self, text, url):
+        """地址栏候选变化：输入是候选网址的前缀时视为强预测"""
+        self.omnibox_candidate = (text, url)
+        if self.enabled:
+            self.omnibox_timer.start()
+
+    def on_omnibox_timeout(self):
+        if self.omnibox_candidate is None:
+            return
+        text, url = self.omnibox_candidate
+        self.omnibox_candidate = None
+        self.preconnect(url)
+        typed = strip_scheme(text.strip())
+        if len(typed) >= MIN_PRERENDER_INPUT and strip_scheme(url).startswith(typed):
+            self.prerender(url, "omnibox")
+
+    def preconnect(self, url):
+        """预解析主机名"""
+        host = QUrl(url).host()
+        if not host or not self.enabled:
+            return
+        now = time.monotonic()
+        if now - self.resolved_hosts.get(host, -PRECONNECT_TTL) < PRECONNECT_TTL:
+            return
+        self.resolved_hosts[host] = now
+        self.counters["preconnects"] += 1
+        QHostInfo.lookupHost(host, self.on_host_resolved)
+
+    def on_host_resolved(self, info):
+        # 结果只用于预热系统的 DNS 缓存
+        pass
+
+    def prerender(self, url, source):
+        """在隐藏页面中加载网址，超出数量上限时丢弃最早的预测"""
+        if not self.enabled or not url.startswith(("http://", "https://")):
+            return
+        key = normalize_url(url)
+        if any(entry.key == key for entry in self.prerenders):
+            return
+        while len(self.prerenders) >= max(int(self.settings["max_prerenders"]), 0):
+            if not self.prerenders:
+                return
+            self.cancel(self.prerenders[0], "cancelled")
+
+        page = self.create_page()
+        page.setAudioMuted(True)
+        entry = Prerender(url, page, source)
+        page.loadFinished.connect(lambda ok, e=entry: self.on_prerender_loaded(e, ok))
+        self.prerenders.append(entry)
+        self.counters["prerenders"] += 1
+        page.load(QUrl(url))
+        self.budget_timer.start()
+
+    def on_prerender_loaded(self, entry, ok):
+        if not ok:
+            self.cancel(entry, "cancelled")
+            return
+        entry.loaded = True
+
+    def find(self, url):
+        key = normalize_url(url)
+        for entry in self.prerenders:
+            if entry.key == key or normalize_url(entry.page.url().toString()) == key:
+                return entry
+        return None
+
+    def has(self, url):
+        return self.find(url) is not None
+
+    def take(self, url):
+        """导航到预测的网址时取出预渲染页面，返回 (页面, 是否已加载完成)，未命中返回 (None, False)"""
+        entry = self.find(url)
+        if entry is None:
+            return None, False
+        self.prerenders.remove(entry)
+        self.counters["hits"] += 1
+        entry.page.setAudioMuted(False)
+        if not self.prerenders:
+            self.budget_timer.stop()
+        return entry.page, entry.loaded
+
+    def cancel(self, entry, reason):
+        """丢弃猜错或超出预算的预渲染页面"""
+        if entry not in self.prerenders:
+            return
+        self.prerenders.remove(entry)
+        self.counters[reason] += 1
+        entry.page.triggerAction(entry.page.Stop)
+        entry.page.deleteLater()
+        if not self.prerenders:
+            self.budget_timer.stop()
+
+    def cancel_all(self):
+        for entry in list(self.prerenders):
+            self.cancel(entry, "cancelled")
+
+    def release_memory(self):
+        """内存紧张时丢弃所有预渲染页面，返回丢弃的页面数"""
+        count = len(self.prerenders)
+        self.cancel_all()
+        self.resolved_hosts.clear()
+        return count
+
+    def check_budget(self):
+        """丢弃超时或渲染进程内存超出预算的预渲染页面
+
+        同站点的页面可能共用一个渲染进程，此时读到的是整个进程的内存，只是预渲染页面
+        占用的上限：与可见标签页共用进程时预渲染可能被提前丢弃，但不会超出预算。
+        """
+        ttl = self.settings["prerender_ttl_seconds"]
+        budget_kb = self.settings["prerender_memory_mb"] * 1024
+        now = time.monotonic()
+        for entry in list(self.prerenders):
+            if now - entry.started > ttl:
+                self.cancel(entry, "expired")
+                continue
+            pid = entry.page.renderProcessPid()
+            if not pid:
+                continue
+            rss, pss = read_process_memory(pid)
+            if (pss or rss or 0) > budget_kb:
+                self.cancel(entry, "over_budget")
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+        if not self.enabled:
+            self.hover_timer.stop()
+            self.omnibox_timer.stop()
+            self.cancel_all()
+
+    def stats(self):
+        """预测统计：命中率为命中次数 / 预渲染次数"""
+        stats = dict(self.counters)
+        stats["active"] = len(self.prerenders)
+        stats["hit_rate"] = round(stats["hits"] / stats["prerenders"], 3) if stats["prerenders"] else 0.0
+        return stats
+
+    def save_stats(self):
+        """退出时把本次的计数累加到统计文件"""
+        path = get_data_path(STATS_FILE_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                totals = json.load(f)
+        except (OSError, ValueError):
+            totals = {}
+        for name, value in self.counters.items():
+            totals[name] = totals.get(name, 0) + value
+        totals["hit_rate"] = round(totals["hits"] / totals["prerenders"], 3) if totals.get("prerenders") else 0.0
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(totals, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"预测统计保存失败: {e}")
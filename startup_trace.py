@@ -0,0 +1,112 @@
+# startup_trace.py - 启动阶段计时
+import sys
+import json
+import time
+
+# 模块第一次被导入的时间，main.py 最先导入本模块，可近似为进程启动时间
+PROCESS_START = time.perf_counter()
+
+# 冷启动预算（毫秒）：阶段名 -> 从进程启动到该阶段的最长时间
+DEFAULT_BUDGET_MS = {
+    "window_shown": 800,
+    "first_paint": 1000,
+    "first_view_created": 1200,
+}
+
+_startup_trace = None
+
+
+class StartupTrace:
+    """记录启动各阶段距进程启动的时间"""
+
+    def __init__(self, enabled=False, output_path=None, budget_ms=None):
+        self.enabled = enabled
+        self.output_path = output_path
+        self.budget_ms = dict(DEFAULT_BUDGET_MS if budget_ms is None else budget_ms)
+        self.marks = [("process_start", 0.0)]
+        self.info = {}   # 运行环境信息（如性能配置档），随计时结果一起输出
+        self.reported = False
+
+    def mark(self, phase):
+        """记录一个阶段完成的时间（同名阶段只记第一次）"""
+        if any(name == phase for name, _ in self.marks):
+            return
+        self.marks.append((phase, (time.perf_counter() - PROCESS_START) * 1000))
+
+    def elapsed(self, phase):
+        for name, elapsed_ms in self.marks:
+            if name == phase:
+                return elapsed_ms
+        return None
+
+    def over_budget(self):
+        """返回超出预算的阶段 {阶段: (实际毫秒, 预算毫秒)}"""
+        result = {}
+        for phase, budget in self.budget_ms.items():
+            elapsed_ms = self.elapsed(phase)
+            if elapsed_ms is not None and elapsed_ms > budget:
+                result[phase] = (elapsed_ms, budget)
+        return result
+
+    def to_dict(self):
+        return {
+            "info": self.info,
+            "phases": [{"phase": name, "ms": round(elapsed_ms, 2)} for name, elapsed_ms in self.marks],
+            "budget_ms": self.budget_ms,
+            "over_budget": {phase: round(elapsed_ms, 2) for phase, (elapsed_ms, _) in self.over_budget().items()},
+        }
+
+    def report(self):
+        """输出计时结果（只在启用时输出一次）"""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+
+        lines = ["启动阶段计时:"]
+        for key, value in self.info.items():
+            lines.append(f"  {key}: {value}")
+        previous = 0.0
+        for name, elapsed_ms in self.marks:
+            lines.append(f"  {name:<24} {elapsed_ms:9.1f} ms  (+{elapsed_ms - previous:.1f} ms)")
+            previous = elapsed_ms
+        for phase, (elapsed_ms, budget) in self.over_budget().items():
+            lines.append(f"  超出预算: {phase} {elapsed_ms:.1f} ms > {budget} ms")
+        print("\n".join(lines), file=sys.stderr)
+
+        if self.output_path:
+            try:
+                with open(self.output_path, "w", encoding="utf-8") as f:
+                    json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                print(f"启动计时写入失败: {e}", file=sys.stderr)
+
+
+def parse_startup_trace_args(argv):
+    """从命令行参数中取出 --startup-trace[=输出文件]，返回 (剩余参数, 是否启用, 输出文件)"""
+    remaining = []
+    enabled = False
+    output_path = None
+    for arg in argv:
+        if arg == "--startup-trace":
+            enabled = True
+        elif arg.startswith("--startup-trace="):
+            enabled = True
+            output_path = arg.split("=", 1)[1] or None
+        else:
+            remaining.append(arg)
+    return remaining, enabled, output_path
+
+
+def get_startup_trace():
+    """获取全局启动计时器"""
+    global _startup_trace
+    if _startup_trace is None:
+        _startup_trace = StartupTrace()
+    return _startup_trace
+
+
+def configure_startup_trace(enabled, output_path=None):
+    trace = get_startup_trace()
+    trace.enabled = enabled
+    trace.output_path = output_path
+    return trace
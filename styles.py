@@ -1,30 +1,90 @@
+# styles.py - 主题与样式表
+#
+# 整个应用只在 QApplication 上设置一份样式表，按主题缓存。
+# 控件通过 objectName 或动态属性（role / variant）选择样式变体，
+# 不再各自调用 setStyleSheet，切换主题时只需要一次重新 polish。
+from functools import lru_cache
+from string import Template
+
+from config import get_config, set_config
+
+DEFAULT_THEME = "dark"
+
+THEMES = {
+    "dark": {
+        "window_bg": "#202020",
+        "surface": "#2d2d2d",
+        "border": "#3c3c3c",
+        "border_strong": "#5e5e5e",
+        "scroll_hover": "#707070",
+        "text": "#ffffff",
+        "text_secondary": "#cccccc",
+        "text_muted": "#aaaaaa",
+        "text_faint": "#666666",
+        "accent": "#0078d4",
+        "accent_hover": "#106ebe",
+        "accent_pressed": "#005a9e",
+        "accent_light": "#00bcf2",
+        "accent_tint": "rgba(0, 120, 212, 0.1)",
+        "success": "#107c10",
+        "success_hover": "#0d6b0d",
+        "success_text": "#4caf50",
+        "danger": "#e81123",
+    },
+    "light": {
+        "window_bg": "#f7f7f7",
+        "surface": "#ffffff",
+        "border": "#e0e0e0",
+        "border_strong": "#c8c8c8",
+        "scroll_hover": "#a0a0a0",
+        "text": "#1b1b1b",
+        "text_secondary": "#444444",
+        "text_muted": "#666666",
+        "text_faint": "#999999",
+        "accent": "#0078d4",
+        "accent_hover": "#106ebe",
+        "accent_pressed": "#005a9e",
+        "accent_light": "#00bcf2",
+        "accent_tint": "rgba(0, 120, 212, 0.1)",
+        "success": "#107c10",
+        "success_hover": "#0d6b0d",
+        "success_text": "#107c10",
+        "danger": "#e81123",
+    },
+}
+
+FONT_STACK = '"Microsoft YaHei", "Segoe UI", Arial, sans-serif'
+
+_current_theme = None
+
+
 def get_main_window_style():
     return """
         QMainWindow {
-            background: #202020;
-            color: #ffffff;
+            background: $window_bg;
+            color: $text;
         }
         QTabWidget::pane {
             border: none;
-            background: #202020;
+            background: $window_bg;
         }
         QTabBar::tab {
-            background: #2d2d2d;
-            color: #cccccc;
+            background: $surface;
+            color: $text_secondary;
             padding: 8px 16px;
             margin-right: 1px;
             border: none;
             border-top-left-radius: 4px;
             border-top-right-radius: 4px;
-            font-family: "Microsoft YaHei", "Segoe UI", Arial, sans-serif;
+            font-family: $font_stack;
         }
         QTabBar::tab:selected {
-            background: #202020;
-            color: #ffffff;
-            border-bottom: 2px solid #0078d4;
+            background: $window_bg;
+            color: $text;
+            border-bottom: 2px solid $accent;
         }
         QTabBar::tab:hover {
-            background: #3c3c3c;
+            background: $border;
         }
         QTabBar::tab:!selected {
             margin-top: 2px;
@@ -34,48 +94,362 @@ def get_main_window_style():
             subcontrol-position: right;
         }
         QStatusBar {
-            background: #2d2d2d;
-            color: #cccccc;
-            border-top: 1px solid #3c3c3c;
+            background: $surface;
+            color: $text_secondary;
+            border-top: 1px solid $border;
+        }
+        QToolBar#mainToolbar {
+            background: $surface;
+            border: none;
+            border-bottom: 1px solid $border;
+            padding: 6px 8px;
+            spacing: 4px;
+        }
+        QProgressBar#pageProgress {
+            border: none;
+            background: transparent;
+            border-radius: 0px;
+        }
+        QProgressBar#pageProgress::chunk {
+            background: qlineargradient(
+                x1:0, y1:0, x2:1, y2:0,
+                stop:0 $accent, stop:1 $accent_light
+            );
+            border-radius: 0px;
         }
     """
 
+
 def get_toolbar_button_style():
     return """
-        QPushButton {
+        QPushButton[role="toolbar-button"] {
             background: transparent;
             border: 1px solid transparent;
             border-radius: 4px;
-            color: #cccccc;
+            color: $text_secondary;
             font-size: 14px;
             font-weight: normal;
+            padding: 0px;
+            margin: 0px;
+        }
+        QPushButton[role="toolbar-button"]:hover {
+            background: $border;
+            border-color: $border_strong;
         }
-        QPushButton:hover {
-            background: #3c3c3c;
-            border-color: #5e5e5e;
+        QPushButton[role="toolbar-button"]:pressed {
+            background: $border_strong;
         }
-        QPushButton:pressed {
-            background: #5e5e5e;
+        QPushButton[role="toolbar-button"]:disabled {
+            color: $text_faint;
         }
-        QPushButton:disabled {
-            color: #666666;
+        QPushButton[role="toolbar-button"][variant="off"] {
+            color: $text_faint;
         }
     """
 
+
 def get_url_bar_style():
     return """
-        QLineEdit {
+        QLineEdit#urlBar {
             padding: 6px 12px;
-            border: 1px solid #5e5e5e;
+            border: 1px solid $border_strong;
             border-radius: 20px;
-            background: #2d2d2d;
-            color: #ffffff;
+            background: $surface;
+            color: $text;
             font-size: 14px;
             margin: 0 5px;
-            font-family: "Microsoft YaHei", "Segoe UI", Arial, sans-serif;
+            font-family: $font_stack;
+        }
+        QLineEdit#urlBar:focus {
+            border-color: $accent;
+            background: $surface;
+        }
+    """
+
+
+def get_dialog_style():
+    return """
+        QDialog {
+            background: $window_bg;
+            color: $text;
+            border: 1px solid $border;
+            border-radius: 8px;
+            font-family: $font_stack;
+        }
+        QDialog QLabel {
+            color: $text;
+            background: transparent;
+            font-family: $font_stack;
         }
-        QLineEdit:focus {
-            border-color: #0078d4;
-            background: #2d2d2d;
+        QDialog QPushButton {
+            background: $accent;
+            border: 1px solid $accent;
+            border-radius: 4px;
+            color: white;
+            padding: 10px 16px;
+            font-size: 13px;
+            font-weight: bold;
+            font-family: $font_stack;
+            min-height: 18px;
+        }
+        QDialog#authorDialog QPushButton {
+            border-radius: 6px;
+            margin: 6px;
+        }
+        QDialog#updateDialog QPushButton {
+            padding: 8px 16px;
+            min-height: 0px;
+        }
+        QDialog QPushButton:hover {
+            background: $accent_hover;
+            border-color: $accent_hover;
+        }
+        QDialog QPushButton:pressed {
+            background: $accent_pressed;
+            border-color: $accent_pressed;
+        }
+        QDialog QPushButton:disabled {
+            background: $border_strong;
+            border-color: $border_strong;
+            color: $text_muted;
+        }
+        QDialog QPushButton[variant="success"] {
+            background: $success;
+            border-color: $success;
+        }
+        QDialog QPushButton[variant="success"]:hover {
+            background: $success_hover;
+            border-color: $success_hover;
+        }
+        QDialog QPushButton[variant="link"] {
+            background: transparent;
+            border: 1px solid $accent;
+            color: $accent;
+            padding: 8px 12px;
+        }
+        QDialog QPushButton[variant="link"]:hover {
+            background: $accent_tint;
+        }
+        QDialog QPushButton[variant="bilibili"] {
+            background: #fb7299;
+            border-color: #fb7299;
+        }
+        QDialog QPushButton[variant="bilibili"]:hover {
+            background: #ff8ab0;
+        }
+        QDialog QPushButton[variant="github"] {
+            background: #333;
+            border-color: #333;
+        }
+        QDialog QPushButton[variant="github"]:hover {
+            background: #555;
+        }
+        QDialog QPushButton[variant="close"] {
+            background: transparent;
+            border: 1px solid transparent;
+            border-radius: 4px;
+            color: $text_secondary;
+            font-size: 18px;
+            font-weight: bold;
+            padding: 0px;
+            min-height: 0px;
+        }
+        QDialog QPushButton[variant="close"]:hover {
+            background: $danger;
+            color: white;
+        }
+        QScrollArea {
+            border: none;
+            background: transparent;
         }
-    """
\ No newline at end of file
+        QScrollBar:vertical {
+            background: $surface;
+            width: 14px;
+            margin: 0px;
+            border-radius: 7px;
+        }
+        QScrollBar::handle:vertical {
+            background: $border_strong;
+            border-radius: 7px;
+            min-height: 30px;
+            margin: 2px;
+        }
+        QScrollBar::handle:vertical:hover {
+            background: $scroll_hover;
+        }
+        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+            border: none;
+            background: none;
+            height: 0px;
+        }
+        QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
+            background: none;
+        }
+        QDialog QProgressBar {
+            border: none;
+            background: $surface;
+            border-radius: 4px;
+            text-align: center;
+            color: white;
+        }
+        QDialog QProgressBar::chunk {
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                stop:0 $accent, stop:1 $accent_light);
+            border-radius: 4px;
+        }
+        QFrame[role="section"] {
+            background: $surface;
+            border-radius: 8px;
+            border: 1px solid $border;
+            padding: 20px;
+        }
+        QFrame[role="feature-card"] {
+            background: $surface;
+            border-radius: 8px;
+            border: 1px solid $border;
+            padding: 0px;
+        }
+        QFrame[role="separator"] {
+            background: $border;
+            margin: 10px 0;
+        }
+        QWidget#dialogTitleBar {
+            background: $surface;
+            border-top-left-radius: 8px;
+            border-top-right-radius: 8px;
+        }
+        QWidget#aboutScrollContent {
+            background: $window_bg;
+        }
+        QFrame#browserIcon {
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #ff6b35, stop:1 #ff8e53);
+            border-radius: 12px;
+        }
+        QTextEdit#changesText {
+            background: $surface;
+            border: 1px solid $border;
+            border-radius: 6px;
+            padding: 10px;
+            color: $text_secondary;
+            font-size: 13px;
+        }
+        QLabel[role="dialog-title"] { font-size: 24px; font-weight: bold; color: $text; margin-bottom: 10px; }
+        QLabel[role="update-title"] { font-size: 20px; font-weight: bold; color: $text; }
+        QLabel[role="titlebar-text"] { font-size: 16px; font-weight: bold; color: $text; }
+        QLabel[role="avatar"] { font-size: 64px; margin-right: 20px; }
+        QLabel[role="app-icon"] { font-size: 40px; }
+        QLabel[role="name"] { font-size: 20px; font-weight: bold; color: $text; margin-bottom: 5px; }
+        QLabel[role="app-name"] { font-size: 28px; font-weight: bold; color: $text; margin-bottom: 5px; }
+        QLabel[role="app-version"] { font-size: 16px; color: $text_secondary; margin-bottom: 8px; }
+        QLabel[role="subtitle"] { font-size: 14px; color: $text_secondary; margin-bottom: 10px; }
+        QLabel[role="description"] { font-size: 13px; color: $text_muted; }
+        QLabel[role="section-title"] { font-size: 16px; font-weight: bold; color: $text; margin-bottom: 8px; }
+        QLabel[role="section-heading"] { font-size: 18px; font-weight: bold; color: $text; margin-bottom: 12px; }
+        QLabel[role="body"] { font-size: 14px; color: $text_secondary; }
+        QLabel[role="chip-block"] {
+            font-size: 13px; color: $text_secondary; background: $surface; padding: 12px; border-radius: 6px;
+        }
+        QLabel[role="badge"] {
+            background: $accent; color: white; padding: 4px 12px; border-radius: 12px;
+            font-size: 12px; font-weight: bold;
+        }
+        QLabel[role="feature-icon"] { font-size: 18px; margin-right: 8px; }
+        QLabel[role="feature-title"] { font-size: 14px; font-weight: bold; color: $text; }
+        QLabel[role="feature-desc"] { font-size: 12px; color: $text_muted; }
+        QLabel[role="info-key"] { font-size: 13px; color: $text_secondary; font-weight: bold; min-width: 120px; }
+        QLabel[role="info-value"] { font-size: 13px; color: $text; }
+        QLabel[role="version-arrow"] { font-size: 16px; color: $accent; font-weight: bold; margin: 0 10px; }
+        QLabel[role="version-new"] { font-size: 14px; color: $success_text; font-weight: bold; }
+        QLabel[role="copyright"] { font-size: 12px; color: $text_faint; margin-top: 20px; }
+    """
+
+
+def get_table_style():
+    return """
+        QDialog QTableView {
+            background: $surface;
+            alternate-background-color: $window_bg;
+            border: 1px solid $border;
+            border-radius: 6px;
+            color: $text;
+            gridline-color: $border;
+            selection-background-color: $accent;
+            selection-color: white;
+        }
+        QDialog QHeaderView::section {
+            background: $window_bg;
+            color: $text_secondary;
+            border: none;
+            border-bottom: 1px solid $border;
+            padding: 6px 8px;
+            font-weight: bold;
+        }
+    """
+
+
+def get_thumbnail_style():
+    return """
+        QLabel#tabHoverPreview {
+            background: $surface;
+            border: 1px solid $border;
+            border-radius: 6px;
+            padding: 4px;
+        }
+        QDialog QListView {
+            background: $window_bg;
+            border: none;
+            color: $text;
+            selection-background-color: $accent;
+            selection-color: white;
+        }
+    """
+
+
+# 组成应用样式表的各部分，新增界面时在这里追加
+STYLE_SECTIONS = [
+    get_main_window_style,
+    get_toolbar_button_style,
+    get_url_bar_style,
+    get_dialog_style,
+    get_table_style,
+    get_thumbnail_style,
+]
+
+
+@lru_cache(maxsize=None)
+def build_stylesheet(theme_name=DEFAULT_THEME):
+    """拼接整个应用的样式表，每个主题只拼接一次"""
+    palette = dict(THEMES.get(theme_name, THEMES[DEFAULT_THEME]))
+    palette["font_stack"] = FONT_STACK
+    return "\n".join(Template(section()).substitute(palette) for section in STYLE_SECTIONS)
+
+
+def get_configured_theme():
+    return get_config("appearance", {"theme": DEFAULT_THEME})["theme"]
+
+
+def get_current_theme():
+    return _current_theme
+
+
+def apply_theme(app, theme_name=None, remember=False):
+    """在 QApplication 上设置样式表；切换主题时 Qt 只重新 polish 一次"""
+    global _current_theme
+    theme_name = theme_name or get_configured_theme()
+    if theme_name not in THEMES:
+        theme_name = DEFAULT_THEME
+    if theme_name == _current_theme:
+        return theme_name
+    app.setStyleSheet(build_stylesheet(theme_name))
+    _current_theme = theme_name
+    if remember:
+        set_config("appearance", {"theme": theme_name})
+    return theme_name
+
+
+def set_widget_variant(widget, variant):
+    """修改控件的 variant 属性并只重新 polish 这一个控件"""
+    widget.setProperty("variant", variant)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
@@ -0,0 +1,198 @@
+# tab_lifecycle.py - 后台标签页冻结与丢弃
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+from config import get_config, set_config
+
+# 检测页面是否有未提交的表单输入
+PENDING_INPUT_SCRIPT = """
+(function() {
+    var fields = document.querySelectorAll('input, textarea, select');
+    for (var i = 0; i < fields.length; i++) {
+        var el = fields[i];
+        if (el.type === 'hidden' || el.type === 'submit' || el.type === 'button') continue;
+        if (el.type === 'checkbox' || el.type === 'radio') {
+            if (el.checked !== el.defaultChecked) return true;
+        } else if (el.tagName === 'SELECT') {
+            for (var j = 0; j < el.options.length; j++) {
+                if (el.options[j].selected !== el.options[j].defaultSelected) return true;
+            }
+        } else if (el.value !== el.defaultValue) {
+            return true;
+        }
+    }
+    var active = document.activeElement;
+    return !!(active && active.isContentEditable && active.textContent.length > 0);
+})();
+"""
+
+# 状态名称
+STATE_NAMES = {
+    QWebEnginePage.Active: "active",
+    QWebEnginePage.Frozen: "frozen",
+    QWebEnginePage.Discarded: "discarded",
+}
+
+DEFAULT_POLICY = {
+    "enabled": True,
+    "freeze_after_minutes": 5,       # 后台多久后冻结
+    "discard_after_minutes": 30,     # 后台多久后丢弃
+    "check_interval_seconds": 30,    # 检查间隔
+}
+
+
+class TabLifecycleManager(QObject):
+    """后台标签页生命周期管理器"""
+
+    # 定义信号
+    state_changed = pyqtSignal(object, str)  # 标签页状态变化 (view, 状态名)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.policy = get_config("tab_lifecycle", DEFAULT_POLICY)
+        self.current_view = None
+        self.background_since = {}   # view -> 进入后台的时间
+        self.pending_input = {}      # view -> 冻结前是否有未提交的输入
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check_tabs)
+        self.apply_policy()
+
+    def apply_policy(self):
+        """根据策略启动或停止检查定时器"""
+        if self.policy["enabled"]:
+            self.timer.start(int(self.policy["check_interval_seconds"] * 1000))
+        else:
+            self.timer.stop()
+
+    def set_policy(self, **values):
+        """修改策略并保存到配置文件"""
+        unknown = set(values) - set(DEFAULT_POLICY)
+        if unknown:
+            raise ValueError(f"未知的策略项: {', '.join(sorted(unknown))}")
+        if values.get("freeze_after_minutes", self.policy["freeze_after_minutes"]) > \
+                values.get("discard_after_minutes", self.policy["discard_after_minutes"]):
+            raise ValueError("冻结时间不能晚于丢弃时间")
+        self.policy.update(values)
+        set_config("tab_lifecycle", values)
+        self.apply_policy()
+
+    def get_policy(self):
+        """返回当前策略"""
+        return dict(self.policy)
+
+    def track(self, view):
+        """开始管理一个标签页"""
+        self.background_since[view] = time.monotonic()
+        page = view.page()
+        page.lifecycleStateChanged.connect(
+            lambda state, v=view: self.state_changed.emit(v, STATE_NAMES.get(state, "active")))
+
+    def forget(self, view):
+        """标签页关闭时停止管理"""
+        self.background_since.pop(view, None)
+        self.pending_input.pop(view, None)
+        if self.current_view is view:
+            self.current_view = None
+
+    def activate(self, view):
+        """标签页被激活时调用：恢复运行，丢弃的页面会自动重新加载"""
+        if self.current_view is not None and self.current_view is not view \
+                and self.current_view in self.background_since:
+            self.background_since[self.current_view] = time.monotonic()
+        self.current_view = view
+        if view not in self.background_since:
+            return
+        self.pending_input.pop(view, None)
+        page = view.page()
+        if page.lifecycleState() != QWebEnginePage.Active:
+            page.setLifecycleState(QWebEnginePage.Active)
+
+    def get_state(self, view):
+        """查询标签页状态名"""
+        return STATE_NAMES.get(view.page().lifecycleState(), "active")
+
+    def get_states(self):
+        """查询所有标签页状态"""
+        return {view: self.get_state(view) for view in self.background_since}
+
+    def background_seconds(self, view):
+        """标签页已在后台的秒数，当前标签页返回 0"""
+        if view is self.current_view or view not in self.background_since:
+            return 0
+        return time.monotonic() - self.background_since[view]
+
+    def idle_views(self):
+        """可以冻结或丢弃的后台标签页，最久未使用的在前"""
+        views = [view for view in self.background_since
+                 if view is not self.current_view and not view.page().isVisible()
+                 and not self.is_protected(view)]
+        views.sort(key=self.background_seconds, reverse=True)
+        return views
+
+    def is_protected(self, view):
+        """播放音频或有未提交输入的标签页不做处理"""
+        page = view.page()
+        return page.recentlyAudible() or self.pending_input.get(view, False)
+
+    def check_tabs(self):
+        """定时检查所有后台标签页"""
+        freeze_after = self.policy["freeze_after_minutes"] * 60
+        discard_after = self.policy["discard_after_minutes"] * 60
+
+        for view in list(self.background_since):
+            if view is self.current_view:
+                continue
+            page = view.page()
+            if page.isVisible() or self.is_protected(view):
+                continue
+
+            idle = self.background_seconds(view)
+            state = page.lifecycleState()
+            if idle >= discard_after and state != QWebEnginePage.Discarded:
+                self.request_transition(view, QWebEnginePage.Discarded)
+            elif idle >= freeze_after and state == QWebEnginePage.Active:
+                self.request_transition(view, QWebEnginePage.Frozen)
+
+    def request_transition(self, view, target_state, on_done=None):
+        """切换状态前先确认页面没有未提交的表单输入
+
+        检查是异步的，on_done(view, 是否已切换) 在得出结果后调用（有输入被跳过时为 False）。
+        """
+        page = view.page()
+        if page.lifecycleState() == QWebEnginePage.Frozen:
+            # 冻结的页面无法执行脚本，输入状态已在冻结前检查过
+            applied = self.set_state(view, target_state)
+            if on_done is not None:
+                on_done(view, applied)
+            return
+
+        def on_checked(has_input, v=view):
+            applied = False
+            if v in self.background_since and v is not self.current_view:
+                self.pending_input[v] = bool(has_input)
+                if not has_input:
+                    applied = self.set_state(v, target_state)
+            if on_done is not None:
+                on_done(v, applied)
+
+        page.runJavaScript(PENDING_INPUT_SCRIPT, on_checked)
+
+    def set_state(self, view, target_state):
+        """直接设置标签页状态（任务管理器等也会调用），返回状态是否发生了变化"""
+        page = view.page()
+        if page.isVisible() and target_state != QWebEnginePage.Active:
+            return False
+        if page.lifecycleState() == target_state:
+            return False
+        page.setLifecycleState(target_state)
+        return True
+
+    def discard(self, view):
+        """立即丢弃一个后台标签页"""
+        self.set_state(view, QWebEnginePage.Discarded)
+
+    def freeze(self, view):
+        """立即冻结一个后台标签页"""
+        self.set_state(view, QWebEnginePage.Frozen)
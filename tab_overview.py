@@ -0,0 +1,88 @@
+# tab_overview.py - 标签页概览（所有标签页的缩略图网格，首次打开时才导入）
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QSize, Qt
+from PyQt5.QtWidgets import QAbstractItemView, QDialog, QListView, QVBoxLayout
+
+# 概览中缩略图的显示尺寸
+OVERVIEW_ICON_SIZE = QSize(240, 150)
+
+
+class TabOverviewModel(QAbstractListModel):
+    """概览中的标签页，缩略图在视图请求时才解码（只解码可见的项）"""
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.rows = []    # [(id, 标题, 网址)]
+        store.thumbnail_updated.connect(self.on_thumbnail_updated)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        key, title, url = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return title
+        if role == Qt.ToolTipRole:
+            return url
+        if role == Qt.DecorationRole:
+            return self.store.pixmap(key)
+        return None
+
+    def set_tabs(self, tab_widget):
+        self.beginResetModel()
+        self.rows = []
+        for index in range(tab_widget.count()):
+            widget = tab_widget.widget(index)
+            title = tab_widget.tabToolTip(index) or tab_widget.tabText(index)
+            self.rows.append((getattr(widget, "tab_id", None), title, widget.url().toString()))
+        self.endResetModel()
+
+    def on_thumbnail_updated(self, key):
+        for row, (row_key, _, _) in enumerate(self.rows):
+            if row_key == key:
+                self.dataChanged.emit(self.index(row), self.index(row), [Qt.DecorationRole])
+                break
+
+
+class TabOverviewDialog(QDialog):
+    """所有标签页的缩略图网格，点击切换到对应标签页"""
+
+    def __init__(self, browser_window, store):
+        super().__init__(browser_window)
+        self.browser_window = browser_window
+        self.setWindowTitle("标签页概览")
+        self.resize(1100, 720)
+        self.setObjectName("tabOverviewDialog")
+
+        self.model = TabOverviewModel(store, self)
+
+        self.view = QListView()
+        self.view.setModel(self.model)
+        self.view.setViewMode(QListView.IconMode)
+        self.view.setResizeMode(QListView.Adjust)
+        self.view.setMovement(QListView.Static)
+        self.view.setUniformItemSizes(True)
+        self.view.setIconSize(OVERVIEW_ICON_SIZE)
+        self.view.setGridSize(QSize(OVERVIEW_ICON_SIZE.width() + 24, OVERVIEW_ICON_SIZE.height() + 48))
+        self.view.setWordWrap(True)
+        self.view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.view.activated.connect(self.switch_to_tab)
+        self.view.clicked.connect(self.switch_to_tab)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+
+    def showEvent(self, event):
+        self.model.set_tabs(self.browser_window.tab_widget)
+        current = self.browser_window.tab_widget.currentIndex()
+        if current >= 0:
+            self.view.setCurrentIndex(self.model.index(current))
+        super().showEvent(event)
+
+    def switch_to_tab(self, index):
+        self.hide()
+        self.browser_window.tab_widget.setCurrentIndexWithAnimation(index.row())
@@ -0,0 +1,158 @@
+# tab_state.py - 每个标签页的状态，以及合并到每帧一次的界面更新
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QIcon
+
+from tracing import counter, instant, traced
+
+# 界面最多每帧刷新一次（毫秒）
+UI_UPDATE_INTERVAL_MS = 16
+
+# 状态中可能变化的字段
+FIELD_URL = "url"
+FIELD_TITLE = "title"
+FIELD_PROGRESS = "progress"
+FIELD_ICON = "icon"
+FIELD_LOADED = "loaded"   # 加载刚刚完成（用于状态栏提示）
+FIELD_BLOCKED = "blocked"
+
+# 切换标签页时需要整体刷新的字段
+ALL_FIELDS = frozenset([FIELD_URL, FIELD_TITLE, FIELD_PROGRESS, FIELD_ICON, FIELD_BLOCKED])
+
+
+class TabState(QObject):
+    """收集一个网页视图的信号，保存网址、标题、进度、加载状态和图标"""
+
+    # 定义信号
+    changed = pyqtSignal(object)
+
+    def __init__(self, view, favicons=None):
+        super().__init__(view)
+        self.view = view
+        self.favicons = favicons   # 共享的图标存储，相同图标只解码一份
+        self.url = view.url()
+        self.title = view.title()
+        self.progress = 0
+        self.loading = False
+        self.icon = QIcon()
+        self.blocked = 0     # 当前页面拦截的请求数
+        self.dirty = set()   # 上次刷新界面后变化过的字段
+
+        view.urlChanged.connect(self.on_url_changed)
+        view.titleChanged.connect(self.on_title_changed)
+        view.loadStarted.connect(self.on_load_started)
+        view.loadProgress.connect(self.on_load_progress)
+        view.loadFinished.connect(self.on_load_finished)
+        view.iconChanged.connect(self.on_icon_changed)
+
+    def mark(self, field):
+        self.dirty.add(field)
+        self.changed.emit(self)
+
+    def take_dirty(self):
+        """取出并清空变化过的字段"""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def on_url_changed(self, url):
+        self.url = url
+        instant("url_changed", "navigation", tab=getattr(self.view, "tab_id", None))
+        self.mark(FIELD_URL)
+
+    def on_title_changed(self, title):
+        self.title = title
+        self.mark(FIELD_TITLE)
+
+    def on_load_started(self):
+        self.loading = True
+        self.progress = 0
+        instant("load_started", "navigation", tab=getattr(self.view, "tab_id", None))
+        self.mark(FIELD_PROGRESS)
+
+    def on_load_progress(self, progress):
+        if progress == self.progress:
+            return
+        self.progress = progress
+        self.mark(FIELD_PROGRESS)
+
+    def on_load_finished(self, ok):
+        self.loading = False
+        self.progress = 100
+        instant("load_finished", "navigation", tab=getattr(self.view, "tab_id", None), ok=ok)
+        self.dirty.add(FIELD_PROGRESS)
+        self.mark(FIELD_LOADED)
+
+    def on_icon_changed(self, icon):
+        if self.favicons is not None:
+            icon = self.favicons.remember(self.view.url().toString(), icon)
+        self.icon = icon
+        self.mark(FIELD_ICON)
+
+    def on_blocked_count_changed(self, count):
+        self.blocked = count
+        self.mark(FIELD_BLOCKED)
+
+
+class TabUIUpdater(QObject):
+    """把各标签页的状态变化合并后应用到窗口上
+
+    变化先记在 pending 中，定时器每帧最多刷新一次。只有当前标签页的状态
+    会写到地址栏、进度条和窗口标题，后台标签页只更新自己的标签文字和图标。
+    """
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self.pending = set()
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(UI_UPDATE_INTERVAL_MS)
+        self.timer.timeout.connect(self.flush)
+
+    def watch(self, state):
+        state.changed.connect(self.schedule)
+
+    def forget(self, state):
+        """标签页关闭时调用，丢弃尚未应用的变化"""
+        self.pending.discard(state)
+
+    def schedule(self, state):
+        self.pending.add(state)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    @traced()
+    def flush(self):
+        """应用这一帧内积累的全部变化"""
+        pending, self.pending = self.pending, set()
+        counter("ui_pending_tabs", count=len(pending))
+        tab_widget = self.window.tab_widget
+        current = tab_widget.currentWidget()
+        for state in pending:
+            fields = state.take_dirty()
+            if state.view is current:
+                self.apply(state, fields)
+            index = tab_widget.indexOf(state.view)
+            if index < 0:
+                continue
+            if FIELD_TITLE in fields and state.title:
+                self.window.update_tab_title(index, state.title)
+            if FIELD_ICON in fields:
+                tab_widget.setTabIcon(index, state.icon)
+
+    def refresh(self, state):
+        """切换标签页时立即把新当前标签页的完整状态应用到窗口上"""
+        self.apply(state, ALL_FIELDS)
+
+    def apply(self, state, fields):
+        window = self.window
+        if FIELD_URL in fields:
+            window.update_urlbar(state.url)
+        if FIELD_TITLE in fields:
+            window.update_window_title(state.title)
+        if FIELD_BLOCKED in fields:
+            window.update_blocked_count(state.blocked)
+        if FIELD_LOADED in fields:
+            window.page_loaded()
+        elif FIELD_PROGRESS in fields:
+            window.update_progress(state.progress if state.loading else 100)
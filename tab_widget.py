@@ -1,16 +1,49 @@
-from PyQt5.QtCore import *
-from PyQt5.QtWidgets import *
-from PyQt5.QtGui import *
+from PyQt5.QtCore import QEvent, QUrl, Qt, pyqtSignal
+from PyQt5.QtWidgets import QStackedWidget, QTabWidget, QWidget
+
+from web_view import SnapshotFader
 
 class AnimatedTabWidget(QTabWidget):
+    # 定义信号
+    current_about_to_change = pyqtSignal(object)   # 即将被切走的标签页（此时仍然可见，可以截图）
+    
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.animation = QPropertyAnimation(self, b"currentIndex")
-        self.animation.setDuration(300)
-        self.animation.setEasingCurve(QEasingCurve.OutCubic)
+        # 切换效果只作用在旧标签页的快照上，覆盖在页面区域之上
+        self.fader = SnapshotFader(self.findChild(QStackedWidget), 200)
+        # 点击标签切换时 currentChanged 发出前旧页面已经隐藏，在按下鼠标时提前通知
+        self.tabBar().installEventFilter(self)
+        
+    def eventFilter(self, obj, event):
+        if obj is self.tabBar() and event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            index = obj.tabAt(event.pos())
+            if index >= 0 and index != self.currentIndex() and self.currentWidget() is not None:
+                self.current_about_to_change.emit(self.currentWidget())
+        return super().eventFilter(obj, event)
         
     def setCurrentIndexWithAnimation(self, index):
-        self.animation.setStartValue(self.currentIndex())
-        self.animation.setEndValue(index)
-        self.animation.start()
+        """直接切换到目标标签页，只激活这一个标签页；旧页面的快照淡出作为过渡"""
+        if index == self.currentIndex() or not 0 <= index < self.count():
+            return
+        if self.currentWidget() is not None:
+            self.current_about_to_change.emit(self.currentWidget())
+        animate = self.currentWidget() is not None and self.fader.capture()
+        self.setCurrentIndex(index)
+        if animate:
+            self.fader.fade_out()
+
+
+class PlaceholderTab(QWidget):
+    """占位标签页：只保存网址和标题，首次激活时才创建真正的网页视图"""
+    
+    def __init__(self, url, title, parent=None):
+        super().__init__(parent)
+        self.pending_url = url
+        self.pending_title = title
+        
+    def url(self):
+        return QUrl(self.pending_url)
+        
+    def title(self):
+        return self.pending_title
         
\ No newline at end of file
@@ -0,0 +1,316 @@
+# task_manager.py - 任务管理器（每个标签页的渲染进程内存与 CPU 占用）
+import os
+import signal
+import threading
+import time
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, QThread, pyqtSignal
+from PyQt5.QtWidgets import (QAbstractItemView, QDialog, QHBoxLayout, QHeaderView, QLabel, QMessageBox,
+                             QPushButton, QTableView, QVBoxLayout)
+
+from procstats import CLOCK_TICKS, read_process_cpu_ticks, read_process_memory
+from tab_widget import PlaceholderTab
+
+# 采样间隔（秒）
+SAMPLE_INTERVAL = 2.0
+
+# 表格列
+COLUMN_TITLE = 0
+COLUMN_PID = 1
+COLUMN_RSS = 2
+COLUMN_PSS = 3
+COLUMN_CPU = 4
+COLUMN_STATE = 5
+COLUMN_HEADERS = ["标签页", "进程 ID", "内存 (RSS)", "内存 (PSS)", "CPU", "状态"]
+
+STATE_LABELS = {"active": "运行中", "frozen": "已冻结", "discarded": "已丢弃", "unloaded": "未加载"}
+
+
+class ResourceSampler(QThread):
+    """后台采样线程：定期读取一组进程的内存和 CPU 占用
+
+    多个标签页共用一个渲染进程时只读取一次，两次采样之间线程处于等待状态。
+    """
+
+    # 定义信号
+    samples_ready = pyqtSignal(object)   # {pid: (rss_kb, pss_kb, cpu_percent)}
+
+    def __init__(self, interval=SAMPLE_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.interval = interval
+        self.pids = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.last_ticks = {}   # pid -> (累计滴答数, 采样时间)
+
+    def set_pids(self, pids):
+        with self.lock:
+            self.pids = set(pids)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            with self.lock:
+                pids = list(self.pids)
+            self.samples_ready.emit(self.sample(pids))
+            self.stop_event.wait(self.interval)
+
+    def sample(self, pids):
+        now = time.monotonic()
+        samples = {}
+        last_ticks = {}
+        for pid in pids:
+            rss, pss = read_process_memory(pid)
+            ticks = read_process_cpu_ticks(pid)
+            cpu = None
+            if ticks is not None:
+                last_ticks[pid] = (ticks, now)
+                previous = self.last_ticks.get(pid)
+                if previous and now > previous[1]:
+                    cpu = (ticks - previous[0]) / CLOCK_TICKS / (now - previous[1]) * 100
+            samples[pid] = (rss, pss, cpu)
+        # 只保留本轮仍存在的进程
+        self.last_ticks = last_ticks
+        return samples
+
+    def stop(self):
+        self.stop_event.set()
+        self.wait()
+
+
+class TaskManagerModel(QAbstractTableModel):
+    """任务管理器的数据：每行一个标签页（以及浏览器主进程）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []      # [{"view", "title", "pid", "state"}]
+        self.samples = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMN_HEADERS[section]
+        return None
+
+    def sort_value(self, row, column):
+        """排序用的原始值"""
+        rss, pss, cpu = self.samples.get(row["pid"], (None, None, None))
+        if column == COLUMN_TITLE:
+            return row["title"].lower()
+        if column == COLUMN_PID:
+            return row["pid"] or 0
+        if column == COLUMN_RSS:
+            return rss or 0
+        if column == COLUMN_PSS:
+            return pss or 0
+        if column == COLUMN_CPU:
+            return cpu or 0.0
+        return row["state"]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.UserRole:
+            return self.sort_value(row, column)
+        if role == Qt.TextAlignmentRole and column != COLUMN_TITLE:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == Qt.ToolTipRole and column == COLUMN_TITLE:
+            return row["title"]
+        if role != Qt.DisplayRole:
+            return None
+
+        rss, pss, cpu = self.samples.get(row["pid"], (None, None, None))
+        if column == COLUMN_TITLE:
+            return row["title"]
+        if column == COLUMN_PID:
+            return str(row["pid"]) if row["pid"] else "—"
+        if column == COLUMN_RSS:
+            return format_kb(rss)
+        if column == COLUMN_PSS:
+            return format_kb(pss)
+        if column == COLUMN_CPU:
+            return "—" if cpu is None else f"{cpu:.1f}%"
+        return STATE_LABELS.get(row["state"], row["state"])
+
+    def set_rows(self, rows):
+        """标签页集合变化时整体替换，否则只通知数据变化，保留选中行"""
+        keys = [(row["view"], row["pid"]) for row in rows]
+        if keys != [(row["view"], row["pid"]) for row in self.rows]:
+            self.beginResetModel()
+            self.rows = rows
+            self.endResetModel()
+        else:
+            self.rows = rows
+            self.notify_all_changed()
+
+    def set_samples(self, samples):
+        self.samples = samples
+        self.notify_all_changed()
+
+    def notify_all_changed(self):
+        if self.rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows) - 1, len(COLUMN_HEADERS) - 1))
+
+    def row_at(self, row):
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+
+def format_kb(kb):
+    if kb is None:
+        return "—"
+    if kb >= 1024 * 1024:
+        return f"{kb / 1024 / 1024:.2f} GB"
+    return f"{kb / 1024:.1f} MB"
+
+
+class TaskManagerDialog(QDialog):
+    """任务管理器窗口：按标签页显示渲染进程的内存和 CPU 占用，可丢弃标签页或结束进程"""
+
+    def __init__(self, browser_window):
+        super().__init__(browser_window)
+        self.browser_window = browser_window
+        self.setWindowTitle("任务管理器")
+        self.resize(760, 480)
+        self.setObjectName("taskManagerDialog")
+
+        self.model = TaskManagerModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(Qt.UserRole)
+        self.proxy.setDynamicSortFilter(True)
+
+        self.sampler = ResourceSampler(parent=self)
+        self.sampler.samples_ready.connect(self.on_samples_ready)
+
+        self.init_ui()
+        self.refresh_rows()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(12)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(COLUMN_RSS, Qt.DescendingOrder)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(COLUMN_TITLE, QHeaderView.Stretch)
+        self.table.doubleClicked.connect(self.switch_to_tab)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.summary_label.setProperty("role", "description")
+        button_layout.addWidget(self.summary_label)
+        button_layout.addStretch()
+
+        discard_button = QPushButton("丢弃标签页")
+        discard_button.clicked.connect(self.discard_selected)
+        button_layout.addWidget(discard_button)
+
+        kill_button = QPushButton("结束进程")
+        kill_button.clicked.connect(self.kill_selected)
+        button_layout.addWidget(kill_button)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def collect_rows(self):
+        """在界面线程中收集标签页与渲染进程的对应关系（不读取 /proc）"""
+        lifecycle_manager = self.browser_window.lifecycle_manager
+        tab_widget = self.browser_window.tab_widget
+        rows = [{"view": None, "title": "浏览器主进程", "pid": os.getpid(), "state": "active"}]
+        for index in range(tab_widget.count()):
+            view = tab_widget.widget(index)
+            title = tab_widget.tabToolTip(index) or tab_widget.tabText(index)
+            if isinstance(view, PlaceholderTab):
+                rows.append({"view": view, "title": title, "pid": 0, "state": "unloaded"})
+                continue
+            rows.append({
+                "view": view,
+                "title": view.title() or title,
+                "pid": view.page().renderProcessPid(),
+                "state": lifecycle_manager.get_state(view),
+            })
+        return rows
+
+    def refresh_rows(self):
+        rows = self.collect_rows()
+        self.model.set_rows(rows)
+        self.sampler.set_pids(row["pid"] for row in rows if row["pid"])
+
+    def on_samples_ready(self, samples):
+        self.refresh_rows()
+        self.model.set_samples(samples)
+        total_pss = sum(pss or rss or 0 for rss, pss, _ in samples.values())
+        total_cpu = sum(cpu or 0 for _, _, cpu in samples.values())
+        self.summary_label.setText(
+            f"{len(samples)} 个进程，合计内存 {format_kb(total_pss)}，CPU {total_cpu:.1f}%")
+
+    def selected_row(self):
+        indexes = self.table.selectionModel().selectedRows()
+        if not indexes:
+            return None
+        return self.model.row_at(self.proxy.mapToSource(indexes[0]).row())
+
+    def discard_selected(self):
+        """丢弃选中的标签页，释放它的渲染进程（当前标签页无法丢弃）"""
+        row = self.selected_row()
+        if row is None or row["view"] is None or isinstance(row["view"], PlaceholderTab):
+            return
+        if self.browser_window.tab_widget.indexOf(row["view"]) < 0:
+            # 标签页已经关闭
+            return
+        if row["view"] is self.browser_window.current_browser():
+            QMessageBox.information(self, "任务管理器", "当前正在显示的标签页无法丢弃。")
+            return
+        self.browser_window.lifecycle_manager.discard(row["view"])
+        self.refresh_rows()
+
+    def kill_selected(self):
+        """结束选中标签页的渲染进程，共用该进程的标签页都会显示崩溃页面"""
+        row = self.selected_row()
+        if row is None or row["view"] is None or not row["pid"]:
+            return
+        shared = sum(1 for other in self.model.rows if other["view"] is not None and other["pid"] == row["pid"])
+        message = f"结束进程 {row['pid']}？"
+        if shared > 1:
+            message += f"\n有 {shared} 个标签页共用这个进程，它们都会受到影响。"
+        if QMessageBox.question(self, "任务管理器", message) != QMessageBox.Yes:
+            return
+        try:
+            os.kill(row["pid"], signal.SIGTERM)
+        except OSError as e:
+            print(f"结束进程失败: {e}")
+
+    def switch_to_tab(self, proxy_index):
+        row = self.model.row_at(self.proxy.mapToSource(proxy_index).row())
+        if row is None or row["view"] is None:
+            return
+        index = self.browser_window.tab_widget.indexOf(row["view"])
+        if index >= 0:
+            self.browser_window.tab_widget.setCurrentIndexWithAnimation(index)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 只在窗口显示时采样
+        if not self.sampler.isRunning():
+            self.sampler.stop_event.clear()
+            self.sampler.start()
+
+    def hideEvent(self, event):
+        self.sampler.stop()
+        super().hideEvent(event)
+
+    def closeEvent(self, event):
+        self.sampler.stop()
+        super().closeEvent(event)
@@ -0,0 +1,9 @@
+# conftest.py - 测试公共设置：项目根目录加入导入路径，数据目录指向临时目录
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 在导入任何项目模块之前设置，测试不会读写用户真实的数据目录
+os.environ.setdefault("PYRO_BROWSER_HOME", tempfile.mkdtemp(prefix="pyro-tests-"))
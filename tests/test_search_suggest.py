@@ -0,0 +1,141 @@
+# test_search_suggest.py - 建议解析、防抖、过时请求中止与前缀缓存（本地 HTTP 测试服务器）
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("PyQt5.QtNetwork")
+
+from PyQt5.QtCore import QCoreApplication  # noqa: E402
+
+from search_suggest import (SearchEngine, SearchSuggestProvider, parse_bilibili,  # noqa: E402
+                            parse_duckduckgo, parse_opensearch)
+
+# 以此开头的前缀服务器会延迟回复，用于测试中止
+SLOW_PREFIX = "slow"
+SLOW_DELAY = 2.0
+
+
+class SuggestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+        with self.server.lock:
+            self.server.queries.append(query)
+        if query.startswith(SLOW_PREFIX):
+            time.sleep(SLOW_DELAY)
+        body = json.dumps([query, [f"{query} 1", f"{query} 2"]]).encode("utf-8")
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), SuggestHandler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.queries = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def engine(server):
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return SearchEngine("local", "本地", base + "/s?q={query}", base + "/suggest?q={query}")
+
+
+@pytest.fixture
+def provider(app):
+    provider = SearchSuggestProvider()
+    provider.results = []
+    provider.suggestions_ready.connect(lambda prefix, suggestions: provider.results.append((prefix, suggestions)))
+    yield provider
+    provider.cancel()
+
+
+def wait_for(app, predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_parse_opensearch():
+    assert parse_opensearch('["py", ["python", "pytest"]]') == ["python", "pytest"]
+    assert parse_opensearch('["py", ["python"], [""], [""]]') == ["python"]
+    assert parse_opensearch('{"py": 1}') == []
+
+
+def test_parse_duckduckgo():
+    assert parse_duckduckgo('[{"phrase": "python"}, {"phrase": ""}, {"phrase": "pytest"}]') == ["python", "pytest"]
+    # type=list 时与 OpenSearch 相同
+    assert parse_duckduckgo('["py", ["python", "pytest"]]') == ["python", "pytest"]
+    assert parse_duckduckgo("[]") == []
+
+
+def test_parse_bilibili():
+    data = {"result": {"tag": [{"value": "原神"}, {"name": "无值"}, {"value": "原神攻略"}]}}
+    assert parse_bilibili(json.dumps(data)) == ["原神", "原神攻略"]
+    # 旧接口
+    assert parse_bilibili(json.dumps({"0": {"value": "原神"}, "1": {"value": "原神攻略"}})) == ["原神", "原神攻略"]
+    assert parse_bilibili('["原神"]') == []
+
+
+def test_debounce_sends_one_request(app, server, engine, provider):
+    for text in ("p", "py", "pyt", "pyth"):
+        provider.request(text, engine)
+
+    assert wait_for(app, lambda: provider.results)
+    assert server.queries == ["pyth"]
+    assert provider.results == [("pyth", ["pyth 1", "pyth 2"])]
+
+
+def test_stale_prefix_is_aborted(app, server, engine, provider):
+    provider.request(SLOW_PREFIX, engine)
+    assert wait_for(app, lambda: server.queries)
+    assert provider.reply is not None
+
+    provider.request("fast", engine)
+    assert provider.reply is None
+    assert wait_for(app, lambda: provider.results)
+    # 等过慢速回复的时间，被中止的请求不会再发出结果
+    wait_for(app, lambda: False, SLOW_DELAY + 0.5)
+
+    assert server.queries == [SLOW_PREFIX, "fast"]
+    assert provider.results == [("fast", ["fast 1", "fast 2"])]
+    assert ("local", SLOW_PREFIX) not in provider.cache
+
+
+def test_cached_prefix_skips_network(app, server, engine, provider):
+    provider.request("rust", engine)
+    assert wait_for(app, lambda: provider.results)
+
+    # 命中缓存时同步返回，不区分大小写，也不再发请求
+    provider.request("Rust", engine)
+    assert provider.results[-1] == ("Rust", ["rust 1", "rust 2"])
+    wait_for(app, lambda: False, 0.3)
+    assert server.queries == ["rust"]
+    assert len(provider.results) == 2
@@ -0,0 +1,179 @@
+# test_update_downloader.py - 分段下载、断点续传、校验与 If-Range（本地 HTTP 测试服务器）
+import os
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore")
+
+from update_downloader import (DownloadCancelled, DownloadError, RemoteChanged,  # noqa: E402
+                               SegmentedDownload)
+
+BLOB = os.urandom(3 * 1024 * 1024 + 12345)
+BLOB_SHA256 = hashlib.sha256(BLOB).hexdigest()
+SEND_CHUNK = 64 * 1024
+
+
+class BlobHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append({name.lower(): value for name, value in self.headers.items()})
+        data = server.blob
+        status, body, content_range = 200, data, None
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and server.ranges and not (if_range and if_range != server.validator()):
+            first, _, last = range_header.split("=", 1)[1].partition("-")
+            first, last = int(first), int(last) if last else len(data) - 1
+            status, body = 206, data[first:last + 1]
+            content_range = f"bytes {first}-{last}/{len(data)}"
+
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        if server.etag:
+            self.send_header("ETag", server.etag)
+        self.send_header("Last-Modified", server.last_modified)
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.end_headers()
+        try:
+            for offset in range(0, len(body), SEND_CHUNK):
+                self.wfile.write(body[offset:offset + SEND_CHUNK])
+                if server.delay:
+                    time.sleep(server.delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), BlobHandler)
+    httpd.daemon_threads = True
+    httpd.blob = BLOB
+    httpd.ranges = True
+    httpd.etag = '"v1"'
+    httpd.last_modified = "Wed, 01 Jan 2025 00:00:00 GMT"
+    httpd.delay = 0
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    # If-Range 与当前文件不一致时返回 200；弱 ETag 永远不匹配
+    httpd.validator = lambda: httpd.last_modified if httpd.etag.startswith("W/") else httpd.etag
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/package.bin"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def range_requests(server):
+    return [request for request in server.requests if request.get("range") != "bytes=0-0"]
+
+
+def test_segmented_download_uses_ranges(server, tmp_path):
+    target = str(tmp_path / "package.bin")
+    path = SegmentedDownload(server.url, target, BLOB_SHA256, segments=4).run()
+
+    assert path == target
+    with open(target, "rb") as f:
+        assert f.read() == BLOB
+    assert len(range_requests(server)) == 4
+    assert all(request["if-range"] == '"v1"' for request in range_requests(server))
+    assert not os.path.exists(target + ".part")
+    assert not os.path.exists(target + ".part.json")
+
+
+def test_resume_after_cancel(server, tmp_path):
+    target = str(tmp_path / "package.bin")
+    server.delay = 0.05
+    cancel_event = threading.Event()
+
+    def on_progress(received, total):
+        if received > 0:
+            cancel_event.set()
+
+    with pytest.raises(DownloadCancelled):
+        SegmentedDownload(server.url, target, BLOB_SHA256, segments=4, cancel_event=cancel_event,
+                          progress_callback=on_progress).run()
+    with open(target + ".part.json", "r", encoding="utf-8") as f:
+        state = json.load(f)
+    saved = sum(segment[2] for segment in state["segments"])
+    assert 0 < saved < len(BLOB)
+
+    server.delay = 0
+    server.requests.clear()
+    SegmentedDownload(server.url, target, BLOB_SHA256, segments=4).run()
+
+    with open(target, "rb") as f:
+        assert f.read() == BLOB
+    # 续传只请求每个分段剩余的部分
+    requested = sorted(tuple(int(n) for n in request["range"].split("=")[1].split("-"))
+                       for request in range_requests(server))
+    remaining = sorted((start + downloaded, end - 1) for start, end, downloaded in state["segments"]
+                       if downloaded < end - start)
+    assert requested == remaining
+
+
+def test_sha256_mismatch_raises(server, tmp_path):
+    target = str(tmp_path / "package.bin")
+    with pytest.raises(DownloadError, match="SHA-256"):
+        SegmentedDownload(server.url, target, "0" * 64, segments=4).run()
+    assert not os.path.exists(target)
+    assert not os.path.exists(target + ".part")
+
+
+def change_after_probe(server, monkeypatch, times):
+    """每次探测之后把服务器上的文件换成新版本，共 times 次"""
+    original_probe = SegmentedDownload.probe
+    probes = []
+
+    def probe_then_change(self):
+        result = original_probe(self)
+        probes.append(result)
+        if len(probes) <= times:
+            server.etag = f'"v{len(probes) + 1}"'
+        return result
+
+    monkeypatch.setattr(SegmentedDownload, "probe", probe_then_change)
+    return probes
+
+
+def test_if_range_full_reply_raises_remote_changed(server, tmp_path, monkeypatch):
+    target = str(tmp_path / "package.bin")
+    # 文件在每次探测之后都变化，重新开始一次后仍然失败
+    probes = change_after_probe(server, monkeypatch, times=2)
+    with pytest.raises(RemoteChanged):
+        SegmentedDownload(server.url, target, BLOB_SHA256, segments=4).run()
+    assert len(probes) == 2
+    assert all(request.get("if-range") in ('"v1"', '"v2"') for request in range_requests(server))
+
+
+def test_remote_change_restarts_once(server, tmp_path, monkeypatch):
+    target = str(tmp_path / "package.bin")
+    probes = change_after_probe(server, monkeypatch, times=1)
+    SegmentedDownload(server.url, target, BLOB_SHA256, segments=4).run()
+
+    assert [etag for _, etag, _, _ in probes] == ['"v1"', '"v2"']
+    with open(target, "rb") as f:
+        assert f.read() == BLOB
+
+
+def test_weak_etag_uses_last_modified(server, tmp_path):
+    server.etag = 'W/"v1"'
+    target = str(tmp_path / "package.bin")
+    SegmentedDownload(server.url, target, BLOB_SHA256, segments=4).run()
+
+    with open(target, "rb") as f:
+        assert f.read() == BLOB
+    assert all(request["if-range"] == server.last_modified for request in range_requests(server))
+
@@ -0,0 +1,300 @@
+# thumbnails.py - 标签页缩略图（线程池中编码、按字节预算的 LRU 缓存、可选磁盘溢出、悬停预览）
+import os
+from collections import OrderedDict
+from PyQt5.QtCore import (QBuffer, QByteArray, QEvent, QIODevice, QObject, QRunnable, QThreadPool, QTimer, Qt,
+                          pyqtSignal)
+from PyQt5.QtGui import QImageWriter, QPixmap
+from PyQt5.QtWidgets import QLabel
+
+from config import get_config, get_data_path
+from tab_widget import PlaceholderTab
+
+DEFAULT_THUMBNAIL_SETTINGS = {
+    "enabled": True,
+    "width": 320,                # 缩略图宽度，高度按比例
+    "format": "webp",            # 不支持 WebP 时使用 JPEG
+    "quality": 70,
+    "memory_budget_kb": 8192,    # 内存中编码后数据的总大小上限
+    "disk_spill": True,          # 超出预算的缩略图写入磁盘，而不是直接丢弃
+    "hover_preview": True,
+    "hover_delay_ms": 400,
+}
+
+THUMBNAILS_DIR_NAME = "thumbnails"
+
+# 已解码的 QPixmap 只保留这么多张，概览中滚动时按需解码
+DECODED_CACHE_SIZE = 64
+# 页面加载完成后等待这么久再截图，让首屏渲染稳定
+CAPTURE_DELAY_MS = 500
+# 悬停预览显示的宽度
+PREVIEW_WIDTH = 240
+
+
+def encode_image(image, width, image_format, quality):
+    """缩放并编码为字节串（QImage 可以在非界面线程中使用）"""
+    if image.width() > width:
+        image = image.scaledToWidth(width, Qt.SmoothTransformation)
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, image_format, quality)
+    buffer.close()
+    return bytes(data)
+
+
+class EncodeTask(QRunnable):
+    """线程池任务：编码一张截图，完成后通过 ThumbnailStore 的信号送回界面线程"""
+
+    def __init__(self, store, key, generation, image):
+        super().__init__()
+        self.store = store
+        self.key = key
+        self.generation = generation
+        self.image = image
+
+    def run(self):
+        try:
+            data = encode_image(self.image, int(self.store.settings["width"]), self.store.image_format,
+                                int(self.store.settings["quality"]))
+        except Exception as e:
+            print(f"缩略图编码失败: {e}")
+            return
+        if data:
+            self.store.encoded.emit(self.key, self.generation, data)
+
+
+class DiskTask(QRunnable):
+    """磁盘线程池任务：写入或删除溢出的缩略图文件"""
+
+    def __init__(self, path, data=None):
+        super().__init__()
+        self.path = path
+        self.data = data
+
+    def run(self):
+        try:
+            if self.data is None:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self.data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"缩略图文件写入失败: {e}")
+
+
+class ThumbnailStore(QObject):
+    """按标签页 id 保存缩略图
+
+    只截取当前可见的标签页（失去焦点前或加载完成后），后台标签页的渲染进程不会被唤醒。
+    编码在线程池中完成；内存中只保存编码后的字节，超出预算时把最久未用的写入磁盘。
+    标签页 id 跨会话保留，恢复的占位标签页也能直接显示上次的缩略图。
+    """
+
+    # 定义信号
+    encoded = pyqtSignal(object, int, object)   # 线程池 -> 界面线程 (id, 版本, 数据)
+    thumbnail_updated = pyqtSignal(object)      # 某个标签页的缩略图已更新
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = get_config("thumbnails", DEFAULT_THUMBNAIL_SETTINGS)
+        self.enabled = bool(self.settings["enabled"])
+        supported = {bytes(name).decode().lower() for name in QImageWriter.supportedImageFormats()}
+        self.image_format = self.settings["format"].lower() if self.settings["format"].lower() in supported else "jpeg"
+        self.budget = int(self.settings["memory_budget_kb"]) * 1024
+        self.spill = bool(self.settings["disk_spill"])
+        self.directory = os.path.dirname(get_data_path(THUMBNAILS_DIR_NAME, "placeholder"))
+
+        self.memory = OrderedDict()     # id -> 编码后的字节
+        self.memory_bytes = 0
+        self.decoded = OrderedDict()    # id -> QPixmap
+        self.generations = {}           # id -> 最新一次截图的版本，丢弃过时的编码结果
+        self.on_disk = set()            # 磁盘上已有最新版本的 id，再次移出内存时不必重写
+        self.encoded.connect(self.on_encoded)
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        # 磁盘操作串行执行，同一文件的写入和删除不会乱序
+        self.disk_pool = QThreadPool(self)
+        self.disk_pool.setMaxThreadCount(1)
+
+        self.pending_view = None
+        self.capture_timer = QTimer(self)
+        self.capture_timer.setSingleShot(True)
+        self.capture_timer.setInterval(CAPTURE_DELAY_MS)
+        self.capture_timer.timeout.connect(self.capture_pending)
+
+    def disk_path(self, key):
+        return os.path.join(self.directory, f"{key}.{self.image_format}")
+
+    def schedule_capture(self, view):
+        """页面加载完成后稍后截图（只在它仍是可见标签页时）"""
+        if self.enabled:
+            self.pending_view = view
+            self.capture_timer.start()
+
+    def capture_pending(self):
+        view, self.pending_view = self.pending_view, None
+        if view is not None:
+            self.capture(view)
+
+    def capture(self, view):
+        """截取可见标签页的画面，缩放和编码交给线程池"""
+        if not self.enabled or view is None or isinstance(view, PlaceholderTab) or not view.isVisible():
+            return
+        key = getattr(view, "tab_id", None)
+        if key is None:
+            return
+        pixmap = view.grab()
+        if pixmap.isNull():
+            return
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+        self.pool.start(EncodeTask(self, key, generation, pixmap.toImage()))
+
+    def on_encoded(self, key, generation, data):
+        if self.generations.get(key) != generation:
+            # 标签页已关闭，或者已有更新的截图
+            return
+        self.put(key, data)
+        self.thumbnail_updated.emit(key)
+
+    def put(self, key, data, from_disk=False):
+        if from_disk:
+            self.on_disk.add(key)
+        else:
+            self.on_disk.discard(key)
+        old = self.memory.pop(key, None)
+        if old is not None:
+            self.memory_bytes -= len(old)
+        self.memory[key] = data
+        self.memory_bytes += len(data)
+        self.decoded.pop(key, None)
+        while self.memory_bytes > self.budget and len(self.memory) > 1:
+            self.evict_oldest()
+
+    def evict_oldest(self):
+        key, data = self.memory.popitem(last=False)
+        self.memory_bytes -= len(data)
+        if self.spill and key not in self.on_disk:
+            self.on_disk.add(key)
+            self.disk_pool.start(DiskTask(self.disk_path(key), data))
+
+    def data(self, key):
+        """返回编码后的缩略图，内存中没有时从磁盘读取"""
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory.move_to_end(key)
+            return data
+        if not self.spill:
+            return None
+        try:
+            with open(self.disk_path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        self.put(key, data, from_disk=True)
+        return data
+
+    def pixmap(self, key):
+        """返回解码后的缩略图，没有时返回 None"""
+        pixmap = self.decoded.get(key)
+        if pixmap is not None:
+            self.decoded.move_to_end(key)
+            return pixmap
+        data = self.data(key)
+        if data is None:
+            return None
+        pixmap = QPixmap()
+        if not pixmap.loadFromData(data):
+            return None
+        self.decoded[key] = pixmap
+        while len(self.decoded) > DECODED_CACHE_SIZE:
+            self.decoded.popitem(last=False)
+        return pixmap
+
+    def remove(self, key):
+        """标签页关闭时删除它的缩略图"""
+        self.generations.pop(key, None)
+        self.decoded.pop(key, None)
+        self.on_disk.discard(key)
+        data = self.memory.pop(key, None)
+        if data is not None:
+            self.memory_bytes -= len(data)
+        if self.spill:
+            self.disk_pool.start(DiskTask(self.disk_path(key)))
+
+    def prune(self, keep_keys):
+        """删除不属于任何现有标签页的磁盘缩略图（启动恢复会话后调用）"""
+        keep = {f"{key}.{self.image_format}" for key in keep_keys}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name not in keep:
+                self.disk_pool.start(DiskTask(os.path.join(self.directory, name)))
+
+    def trim(self):
+        """内存紧张时调用：内存中的缩略图全部移到磁盘（或丢弃），返回移出的数量"""
+        count = len(self.memory)
+        while self.memory:
+            self.evict_oldest()
+        self.decoded.clear()
+        return count
+
+
+    def close(self):
+        """退出时把内存中的缩略图写入磁盘，下次启动恢复的标签页可以继续使用"""
+        self.capture_timer.stop()
+        self.pool.waitForDone(1000)
+        if self.spill:
+            self.trim()
+        self.disk_pool.waitForDone()
+
+
+class TabHoverPreview(QLabel):
+    """鼠标在标签上停留时显示该标签页的缩略图"""
+
+    def __init__(self, tab_widget, store):
+        super().__init__(None, Qt.ToolTip | Qt.FramelessWindowHint)
+        self.tab_widget = tab_widget
+        self.store = store
+        self.setObjectName("tabHoverPreview")
+        self.hovered_index = -1
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(int(store.settings["hover_delay_ms"]))
+        self.timer.timeout.connect(self.show_preview)
+        tab_widget.tabBar().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        event_type = event.type()
+        if event_type == QEvent.HoverMove:
+            index = obj.tabAt(event.pos())
+            if index != self.hovered_index:
+                self.hovered_index = index
+                self.hide()
+                if index >= 0 and index != self.tab_widget.currentIndex():
+                    self.timer.start()
+                else:
+                    self.timer.stop()
+        elif event_type in (QEvent.HoverLeave, QEvent.MouseButtonPress, QEvent.Wheel):
+            self.hovered_index = -1
+            self.timer.stop()
+            self.hide()
+        return False
+
+    def show_preview(self):
+        widget = self.tab_widget.widget(self.hovered_index)
+        pixmap = self.store.pixmap(getattr(widget, "tab_id", None)) if widget is not None else None
+        if pixmap is None:
+            return
+        self.setPixmap(pixmap.scaledToWidth(PREVIEW_WIDTH, Qt.SmoothTransformation))
+        self.adjustSize()
+        tab_bar = self.tab_widget.tabBar()
+        self.move(tab_bar.mapToGlobal(tab_bar.tabRect(self.hovered_index).bottomLeft()))
+        self.show()
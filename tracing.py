@@ -0,0 +1,232 @@
+# tracing.py - 界面线程热点的跟踪事件（环形缓冲区，可导出为 Chrome trace-event JSON）
+import os
+import sys
+import json
+import time
+import threading
+import functools
+from collections import deque
+
+from startup_trace import PROCESS_START
+from config import get_config, get_data_path
+
+DEFAULT_TRACING_SETTINGS = {
+    "buffer_events": 200000,   # 环形缓冲区保留的事件数，超出时丢弃最早的事件
+}
+
+TRACES_DIR_NAME = "traces"
+
+# 事件类型（Chrome trace-event 的 ph 字段）
+PHASE_COMPLETE = "X"   # 带持续时间的区间
+PHASE_INSTANT = "i"
+PHASE_COUNTER = "C"
+
+
+class _NullSpan:
+    """未启用跟踪时 span() 返回的空上下文，不做任何事"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.category, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class Tracer:
+    """记录区间、瞬时事件和计数器
+
+    事件以元组形式追加到定长 deque 中，导出时才转换为 JSON；区间在结束时记录为一个
+    完整事件（ph=X），缓冲区丢弃旧事件时不会留下不成对的开始或结束。未启用时每次调用
+    只多一次属性判断。
+    """
+
+    def __init__(self, capacity=DEFAULT_TRACING_SETTINGS["buffer_events"]):
+        self.enabled = False
+        self.output_path = None   # 退出时写入的文件（命令行启用时设置）
+        self.events = deque(maxlen=capacity)
+        self.started_at = None
+
+    def start(self, capacity=None):
+        if capacity and capacity != self.events.maxlen:
+            self.events = deque(maxlen=capacity)
+        self.events.clear()
+        self.output_path = None
+        self.started_at = time.time()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def complete(self, name, category, start, end, args=None):
+        self.events.append((PHASE_COMPLETE, name, category, start, end - start, threading.get_ident(), args))
+
+    def instant(self, name, category="gui", **args):
+        if self.enabled:
+            self.events.append((PHASE_INSTANT, name, category, time.perf_counter(), 0,
+                                threading.get_ident(), args or None))
+
+    def counter(self, name, category="gui", **values):
+        values = {key: value for key, value in values.items() if value is not None}
+        if self.enabled and values:
+            self.events.append((PHASE_COUNTER, name, category, time.perf_counter(), 0,
+                                threading.get_ident(), values))
+
+    def span(self, name, category="gui", **args):
+        """用于 with 语句的区间，未启用时返回共享的空上下文"""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, category, args or None)
+
+    def to_chrome_trace(self):
+        """转换为 chrome://tracing 和 Perfetto 可以打开的 JSON 对象"""
+        pid = os.getpid()
+        trace_events = []
+        thread_ids = set()
+        for phase, name, category, start, duration, tid, args in list(self.events):
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": phase,
+                "ts": round((start - PROCESS_START) * 1e6, 3),
+                "pid": pid,
+                "tid": tid,
+            }
+            if phase == PHASE_COMPLETE:
+                event["dur"] = round(duration * 1e6, 3)
+            elif phase == PHASE_INSTANT:
+                event["s"] = "t"
+            if args:
+                event["args"] = {key: value if isinstance(value, (int, float, bool)) or value is None
+                                 else str(value) for key, value in args.items()}
+            trace_events.append(event)
+            thread_ids.add(tid)
+
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        main_ident = threading.main_thread().ident
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "烈焰浏览器"}}]
+        for tid in sorted(thread_ids):
+            name = "GUI" if tid == main_ident else thread_names.get(tid, f"thread-{tid}")
+            metadata.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return {
+            "traceEvents": metadata + trace_events,
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": self.started_at, "buffer_events": self.events.maxlen,
+                          "recorded_events": len(trace_events)},
+        }
+
+    def export(self, path=None):
+        """写入跟踪文件，返回文件路径，失败时返回 None"""
+        if path is None:
+            name = time.strftime("trace-%Y%m%d-%H%M%S.json")
+            path = get_data_path(TRACES_DIR_NAME, name)
+        data = self.to_chrome_trace()
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"跟踪文件写入失败: {e}", file=sys.stderr)
+            return None
+        return path
+
+    def close(self):
+        """退出时调用：命令行启用的跟踪写入文件"""
+        if self.enabled and self.output_path is not None:
+            path = self.export(self.output_path or None)
+            if path:
+                print(f"跟踪事件已写入 {path}", file=sys.stderr)
+        self.stop()
+
+
+# 模块导入时即创建，被跟踪的函数不需要判断是否为 None
+_tracer = Tracer()
+
+
+def get_tracer():
+    """获取全局跟踪器"""
+    return _tracer
+
+
+def start_tracing():
+    """按配置的缓冲区大小开始记录"""
+    settings = get_config("tracing", DEFAULT_TRACING_SETTINGS)
+    _tracer.start(int(settings["buffer_events"]))
+    return _tracer
+
+
+def configure_tracing(enabled, output_path=None):
+    """命令行启用时从启动开始记录，退出时写入 output_path（未指定时写入数据目录）"""
+    if enabled:
+        start_tracing()
+        _tracer.output_path = output_path or ""
+    return _tracer
+
+
+def parse_trace_args(argv):
+    """从命令行参数中取出 --trace[=输出文件]，返回 (剩余参数, 是否启用, 输出文件)"""
+    remaining = []
+    enabled = False
+    output_path = None
+    for arg in argv:
+        if arg == "--trace":
+            enabled = True
+        elif arg.startswith("--trace="):
+            enabled = True
+            output_path = arg.split("=", 1)[1] or None
+        else:
+            remaining.append(arg)
+    return remaining, enabled, output_path
+
+
+def traced(name=None, category="gui"):
+    """把函数的每次调用记录为一个区间
+
+    未启用时只多一次函数调用和属性判断，可以留在发布版本中。被装饰的槽函数连接信号时
+    参数个数要与信号一致（PyQt 不会为包装函数丢弃多余的参数）。
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _tracer.complete(span_name, category, start, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+def instant(name, category="gui", **args):
+    """记录一个瞬时事件（导航节点、标签页状态变化等）"""
+    if _tracer.enabled:
+        _tracer.instant(name, category, **args)
+
+
+def counter(name, category="gui", **values):
+    """记录计数器的当前值，在跟踪视图中显示为曲线"""
+    if _tracer.enabled:
+        _tracer.counter(name, category, **values)
@@ -1,153 +1,219 @@
-class UpdateChecker(QThread):
-    """版本检查线程"""
-    
+# update_checker.py - 版本检查服务（并行请求所有镜像、条件请求、磁盘缓存）
+import os
+import json
+import time
+from PyQt5.QtCore import QObject, QTimer, QUrl, pyqtSignal
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+
+from config import get_config, get_data_path
+from version import CURRENT_VERSION, UPDATE_MIRRORS
+
+UPDATE_CACHE_FILE_NAME = "update_cache.json"
+
+DEFAULT_UPDATE_SETTINGS = {
+    "check_on_startup": True,
+    "startup_delay_seconds": 5,     # 启动后多久再静默检查，避免和首屏加载抢网络
+    "cache_ttl_hours": 6,           # 缓存结果的有效期
+    "timeout_seconds": 5,           # 所有镜像都没有响应时的总超时
+}
+
+REQUIRED_FIELDS = ("latest_version", "release_date", "download_url")
+
+_update_checker = None
+
+
+def validate_version_info(version_info):
+    """验证版本信息格式"""
+    return isinstance(version_info, dict) and all(field in version_info for field in REQUIRED_FIELDS)
+
+
+def parse_version(version):
+    # 移除可能的前缀如 "v"
+    return [int(part) for part in str(version).lstrip("vV").split(".")]
+
+
+def compare_versions(current_version, latest_version):
+    """比较版本号，返回是否需要更新"""
+    try:
+        current_parts = parse_version(current_version)
+        latest_parts = parse_version(latest_version)
+    except ValueError as e:
+        print(f"版本比较错误: {e}")
+        return False
+    length = max(len(current_parts), len(latest_parts))
+    current_parts += [0] * (length - len(current_parts))
+    latest_parts += [0] * (length - len(latest_parts))
+    return latest_parts > current_parts
+
+
+class UpdateChecker(QObject):
+    """版本检查服务，整个应用共用一个实例
+
+    同时请求所有镜像，采用第一个有效的版本清单并中止其余请求；带上次的
+    ETag / Last-Modified 做条件请求，结果缓存到磁盘，有效期内直接使用缓存。
+    """
+
     # 定义信号
     update_available = pyqtSignal(dict)  # 有新版本可用
     no_update = pyqtSignal()             # 已是最新版本
     check_failed = pyqtSignal(str)       # 检查失败
-    
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.timeout = 10  # 10秒超时
-    
-    def run(self):
-        """执行版本检查"""
+        self.settings = get_config("updates", DEFAULT_UPDATE_SETTINGS)
+        self.cache_path = get_data_path(UPDATE_CACHE_FILE_NAME)
+        self.cache = self.load_cache()
+        self.network = None
+        self.replies = []
+
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self.on_timeout)
+
+    def load_cache(self):
+        """缓存格式: {"checked_at", "version_info", "validators": {网址: {"etag", "last_modified"}}}"""
         try:
-            # 从version模块导入配置
-            try:
-                from version import VERSION_CHECK_URL, BACKUP_VERSION_URL, CURRENT_VERSION
-            except ImportError:
-                # 如果version.py不存在，使用默认值
-                CURRENT_VERSION = "2.1.0"
-                VERSION_CHECK_URL = "https://raw.githubusercontent.com/your-username/pyro-browser/main/version.json"
-                BACKUP_VERSION_URL = "https://gist.githubusercontent.com/your-username/your-gist-id/raw/pyro-browser-version.json"
-            
-            # 尝试从主URL获取版本信息
-            version_info = self.fetch_version_info(VERSION_CHECK_URL)
-            if not version_info:
-                # 如果主URL失败，尝试备用URL
-                version_info = self.fetch_version_info(BACKUP_VERSION_URL)
-            
-            if version_info:
-                self.process_version_info(version_info, CURRENT_VERSION)
-            else:
-                # 如果网络检查失败，使用模拟数据作为备用
-                self.use_fallback_check()
-                
-        except Exception as e:
-            self.check_failed.emit(f"检查更新时发生错误: {str(e)}")
-    
-    def fetch_version_info(self, url):
-        """从指定URL获取版本信息"""
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if isinstance(cache, dict):
+                cache.setdefault("validators", {})
+                return cache
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"更新缓存读取失败: {e}")
+        return {"checked_at": 0, "version_info": None, "validators": {}}
+
+    def save_cache(self):
+        tmp_path = self.cache_path + ".tmp"
         try:
-            # 设置请求头，避免被某些服务器拒绝
-            headers = {
-                'User-Agent': 'PyroBrowser/2.1.0',
-                'Accept': 'application/json'
-            }
-            
-            response = requests.get(url, timeout=self.timeout, headers=headers)
-            if response.status_code == 200:
-                version_data = response.json()
-                
-                # 验证版本信息格式
-                if self.validate_version_info(version_data):
-                    return version_data
-                else:
-                    print(f"无效的版本信息格式从: {url}")
-                    return None
-                    
-        except requests.exceptions.Timeout:
-            print(f"请求超时: {url}")
-        except requests.exceptions.ConnectionError:
-            print(f"连接错误: {url}")
-        except requests.exceptions.RequestException as e:
-            print(f"请求异常 {url}: {e}")
-        except json.JSONDecodeError:
-            print(f"JSON解析错误从: {url}")
-        
-        return None
-    
-    def validate_version_info(self, version_info):
-        """验证版本信息格式"""
-        required_fields = ['latest_version', 'release_date', 'download_url']
-        return all(field in version_info for field in required_fields)
-    
-    def compare_versions(self, current_version, latest_version):
-        """比较版本号，返回是否需要更新"""
-        try:
-            def parse_version(version):
-                # 移除可能的前缀如 "v"
-                version = version.lstrip('vV')
-                parts = version.split('.')
-                # 将每个部分转换为整数
-                return [int(part) for part in parts]
-            
-            current_parts = parse_version(current_version)
-            latest_parts = parse_version(latest_version)
-            
-            # 比较每个部分
-            for i in range(max(len(current_parts), len(latest_parts))):
-                current_part = current_parts[i] if i < len(current_parts) else 0
-                latest_part = latest_parts[i] if i < len(latest_parts) else 0
-                
-                if latest_part > current_part:
-                    return True
-                elif latest_part < current_part:
-                    return False
-            
-            return False
-            
-        except Exception as e:
-            print(f"版本比较错误: {e}")
-            return False
-    
-    def process_version_info(self, version_info, current_version):
-        """处理版本信息"""
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"更新缓存保存失败: {e}")
+
+    def is_cache_fresh(self):
+        ttl = self.settings["cache_ttl_hours"] * 3600
+        return validate_version_info(self.cache.get("version_info")) and \
+            time.time() - self.cache.get("checked_at", 0) < ttl
+
+    def is_checking(self):
+        return bool(self.replies)
+
+    def check(self, force=False):
+        """检查更新；缓存有效时立即发出结果，否则异步请求所有镜像"""
+        if not force and self.is_cache_fresh():
+            self.emit_result(self.cache["version_info"])
+            return
+        if self.is_checking():
+            # 已有检查在进行，结果会通过同样的信号发出
+            return
+        if not UPDATE_MIRRORS:
+            self.check_failed.emit("没有配置更新镜像")
+            return
+
+        if self.network is None:
+            self.network = QNetworkAccessManager(self)
+        has_cached_info = validate_version_info(self.cache.get("version_info"))
+        for url in UPDATE_MIRRORS:
+            request = QNetworkRequest(QUrl(url))
+            request.setRawHeader(b"User-Agent", f"PyroBrowser/{CURRENT_VERSION}".encode())
+            request.setRawHeader(b"Accept", b"application/json")
+            validators = self.cache["validators"].get(url, {})
+            if has_cached_info:
+                # 只有本地有清单时才能接受 304
+                if validators.get("etag"):
+                    request.setRawHeader(b"If-None-Match", validators["etag"].encode())
+                if validators.get("last_modified"):
+                    request.setRawHeader(b"If-Modified-Since", validators["last_modified"].encode())
+            reply = self.network.get(request)
+            reply.finished.connect(lambda r=reply, u=url: self.on_reply_finished(r, u))
+            self.replies.append(reply)
+        self.timeout_timer.start(int(self.settings["timeout_seconds"] * 1000))
+
+    def on_reply_finished(self, reply, url):
+        reply.deleteLater()
+        if reply not in self.replies:
+            # 已经有其他镜像返回了结果，这是被中止的请求
+            return
+        self.replies.remove(reply)
+
+        version_info = self.read_reply(reply, url)
+        if version_info is not None:
+            self.finish(version_info)
+        elif not self.replies:
+            self.fail("所有更新镜像都不可用")
+
+    def read_reply(self, reply, url):
+        """返回有效的版本清单，失败时返回 None"""
+        if reply.error() != QNetworkReply.NoError:
+            if reply.error() != QNetworkReply.OperationCanceledError:
+                print(f"更新检查失败 {url}: {reply.errorString()}")
+            return None
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status == 304:
+            # 清单没有变化，沿用缓存
+            return self.cache.get("version_info")
         try:
-            latest_version = version_info.get('latest_version')
-            if not latest_version:
-                self.check_failed.emit("无效的版本信息格式")
-                return
-            
-            if self.compare_versions(current_version, latest_version):
-                # 有新版本可用
-                self.update_available.emit(version_info)
-            else:
-                # 已是最新版本
-                self.no_update.emit()
-                
-        except Exception as e:
-            self.check_failed.emit(f"处理版本信息时出错: {str(e)}")
-    
-    def use_fallback_check(self):
-        """备用检查机制 - 使用模拟数据"""
-        try:
-            # 模拟网络延迟
-            self.msleep(1500)
-            
-            # 这里可以改为总是返回无更新，或者根据配置决定
-            # 目前使用随机模拟
-            import random
-            if random.random() > 0.7:  # 30%概率显示有更新
-                version_info = {
-                    "latest_version": "2.2.0",
-                    "release_date": "2024-12-15",
-                    "download_url": "https://github.com/your-username/pyro-browser/releases/latest",
-                    "changelog": "https://github.com/your-username/pyro-browser/blob/main/CHANGELOG.md",
-                    "update_priority": "normal",
-                    "changes": [
-                        "新增：自动更新检查功能",
-                        "优化：关于对话框滚动体验",
-                        "修复：已知的性能问题",
-                        "改进：标签页管理逻辑",
-                        "增强：浏览器稳定性"
-                    ]
-                }
-                self.update_available.emit(version_info)
-            else:
-                self.no_update.emit()
-                
-        except Exception as e:
-            self.check_failed.emit(f"备用检查失败: {str(e)}")
-            
\ No newline at end of file
+            version_info = json.loads(bytes(reply.readAll()).decode("utf-8"))
+        except ValueError:
+            print(f"JSON解析错误从: {url}")
+            return None
+        if not validate_version_info(version_info):
+            print(f"无效的版本信息格式从: {url}")
+            return None
+
+        validators = {}
+        if reply.hasRawHeader(b"ETag"):
+            validators["etag"] = bytes(reply.rawHeader(b"ETag")).decode("latin-1")
+        if reply.hasRawHeader(b"Last-Modified"):
+            validators["last_modified"] = bytes(reply.rawHeader(b"Last-Modified")).decode("latin-1")
+        self.cache["validators"][url] = validators
+        return version_info
+
+    def finish(self, version_info):
+        """采用第一个有效结果，中止其余镜像的请求"""
+        self.abort_all()
+        self.cache["version_info"] = version_info
+        self.cache["checked_at"] = time.time()
+        self.save_cache()
+        self.emit_result(version_info)
+
+    def fail(self, message):
+        self.abort_all()
+        cached = self.cache.get("version_info")
+        if validate_version_info(cached):
+            # 网络不可用时使用过期的缓存结果
+            self.emit_result(cached)
+        else:
+            self.check_failed.emit(message)
+
+    def on_timeout(self):
+        if self.replies:
+            self.fail("检查更新超时")
+
+    def abort_all(self):
+        self.timeout_timer.stop()
+        replies, self.replies = self.replies, []
+        for reply in replies:
+            reply.abort()
+
+    def emit_result(self, version_info):
+        if compare_versions(CURRENT_VERSION, version_info.get("latest_version", "")):
+            self.update_available.emit(version_info)
+        else:
+            self.no_update.emit()
+
+    def cached_result(self):
+        """返回缓存的版本清单（不论是否过期），没有时返回 None"""
+        version_info = self.cache.get("version_info")
+        return version_info if validate_version_info(version_info) else None
+
+
+def get_update_checker():
+    """获取应用级版本检查服务（首次调用时创建）"""
+    global _update_checker
+    if _update_checker is None:
+        _update_checker = UpdateChecker()
+    return _update_checker
@@ -0,0 +1,363 @@
+# update_downloader.py - 更新包下载（分段并行、断点续传、流式 SHA-256 校验、增量补丁）
+import os
+import json
+import time
+import hashlib
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from config import get_data_path
+from version import CURRENT_VERSION
+
+# 二进制增量补丁为可选功能，未安装 bsdiff4 时总是下载完整安装包
+try:
+    import bsdiff4
+except ImportError:
+    bsdiff4 = None
+
+UPDATES_DIR_NAME = "updates"
+
+DEFAULT_SEGMENTS = 4
+MIN_SEGMENT_SIZE = 1024 * 1024      # 小于这个大小的文件不分段
+CHUNK_SIZE = 64 * 1024
+STATE_SAVE_INTERVAL = 1.0           # 分段进度写入状态文件的间隔（秒）
+POLL_INTERVAL = 0.2
+REQUEST_TIMEOUT = 15
+MAX_RESTARTS = 1                    # 服务器上的文件变化后最多从头重新下载的次数
+
+
+class DownloadError(Exception):
+    """下载失败（网络错误、服务器不支持、校验不通过等）"""
+
+
+class DownloadCancelled(DownloadError):
+    """下载被用户取消，状态文件保留，下次继续"""
+
+
+class RemoteChanged(DownloadError):
+    """服务器上的文件与状态文件记录的不一致，需要从头下载"""
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def package_path(version, url):
+    """某个版本的安装包在数据目录中的位置，也作为之后增量补丁的基础文件"""
+    extension = os.path.splitext(urlsplit(url).path)[1] or ".pkg"
+    return get_data_path(UPDATES_DIR_NAME, f"pyro-browser-{version}{extension}")
+
+
+def installed_package_path(version):
+    """查找之前下载过的某个版本的安装包，没有时返回 None"""
+    updates_dir = os.path.dirname(get_data_path(UPDATES_DIR_NAME, "placeholder"))
+    prefix = f"pyro-browser-{version}."
+    for name in os.listdir(updates_dir):
+        if name.startswith(prefix) and not name.endswith((".part", ".json", ".tmp")):
+            return os.path.join(updates_dir, name)
+    return None
+
+
+class SegmentedDownload:
+    """一个文件的分段并行下载（在调用线程中阻塞执行，不依赖 Qt）
+
+    数据写入 <目标>.part，分段进度写入 <目标>.part.json；中断后用同一目标再次运行即可续传。
+    SHA-256 随下载进度按顺序计算已连续到达的数据，下载完成时校验随即完成。
+    """
+
+    def __init__(self, url, target_path, expected_sha256=None, segments=DEFAULT_SEGMENTS,
+                 cancel_event=None, progress_callback=None):
+        self.url = url
+        self.target_path = target_path
+        self.part_path = target_path + ".part"
+        self.state_path = target_path + ".part.json"
+        self.expected_sha256 = (expected_sha256 or "").lower() or None
+        self.segment_count = max(1, segments)
+        self.cancel_event = cancel_event or threading.Event()   # 用户取消
+        self.stop_event = threading.Event()                     # 某个分段出错时停止其余分段
+        self.progress_callback = progress_callback
+        self.lock = threading.Lock()
+        self.state = None
+        self.digest = None
+        self.hashed_offset = 0
+
+    def open_url(self, headers=None):
+        request = urllib.request.Request(self.url, headers={"User-Agent": f"PyroBrowser/{CURRENT_VERSION}",
+                                                            **(headers or {})})
+        return urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT)
+
+    def probe(self):
+        """用 Range: bytes=0-0 探测文件大小、ETag、Last-Modified 以及是否支持分段"""
+        with self.open_url({"Range": "bytes=0-0"}) as response:
+            etag = response.headers.get("ETag", "")
+            last_modified = response.headers.get("Last-Modified", "")
+            if response.status == 206:
+                content_range = response.headers.get("Content-Range", "")
+                size = int(content_range.rsplit("/", 1)[1]) if "/" in content_range else -1
+                return size, etag, last_modified, size > 0
+            length = response.headers.get("Content-Length")
+            return (int(length) if length else -1), etag, last_modified, False
+
+    def if_range_validator(self):
+        """If-Range 只能使用强 ETag（弱 ETag 总是得到 200），没有时改用 Last-Modified"""
+        etag = self.state["etag"]
+        if etag and not etag.startswith("W/"):
+            return etag
+        return self.state.get("last_modified", "")
+
+    def load_state(self, size, etag, last_modified):
+        """读取状态文件，与服务器上的文件一致时返回状态"""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("url") != self.url or state.get("size") != size or state.get("etag") != etag \
+                or state.get("last_modified", "") != last_modified:
+            return None
+        if not os.path.exists(self.part_path) or os.path.getsize(self.part_path) != size:
+            return None
+        return state
+
+    def new_state(self, size, etag, last_modified, ranges_supported):
+        count = self.segment_count if ranges_supported and size >= MIN_SEGMENT_SIZE else 1
+        segment_size = -(-size // count) if size > 0 else 0
+        segments = []
+        for index in range(count):
+            start = index * segment_size
+            end = min(size, start + segment_size)
+            if start < end or size <= 0:
+                segments.append([start, end, 0])   # [起始, 结束(不含), 已下载]
+        with open(self.part_path, "wb") as f:
+            if size > 0:
+                f.truncate(size)
+        return {"url": self.url, "size": size, "etag": etag, "last_modified": last_modified,
+                "ranges": ranges_supported, "segments": segments}
+
+    def save_state(self):
+        with self.lock:
+            data = json.dumps(self.state)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.state_path)
+
+    def discard_partial(self):
+        for path in (self.part_path, self.state_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def downloaded_bytes(self):
+        with self.lock:
+            return sum(segment[2] for segment in self.state["segments"])
+
+    def run(self):
+        """下载并校验，返回目标文件路径"""
+        for attempt in range(MAX_RESTARTS + 1):
+            try:
+                return self.download_once()
+            except RemoteChanged:
+                if attempt >= MAX_RESTARTS:
+                    raise
+                self.discard_partial()
+        raise DownloadError("下载失败")
+
+    def download_once(self):
+        try:
+            size, etag, last_modified, ranges_supported = self.probe()
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise DownloadError(f"无法连接下载服务器: {e}")
+
+        self.state = self.load_state(size, etag, last_modified) if ranges_supported else None
+        if self.state is None:
+            self.state = self.new_state(size, etag, last_modified, ranges_supported)
+        self.save_state()
+
+        # 续传时先把已经连续下载的部分计入哈希
+        self.digest = hashlib.sha256()
+        self.hashed_offset = 0
+        self.advance_hash()
+
+        segments = [segment for segment in self.state["segments"]
+                    if segment[1] <= 0 or segment[2] < segment[1] - segment[0]]
+        self.stop_event.clear()
+        last_save = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(segments) or 1) as executor:
+            futures = [executor.submit(self.download_segment, segment) for segment in segments]
+            while True:
+                failed = [future for future in futures if future.done() and future.exception() is not None]
+                done = all(future.done() for future in futures)
+                self.advance_hash()
+                if self.progress_callback:
+                    self.progress_callback(self.downloaded_bytes(), size)
+                if time.monotonic() - last_save >= STATE_SAVE_INTERVAL:
+                    self.save_state()
+                    last_save = time.monotonic()
+                if failed or done:
+                    break
+                self.cancel_event.wait(POLL_INTERVAL)
+            if failed:
+                # 通知其余分段停止，等它们退出后保存进度以便续传
+                self.stop_event.set()
+        if failed:
+            self.save_state()
+            cancelled = [future for future in failed if isinstance(future.exception(), DownloadCancelled)]
+            raise (cancelled or failed)[0].exception()
+
+        self.advance_hash()
+        actual = self.digest.hexdigest()
+        if self.expected_sha256 and actual != self.expected_sha256:
+            self.discard_partial()
+            raise DownloadError(f"SHA-256 校验失败: 期望 {self.expected_sha256}，实际 {actual}")
+        os.replace(self.part_path, self.target_path)
+        try:
+            os.remove(self.state_path)
+        except FileNotFoundError:
+            pass
+        return self.target_path
+
+    def download_segment(self, segment):
+        """在线程池中下载一个分段，每次写入后更新分段进度"""
+        start, end, downloaded = segment
+        headers = {}
+        if self.state["ranges"]:
+            headers["Range"] = f"bytes={start + downloaded}-{end - 1}"
+            validator = self.if_range_validator()
+            if validator:
+                # 文件已经变化时服务器会返回完整内容（200）
+                headers["If-Range"] = validator
+        try:
+            response = self.open_url(headers)
+        except (urllib.error.URLError, OSError) as e:
+            raise DownloadError(f"分段下载失败: {e}")
+        with response, open(self.part_path, "r+b", buffering=0) as f:
+            if self.state["ranges"] and response.status != 206:
+                raise RemoteChanged("服务器上的文件已变化")
+            f.seek(start + downloaded)
+            while True:
+                # 已经收齐的分段直接完成，不受取消或其他分段出错的影响
+                limit = CHUNK_SIZE if end <= 0 else min(CHUNK_SIZE, end - start - segment[2])
+                if limit <= 0:
+                    break
+                if self.cancel_event.is_set():
+                    raise DownloadCancelled("下载已取消")
+                if self.stop_event.is_set():
+                    raise DownloadError("其他分段出错，停止下载")
+                try:
+                    chunk = response.read(limit)
+                except OSError as e:
+                    raise DownloadError(f"分段下载中断: {e}")
+                if not chunk:
+                    break
+                f.write(chunk)
+                with self.lock:
+                    segment[2] += len(chunk)
+        if end > 0 and segment[2] < end - start:
+            raise DownloadError("连接提前关闭，分段不完整")
+
+    def advance_hash(self):
+        """对已经连续到达的数据继续计算哈希（从磁盘读取，不阻塞下载线程）"""
+        with self.lock:
+            contiguous = 0
+            for start, end, downloaded in self.state["segments"]:
+                contiguous = start + downloaded
+                if end <= 0 or downloaded < end - start:
+                    break
+        if contiguous <= self.hashed_offset:
+            return
+        with open(self.part_path, "rb") as f:
+            f.seek(self.hashed_offset)
+            remaining = contiguous - self.hashed_offset
+            while remaining > 0:
+                block = f.read(min(1024 * 1024, remaining))
+                if not block:
+                    break
+                self.digest.update(block)
+                remaining -= len(block)
+        self.hashed_offset = contiguous - remaining
+
+
+class UpdateDownloader(QThread):
+    """后台下载更新包：有适用于当前版本的增量补丁时先尝试补丁，失败再下载完整安装包
+
+    版本清单中的字段：
+      package_url / sha256    完整安装包及其 SHA-256
+      deltas                  {旧版本号: {"url", "sha256", "format": "bsdiff4"}}
+    """
+
+    # 定义信号
+    progress = pyqtSignal(object, object)   # (已下载字节, 总字节；未知时为 -1)
+    status_changed = pyqtSignal(str)
+    download_finished = pyqtSignal(str)     # 校验通过的安装包路径
+    download_failed = pyqtSignal(str)
+
+    def __init__(self, version_info, segments=DEFAULT_SEGMENTS, parent=None):
+        super().__init__(parent)
+        self.version_info = version_info
+        self.segments = segments
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """取消下载，已下载的部分保留到下次续传"""
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            path = self.try_delta() or self.download_full()
+            self.download_finished.emit(path)
+        except DownloadCancelled:
+            self.download_failed.emit("下载已取消，下次将从中断处继续")
+        except DownloadError as e:
+            self.download_failed.emit(str(e))
+        except Exception as e:
+            self.download_failed.emit(f"下载更新时发生错误: {e}")
+
+    def make_download(self, url, target_path, sha256):
+        return SegmentedDownload(url, target_path, sha256, self.segments, self.cancel_event,
+                                 lambda received, total: self.progress.emit(received, total))
+
+    def download_full(self):
+        url = self.version_info["package_url"]
+        target_path = package_path(self.version_info["latest_version"], url)
+        self.status_changed.emit("正在下载完整安装包...")
+        return self.make_download(url, target_path, self.version_info.get("sha256")).run()
+
+    def try_delta(self):
+        """下载并应用增量补丁，成功时返回新安装包路径，不适用或失败时返回 None"""
+        delta = (self.version_info.get("deltas") or {}).get(CURRENT_VERSION)
+        base_path = installed_package_path(CURRENT_VERSION)
+        if not delta or bsdiff4 is None or base_path is None or delta.get("format", "bsdiff4") != "bsdiff4":
+            return None
+
+        target_path = package_path(self.version_info["latest_version"], self.version_info["package_url"])
+        patch_path = target_path + ".patch"
+        try:
+            self.status_changed.emit("正在下载增量补丁...")
+            self.make_download(delta["url"], patch_path, delta.get("sha256")).run()
+            self.status_changed.emit("正在应用增量补丁...")
+            tmp_path = target_path + ".tmp"
+            bsdiff4.file_patch(base_path, tmp_path, patch_path)
+            expected = (self.version_info.get("sha256") or "").lower()
+            if expected and sha256_file(tmp_path) != expected:
+                os.remove(tmp_path)
+                raise DownloadError("补丁应用后的安装包校验失败")
+            os.replace(tmp_path, target_path)
+            return target_path
+        except DownloadCancelled:
+            raise
+        except (DownloadError, OSError, KeyError, ValueError) as e:
+            print(f"增量更新失败，改为下载完整安装包: {e}")
+            return None
+        finally:
+            if os.path.exists(patch_path):
+                os.remove(patch_path)
@@ -11,3 +11,9 @@ VERSION_CHECK_URL = "https://raw.githubusercontent.com/your-username/pyro-browse
 
 # 备用更新检查URL（使用GitHub Gist）
 BACKUP_VERSION_URL = "https://gist.githubusercontent.com/your-username/your-gist-id/raw/pyro-browser-version.json"
+
+# 所有更新镜像，检查更新时同时请求，采用最先返回的有效结果
+UPDATE_MIRRORS = [
+    VERSION_CHECK_URL,
+    BACKUP_VERSION_URL,
+]
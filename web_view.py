@@ -1,46 +1,174 @@
-from PyQt5.QtCore import *
-from PyQt5.QtWidgets import *
-from PyQt5.QtWebEngineWidgets import *
-from PyQt5.QtGui import QPainter
+import time
+from PyQt5.QtCore import Qt, QEasingCurve, QPropertyAnimation, QTimer, QUrl, pyqtSignal
+from PyQt5.QtWidgets import QGraphicsOpacityEffect, QLabel
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineView
+
+from config import get_config, set_config
+
+# 每帧的时间预算（毫秒），连续超出时直接结束动画
+FRAME_BUDGET_MS = 16
+MAX_OVER_BUDGET_FRAMES = 3
+# 截图本身超过这个耗时就不值得做动画
+SNAPSHOT_BUDGET_MS = 8
+# 页面迟迟没有加载完成时，最多保留快照这么久
+MAX_SNAPSHOT_HOLD_MS = 3000
+
+_reduced_motion = None
+
+
+def is_reduced_motion():
+    """是否启用减少动画模式"""
+    global _reduced_motion
+    if _reduced_motion is None:
+        _reduced_motion = bool(get_config("appearance", {"reduced_motion": False})["reduced_motion"])
+    return _reduced_motion
+
+
+def set_reduced_motion(enabled, remember=True):
+    """启用后所有过渡动画都直接跳过"""
+    global _reduced_motion
+    _reduced_motion = bool(enabled)
+    if remember:
+        set_config("appearance", {"reduced_motion": _reduced_motion})
+
+
+class SnapshotFader(QLabel):
+    """覆盖在目标控件上的快照层
+
+    过渡动画只改变这层快照的透明度（QGraphicsOpacityEffect），
+    底下的网页不会因为动画而重绘。
+    """
+
+    # 定义信号
+    finished = pyqtSignal()
+
+    def __init__(self, target, duration=300):
+        super().__init__(target)
+        self.target = target
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setScaledContents(True)
+        self.effect = QGraphicsOpacityEffect(self)
+        self.setGraphicsEffect(self.effect)
+
+        # 动画和信号只在这里连接一次
+        self.animation = QPropertyAnimation(self.effect, b"opacity", self)
+        self.animation.setDuration(duration)
+        self.animation.setEasingCurve(QEasingCurve.InOutQuad)
+        self.animation.valueChanged.connect(self.check_frame_budget)
+        self.animation.finished.connect(self.clear)
+        self.last_frame_time = 0
+        self.over_budget_frames = 0
+        self.hide()
+
+    def capture(self):
+        """截取目标控件的当前画面并覆盖在上面，截图过慢时返回 False"""
+        if is_reduced_motion() or not self.target.isVisible():
+            return False
+        started = time.perf_counter()
+        pixmap = self.target.grab()
+        if (time.perf_counter() - started) * 1000 > SNAPSHOT_BUDGET_MS or pixmap.isNull():
+            return False
+        self.animation.stop()
+        self.setPixmap(pixmap)
+        self.setGeometry(self.target.rect())
+        self.effect.setOpacity(1.0)
+        self.raise_()
+        self.show()
+        return True
+
+    def show_pixmap(self, pixmap):
+        """直接显示一张已有的快照（例如切换标签页时缓存的截图）"""
+        if is_reduced_motion() or pixmap is None or pixmap.isNull():
+            return False
+        self.animation.stop()
+        self.setPixmap(pixmap)
+        self.setGeometry(self.target.rect())
+        self.effect.setOpacity(1.0)
+        self.raise_()
+        self.show()
+        return True
+
+    def fade_out(self):
+        """淡出快照，露出下面的新内容"""
+        if not self.isVisible():
+            return
+        if is_reduced_motion():
+            self.clear()
+            return
+        self.last_frame_time = time.perf_counter()
+        self.over_budget_frames = 0
+        self.animation.setStartValue(self.effect.opacity())
+        self.animation.setEndValue(0.0)
+        self.animation.start()
+
+    def check_frame_budget(self, value):
+        """连续多帧超出预算说明机器忙，立即结束动画"""
+        now = time.perf_counter()
+        if (now - self.last_frame_time) * 1000 > FRAME_BUDGET_MS * 2:
+            self.over_budget_frames += 1
+            if self.over_budget_frames >= MAX_OVER_BUDGET_FRAMES:
+                self.animation.stop()
+                self.clear()
+        self.last_frame_time = now
+
+    def clear(self):
+        """隐藏并释放快照"""
+        self.hide()
+        super().clear()
+        self.finished.emit()
+
+
+class BrowserPage(QWebEnginePage):
+    """浏览器使用的页面，主框架导航前可以交给 navigation_hook 处理
+
+    navigation_hook(page, url, navigation_type) 返回 True 表示导航已被接管（例如换入预渲染页面），
+    页面本身不再加载。
+    """
+
+    def __init__(self, profile, parent=None):
+        super().__init__(profile, parent)
+        self.navigation_hook = None
+
+    def acceptNavigationRequest(self, url, navigation_type, is_main_frame):
+        if is_main_frame and self.navigation_hook is not None and self.navigation_hook(self, url, navigation_type):
+            return False
+        return super().acceptNavigationRequest(url, navigation_type, is_main_frame)
+
 
 class FadeWebEngineView(QWebEngineView):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, profile=None):
         super().__init__(parent)
-        self._opacity = 1.0
-        self.fade_animation = QPropertyAnimation(self, b"opacity")
-        self.fade_animation.setDuration(400)
-        self.fade_animation.setEasingCurve(QEasingCurve.InOutQuad)
-        
+        if profile is not None:
+            # 页面使用共享配置文件，缓存与字体设置由配置文件统一提供
+            self.setPage(BrowserPage(profile, self))
+        self.fader = SnapshotFader(self, 400)
+        self.waiting_for_load = False
+
+        # 所有连接只建立一次，避免每次导航都叠加新的连接
+        self.loadFinished.connect(self.on_load_finished)
+        self.hold_timer = QTimer(self)
+        self.hold_timer.setSingleShot(True)
+        self.hold_timer.setInterval(MAX_SNAPSHOT_HOLD_MS)
+        self.hold_timer.timeout.connect(self.on_load_finished)
+
     def setUrlWithAnimation(self, url):
-        self.fade_animation.setStartValue(1.0)
-        self.fade_animation.setEndValue(0.3)
-        self.fade_animation.finished.connect(lambda: self.load_url_and_fade_in(url))
-        self.fade_animation.start()
-        
-    def load_url_and_fade_in(self, url):
+        """导航到新网址：旧页面的快照保留到新页面加载完成后再淡出"""
+        self.waiting_for_load = self.fader.capture()
+        if self.waiting_for_load:
+            self.hold_timer.start()
         self.setUrl(QUrl(url))
-        self.loadFinished.connect(self.on_load_finished)
-        
-    def on_load_finished(self):
-        self.loadFinished.disconnect(self.on_load_finished)
-        self.fade_animation.setStartValue(0.3)
-        self.fade_animation.setEndValue(1.0)
-        self.fade_animation.start()
-        
-    def get_opacity(self):
-        return self._opacity
-        
-    def set_opacity(self, value):
-        self._opacity = value
-        self.update()
-        
-    opacity = pyqtProperty(float, get_opacity, set_opacity)
-        
-    def paintEvent(self, event):
-        if self._opacity < 1.0:
-            painter = QPainter(self)
-            painter.setOpacity(self._opacity)
-            super().paintEvent(event)
-        else:
-            super().paintEvent(event)
-            
\ No newline at end of file
+
+    def load_url_and_fade_in(self, url):
+        self.setUrlWithAnimation(url)
+
+    def on_load_finished(self, *args):
+        if not self.waiting_for_load:
+            return
+        self.waiting_for_load = False
+        self.hold_timer.stop()
+        self.fader.fade_out()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.fader.isVisible():
+            self.fader.setGeometry(self.rect())